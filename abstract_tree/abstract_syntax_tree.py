@@ -1,9 +1,26 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import Optional, Tuple
 
 
 class AbstractSyntaxTree(ABC):
+    # Nodes have no __dict__: every class lists the attributes it adds in
+    # __slots__, which takes a fraction of the memory on large trees.
+    #
+    # start and end are the offsets of the first character of the node and
+    # of the one after its last character in the source, set by the parser.
+    # Nodes built in code have no span.
+    __slots__ = ('start', 'end')
+    # Names of the attributes holding the child nodes (or lists of them), in
+    # source order. Annotations like VarExpression.symbol are not
+    # children.
+    children: Tuple[str, ...] = ()
+
+    def __init__(self):
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+
     @abstractmethod
     def visit(self, visitor, *args) -> object:
         """
@@ -18,3 +35,11 @@ class AbstractSyntaxTree(ABC):
         """
         pass
 
+
+def attribute_names(cls: type) -> Tuple[str, ...]:
+    """
+    Returns the names of all attributes of a node class, from the slots of
+    the class and of its bases: span, children and annotations.
+    """
+    return tuple(name for base in reversed(cls.__mro__) for name in base.__dict__.get('__slots__', ()))
+
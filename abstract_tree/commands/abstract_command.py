@@ -7,6 +7,8 @@ from ..visitor import Visitor
 
 
 class AbstractCommand(AbstractSyntaxTree, metaclass=ABCMeta):
+    __slots__ = ()
+
     @abstractmethod
     def visit(self, visitor: Visitor, *args) -> object:
         pass
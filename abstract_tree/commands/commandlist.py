@@ -8,7 +8,11 @@ from ..visitor import Visitor
 
 
 class CommandList(AbstractSyntaxTree):
+    __slots__ = ('commands',)
+    children = ('commands',)
+
     def __init__(self):
+        super().__init__()
         self.commands: List[AbstractCommand] = []
 
     def visit(self, visitor: Visitor, *args) -> object:
@@ -6,7 +6,11 @@ from ..visitor import Visitor
 
 
 class DeclarationCommand(AbstractCommand):
+    __slots__ = ('declaration_list',)
+    children = ('declaration_list',)
+
     def __init__(self, declaration_list: DeclarationList):
+        super().__init__()
         self.declaration_list = declaration_list
 
     def visit(self, visitor: Visitor, *args) -> object:
@@ -6,7 +6,11 @@ from ..visitor import Visitor
 
 
 class StatementCommand(AbstractCommand):
+    __slots__ = ('statement',)
+    children = ('statement',)
+
     def __init__(self, statement: AbstractStatement):
+        super().__init__()
         self.statement = statement
 
     def visit(self, visitor: Visitor, *args) -> object:
@@ -1,4 +1,4 @@
 from .declarationlist import DeclarationList
-from .func_declaration import FuncDeclaration
+from .func_declaration import FuncDeclaration, LazyFuncDeclaration
 from .abstract_declaration import AbstractDeclaration
 from .var_declaration import VarDeclaration, VarDeclarationWithAssignment
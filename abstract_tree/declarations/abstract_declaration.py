@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
+from typing import Optional
 
 from address import Address
 from ..visitor import Visitor
@@ -8,8 +9,14 @@ from ..abstract_syntax_tree import AbstractSyntaxTree
 
 
 class AbstractDeclaration(AbstractSyntaxTree, metaclass=ABCMeta):
+    # symbol is the ID of the declaration in the SymbolTable of its program,
+    # set by the Checker
+    __slots__ = ('address', 'symbol')
+
     def __init__(self):
+        super().__init__()
         self.address: Address = None
+        self.symbol: Optional[int] = None
 
     @abstractmethod
     def visit(self, visitor: Visitor, *args) -> object:
@@ -8,7 +8,11 @@ from ..visitor import Visitor
 
 
 class DeclarationList(AbstractSyntaxTree):
+    __slots__ = ('declarations',)
+    children = ('declarations',)
+
     def __init__(self):
+        super().__init__()
         self.declarations: List[AbstractDeclaration] = []
 
     def visit(self, visitor: Visitor, *args) -> object:
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Callable, Optional
+
 from .abstract_declaration import AbstractDeclaration
 from ..commands.commandlist import CommandList
 from ..expressions.arguments_list import ArgumentsList
@@ -8,7 +10,12 @@ from ..visitor import Visitor
 
 
 class FuncDeclaration(AbstractDeclaration):
-    def __init__(self, identifier: Identifier, args: ArgumentsList, commands: CommandList):
+    __slots__ = ('identifier', 'args', 'commands')
+    children = ('identifier', 'args', 'commands')
+    # Whether the body has been parsed, see LazyFuncDeclaration
+    is_parsed = True
+
+    def __init__(self, identifier: Identifier, args: ArgumentsList, commands: Optional[CommandList]):
         super().__init__()
         self.identifier = identifier
         self.args = args
@@ -16,3 +23,30 @@ class FuncDeclaration(AbstractDeclaration):
 
     def visit(self, visitor: Visitor, *args) -> object:
         return visitor.visit_func_declaration(self, *args)
+
+
+class LazyFuncDeclaration(FuncDeclaration):
+    """
+    A function declaration whose body is parsed by `parse_body` when its
+    commands are first asked for.
+    """
+    __slots__ = ('_commands', 'parse_body')
+
+    def __init__(self, identifier: Identifier, args: ArgumentsList, parse_body: Callable[[], CommandList]):
+        super().__init__(identifier, args, None)
+        self.parse_body = parse_body
+
+    @property
+    def commands(self) -> CommandList:
+        if self._commands is None:
+            self._commands = self.parse_body()
+            self.parse_body = None
+        return self._commands
+
+    @commands.setter
+    def commands(self, commands: Optional[CommandList]) -> None:
+        self._commands = commands
+
+    @property
+    def is_parsed(self) -> bool:
+        return self._commands is not None
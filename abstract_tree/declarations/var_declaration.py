@@ -9,6 +9,9 @@ from ..terminals.type_indicator import TypeIndicator
 
 
 class VarDeclaration(AbstractDeclaration):
+    __slots__ = ('type_indicator', 'identifier')
+    children = ('type_indicator', 'identifier')
+
     def __init__(self, type_indicator: TypeIndicator, identifier: Identifier):
         super().__init__()
         self.identifier = identifier
@@ -19,6 +22,9 @@ class VarDeclaration(AbstractDeclaration):
 
 
 class VarDeclarationWithAssignment(AbstractDeclaration):
+    __slots__ = ('type_indicator', 'identifier', 'operator', 'expression')
+    children = ('type_indicator', 'identifier', 'operator', 'expression')
+
     def __init__(self, type_indicator: TypeIndicator, identifier: Identifier, operator: Operator,
                  expression: AbstractExpression):
         super().__init__()
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
+from typing import Optional
 
 from ..abstract_syntax_tree import AbstractSyntaxTree
 from ..visitor import Visitor
 
 
 class AbstractExpression(AbstractSyntaxTree, metaclass=ABCMeta):
+    # type is the code of the type of the value of the expression in
+    # symbols.TYPES, set by the Typer
+    __slots__ = ('type',)
+
+    def __init__(self):
+        super().__init__()
+        self.type: Optional[int] = None
+
     @abstractmethod
     def visit(self, visitor: Visitor, *args) -> object:
         pass
-
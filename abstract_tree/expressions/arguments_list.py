@@ -8,7 +8,11 @@ from ..visitor import Visitor
 
 
 class ArgumentsList(AbstractSyntaxTree):
+    __slots__ = ('expressions',)
+    children = ('expressions',)
+
     def __init__(self):
+        super().__init__()
         self.expressions: List[AbstractExpression] = []
 
     def visit(self, visitor: Visitor, *args) -> object:
@@ -6,7 +6,11 @@ from ..visitor import Visitor
 
 
 class BinaryExpression(AbstractExpression):
+    __slots__ = ('expression1', 'operator', 'expression2')
+    children = ('expression1', 'operator', 'expression2')
+
     def __init__(self, operator: Operator, expression1: AbstractExpression, expression2: AbstractExpression):
+        super().__init__()
         self.operator = operator
         self.expression1 = expression1
         self.expression2 = expression2
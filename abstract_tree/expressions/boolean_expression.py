@@ -6,7 +6,11 @@ from ..visitor import Visitor
 
 
 class BooleanLiteralExpression(AbstractExpression):
+    __slots__ = ('literal',)
+    children = ('literal',)
+
     def __init__(self, literal: BooleanLiteral):
+        super().__init__()
         self.literal = literal
 
     def visit(self, visitor: Visitor, *args) -> object:
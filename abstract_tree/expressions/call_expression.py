@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from ..visitor import Visitor
 from .abstract_expression import AbstractExpression
 from .arguments_list import ArgumentsList
@@ -7,10 +9,15 @@ from ..terminals.identifier import Identifier
 
 
 class CallExpression(AbstractExpression):
+    # symbol is the ID of the declaration of the function, set by the Checker
+    __slots__ = ('name', 'args', 'symbol')
+    children = ('name', 'args')
+
     def __init__(self, name: Identifier, args: ArgumentsList):
+        super().__init__()
         self.name = name
         self.args = args
-        self.declaration = None
+        self.symbol: Optional[int] = None
 
     def visit(self, visitor: Visitor, *args) -> object:
         return visitor.visit_call_expression(self, *args)
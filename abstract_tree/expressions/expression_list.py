@@ -8,7 +8,11 @@ from ..abstract_syntax_tree import AbstractSyntaxTree
 
 
 class ExpressionList(AbstractSyntaxTree):
+    __slots__ = ('expressions',)
+    children = ('expressions',)
+
     def __init__(self):
+        super().__init__()
         self.expressions: List[AbstractExpression] = []
 
     def visit(self, visitor: Visitor, *args) -> object:
@@ -6,7 +6,11 @@ from ..visitor import Visitor
 
 
 class UnaryExpression(AbstractExpression):
+    __slots__ = ('operator', 'expression')
+    children = ('operator', 'expression')
+
     def __init__(self, operator: Operator, expression: AbstractExpression):
+        super().__init__()
         self.operator = operator
         self.expression = expression
 
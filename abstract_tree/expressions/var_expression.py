@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from .abstract_expression import AbstractExpression
 # from ..declarations import VarDeclaration
 from ..terminals.identifier import Identifier
@@ -7,9 +9,14 @@ from ..visitor import Visitor
 
 
 class VarExpression(AbstractExpression):
+    # symbol is the ID of the declaration of the variable, set by the Checker
+    __slots__ = ('name', 'symbol')
+    children = ('name',)
+
     def __init__(self, name: Identifier):
+        super().__init__()
         self.name = name
-        self.declaration = None
+        self.symbol: Optional[int] = None
 
     def visit(self, visitor: Visitor, *args) -> object:
         return visitor.visit_var_expression(self, *args)
@@ -6,8 +6,17 @@ from .visitor import Visitor
 
 
 class Program(AbstractSyntaxTree):
+    # symbols is the SymbolTable of the program, set by the Checker; shifts
+    # holds the span changes incremental_parser.reparse() has not applied
+    # yet, see incremental_parser.settle()
+    __slots__ = ('command_list', 'symbols', 'shifts')
+    children = ('command_list',)
+
     def __init__(self, command_list: CommandList):
+        super().__init__()
         self.command_list = command_list
+        self.symbols = None
+        self.shifts = None
 
     def visit(self, visitor: Visitor, *args):
         return visitor.visit_program(self, args)
@@ -7,6 +7,8 @@ from ..visitor import Visitor
 
 
 class AbstractStatement(AbstractSyntaxTree, metaclass=ABCMeta):
+    __slots__ = ()
+
     @abstractmethod
     def visit(self, visitor: Visitor, *args) -> object:
         pass
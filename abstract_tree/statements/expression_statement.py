@@ -6,7 +6,11 @@ from ..visitor import Visitor
 
 
 class ExpressionStatement(AbstractStatement):
+    __slots__ = ('expressions',)
+    children = ('expressions',)
+
     def __init__(self, expressions: AbstractExpression):
+        super().__init__()
         self.expressions = expressions
 
     def visit(self, visitor: Visitor, *args) -> object:
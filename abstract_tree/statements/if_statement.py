@@ -7,7 +7,11 @@ from ..visitor import Visitor
 
 
 class IfStatement(AbstractStatement):
+    __slots__ = ('expr', 'if_com', 'else_com')
+    children = ('expr', 'if_com', 'else_com')
+
     def __init__(self, expr: AbstractExpression, if_com: CommandList, else_com: CommandList):
+        super().__init__()
         self.expr = expr
         self.if_com = if_com
         self.else_com = else_com
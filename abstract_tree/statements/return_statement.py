@@ -6,7 +6,11 @@ from ..visitor import Visitor
 
 
 class ReturnStatement(AbstractStatement):
+    __slots__ = ('expression',)
+    children = ('expression',)
+
     def __init__(self, expression: AbstractExpression):
+        super().__init__()
         self.expression = expression
 
     def visit(self, visitor: Visitor, *args) -> object:
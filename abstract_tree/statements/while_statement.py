@@ -7,7 +7,11 @@ from ..visitor import Visitor
 
 
 class WhileStatement(AbstractStatement):
+    __slots__ = ('expr', 'command')
+    children = ('expr', 'command')
+
     def __init__(self, expr: AbstractExpression, command: CommandList):
+        super().__init__()
         self.command = command
         self.expr = expr
 
@@ -5,5 +5,7 @@ from ..visitor import Visitor
 
 
 class BooleanLiteral(Terminal):
+    __slots__ = ()
+
     def visit(self, visitor: Visitor, *args) -> object:
         return visitor.visit_boolean_literal(self, *args)
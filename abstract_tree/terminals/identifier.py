@@ -5,5 +5,7 @@ from ..visitor import Visitor
 
 
 class Identifier(Terminal):
+    __slots__ = ()
+
     def visit(self, visitor: Visitor, *args) -> object:
         return visitor.visit_identifier(self, *args)
@@ -5,5 +5,7 @@ from ..visitor import Visitor
 
 
 class IntegerLiteral(Terminal):
+    __slots__ = ()
+
     def visit(self, visitor: Visitor, *args) -> object:
         return visitor.visit_integer_literal(self, *args)
@@ -5,5 +5,7 @@ from ..visitor import Visitor
 
 
 class Operator(Terminal):
+    __slots__ = ()
+
     def visit(self, visitor: Visitor, *args) -> object:
         return visitor.visit_operator(self, *args)
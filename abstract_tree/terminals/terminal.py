@@ -7,7 +7,10 @@ from ..visitor import Visitor
 
 
 class Terminal(AbstractSyntaxTree, metaclass=ABCMeta):
+    __slots__ = ('spelling',)
+
     def __init__(self, spelling: str):
+        super().__init__()
         self.spelling = spelling
 
     @abstractmethod
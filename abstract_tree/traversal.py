@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import functools
+import inspect
+from types import GeneratorType
+from typing import Callable
+
+from .abstract_syntax_tree import AbstractSyntaxTree
+from .walker import DispatchTable
+
+
+class _HandlerTable(DispatchTable):
+    """
+    A DispatchTable to the visit methods of a Traversal as written, instead
+    of the methods running them through traverse().
+    """
+
+    def __missing__(self, cls: type) -> Callable:
+        function = super().__missing__(cls)
+        function = self[cls] = getattr(function, '__traversal__', function)
+        return function
+
+
+def _traversed(function: Callable) -> Callable:
+    @functools.wraps(function)
+    def visit(self, node, *args):
+        return self.traverse(node, *args)
+
+    visit.__traversal__ = function
+    return visit
+
+
+class Traversal:
+    """
+    Base of passes which visit trees of any depth without recursion, with
+    an explicit stack instead of the Python one.
+
+    A visit method which visits children is written as a generator: it
+    yields a child, or a tuple of a child and the arguments to visit it
+    with (never a list, which stands for a result in traverse()), and the
+    yield evaluates to the result of the child's visit
+    method. Its code before a yield is the pre-order part of the visit,
+    the code after it the post-order part and what it returns is its
+    result:
+
+        def visit_binary_expression(self, be, *args):
+            t1 = yield be.expression1
+            yield be.expression2, True
+            return ...
+
+    traverse() runs the generators of the nodes being visited on a stack
+    and passes every result to the generator waiting for it. Exceptions
+    go up through the waiting generators as they would through recursive
+    calls, so their try/finally blocks run. Visit methods which are plain
+    functions, e.g. of the terminals, are called as they are.
+
+    Calling a generator visit method, also through node.visit(), runs the
+    traversal from that node, so passes keep the interface of a Visitor.
+    Nodes are dispatched through a DispatchTable made once per subclass.
+    """
+    _handlers: DispatchTable = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, function in list(vars(cls).items()):
+            if name.startswith('visit_') and inspect.isgeneratorfunction(function):
+                setattr(cls, name, _traversed(function))
+        cls._handlers = _HandlerTable(cls)
+
+    def traverse(self, node: AbstractSyntaxTree, *args) -> object:
+        """
+        Visits a node and returns the result of its visit method.
+        """
+        table = self._handlers
+        generator = GeneratorType
+        value = table[type(node)](self, node, *args)
+        if type(value) is not generator:
+            return value
+
+        # The send() of the driver of every generator waiting for the result
+        # of a child, by depth. Drivers are kept for the next generators at
+        # their depth; one which raised is replaced.
+        drivers = [_driver()]
+        depth = 0
+        send = drivers[0]
+        error = None
+        item = send(value)
+        while True:
+            if error is None:
+                kind = type(item)
+                if kind is list:
+                    # The generator returned item[0]
+                    depth -= 1
+                    if depth < 0:
+                        return item[0]
+                    send = drivers[depth]
+                    value = item[0]
+                else:
+                    try:
+                        if kind is tuple:
+                            value = table[type(item[0])](self, *item)
+                        else:
+                            value = table[kind](self, item)
+                    except BaseException as exception:
+                        error = exception
+                        continue
+                    if type(value) is generator:
+                        depth += 1
+                        try:
+                            send = drivers[depth]
+                        except IndexError:
+                            send = _driver()
+                            drivers.append(send)
+                try:
+                    item = send(value)
+                except BaseException as exception:
+                    error = exception
+                    drivers[depth] = _driver()
+                    depth -= 1
+                    if depth < 0:
+                        raise
+                    send = drivers[depth]
+            else:
+                try:
+                    item, error = send.__self__.throw(error), None
+                except BaseException as exception:
+                    error = exception
+                    drivers[depth] = _driver()
+                    depth -= 1
+                    if depth < 0:
+                        raise
+                    send = drivers[depth]
+
+
+def _driver() -> Callable:
+    """
+    Returns the send() of a generator which runs the generators sent to it
+    one after the other, yielding what they yield and, when one returns, a
+    list of its result. A generator yielding from another gets its result
+    without the StopIteration which send() raises, so one driver per depth
+    saves an exception per visited node.
+    """
+    def drive():
+        result = [None]
+        generator = yield
+        while True:
+            result[0] = yield from generator
+            generator = yield result
+
+    driver = drive()
+    next(driver)
+    return driver.send
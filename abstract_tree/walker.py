@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Iterator, List, Optional
+
+from .abstract_syntax_tree import AbstractSyntaxTree
+
+_WORD_START = re.compile(r'(?<!^)(?=[A-Z])')
+
+
+def visit_name(cls: type) -> str:
+    """
+    Returns the name of the visitor method of a node class, e.g.
+    visit_binary_expression for BinaryExpression.
+    """
+    return 'visit_' + _WORD_START.sub('_', cls.__name__).lower()
+
+
+def node_classes() -> List[type]:
+    """
+    Returns the classes of abstract_tree which nodes are made of.
+    """
+    found = []
+    pending = [AbstractSyntaxTree]
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if not getattr(cls, '__abstractmethods__', None):
+            found.append(cls)
+    return found
+
+
+def _double_dispatch(visitor, node, *args):
+    return node.visit(visitor, *args)
+
+
+class DispatchTable(dict):
+    """
+    Maps node classes to the function of a visitor class which visits them,
+    so a node is visited with table[type(node)](visitor, node, *args)
+    instead of node.visit(visitor, *args) looking the method up by name.
+
+    The function of a class is the visitor method named after it or after
+    its closest base, see visit_name(). Classes without one get `default`,
+    which by default dispatches through node.visit(). Classes which are not
+    in abstract_tree, like the views of an AstArena, are looked up on first
+    use.
+    """
+
+    def __init__(self, visitor_class: type, default: Callable = _double_dispatch):
+        super().__init__()
+        self.visitor_class = visitor_class
+        self.default = default
+        for cls in node_classes():
+            self[cls] = self.__missing__(cls)
+
+    def __missing__(self, cls: type) -> Callable:
+        # Virtual subclasses, like the views, are not in the MRO of the class
+        # but visited as their registered node class
+        bases = list(cls.__mro__) + sorted((base for base in node_classes() if issubclass(cls, base)),
+                                           key=lambda base: len(base.__mro__), reverse=True)
+        function = self.default
+        for base in bases:
+            method = getattr(self.visitor_class, visit_name(base), None)
+            if method is not None:
+                function = method
+                break
+        self[cls] = function
+        return function
+
+
+@lru_cache(maxsize=None)
+def dispatch_table(visitor_class: type) -> DispatchTable:
+    """
+    Returns the dispatch table of a visitor class, made once per class.
+    """
+    return DispatchTable(visitor_class)
+
+
+@lru_cache(maxsize=None)
+def child_getter(cls: type) -> Callable[[AbstractSyntaxTree], tuple]:
+    """
+    Returns a function giving the children of a node of the class, in the
+    order of `children`, as a tuple of nodes, lists of nodes and None.
+    """
+    names = cls.children
+    if not names:
+        return lambda node: ()
+    if len(names) == 1:
+        getter = attrgetter(names[0])
+        return lambda node: (getter(node),)
+    return attrgetter(*names)
+
+
+def iter_children(node: AbstractSyntaxTree) -> Iterator[AbstractSyntaxTree]:
+    """
+    Yields the child nodes of a node in source order, with the items of
+    list children and without missing ones.
+    """
+    for child in child_getter(type(node))(node):
+        if type(child) is list:
+            yield from child
+        elif child is not None:
+            yield child
+
+
+def walk(tree: AbstractSyntaxTree) -> Iterator[AbstractSyntaxTree]:
+    """
+    Yields all nodes of a tree in preorder, without recursion.
+    """
+    pending = [tree]
+    while pending:
+        node = pending.pop()
+        yield node
+        children = list(iter_children(node))
+        children.reverse()
+        pending.extend(children)
+
+
+class Walker:
+    """
+    Base of passes which only handle the nodes they care about. A subclass
+    defines visit_<node> methods named as those of Visitor for some node
+    classes; every other node goes to generic_visit(), which visits its
+    children. A method handles the children of its node itself, e.g. by
+    calling generic_visit().
+
+    Nodes are dispatched through a DispatchTable made once per subclass.
+    """
+    _table: Optional[DispatchTable] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._table = DispatchTable(cls, cls.generic_visit)
+
+    def visit(self, node: AbstractSyntaxTree, *args) -> object:
+        return self._table[type(node)](self, node, *args)
+
+    def generic_visit(self, node: AbstractSyntaxTree, *args) -> object:
+        table = self._table
+        for child in child_getter(type(node))(node):
+            if type(child) is list:
+                for item in child:
+                    table[type(item)](self, item, *args)
+            elif child is not None:
+                table[type(child)](self, child, *args)
+        return None
@@ -0,0 +1,284 @@
+import inspect
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+from abstract_tree import *
+from abstract_tree.abstract_syntax_tree import attribute_names
+from serialization import NODE_CLASSES
+
+# Identifies arenas written by AstArena.tobytes(), followed by the version
+# of the layout
+MAGIC = b'TARN'
+FORMAT_VERSION = 1
+
+# Kind of the nodes standing for a list of nodes, and the reference to a
+# missing node. Other kinds are the codes of serialization.NODE_CLASSES.
+LIST = 1
+NONE = -1
+KINDS: Dict[type, int] = {cls: kind for kind, cls in enumerate(NODE_CLASSES, 2)}
+# A lazy declaration is stored with its body, as a plain one
+KINDS[LazyFuncDeclaration] = KINDS[FuncDeclaration]
+
+_CLASSES: List[Optional[type]] = [None, None] + NODE_CLASSES
+
+
+class AstArena:
+    """
+    Holds any number of trees as columns of ints instead of one object per
+    node. A node is an int, its index in the columns:
+    - kinds: the kind of the node, LIST or the code of its class
+    - starts, ends: its span, -1 for a node without one
+    - first, counts: the range of its children in edges
+    - values: for a terminal, the index of its spelling in strings, else -1
+    - edges: the children of all nodes, each a node or NONE, in the order of
+      `children`; a list child is a LIST node whose children are its items
+
+    Nodes can be read through the methods below, or through views from
+    view(), which have the attributes of the node classes and can be
+    visited like them, e.g. by the Checker and the Encoder. Annotations
+    those set, like `declaration` and `address`, are kept in `annotations`.
+
+    The columns of an arena read by from_buffer() are memoryviews of the
+    buffer, so no nodes can be added to it.
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.starts = array('i')
+        self.ends = array('i')
+        self.first = array('I')
+        self.counts = array('I')
+        self.values = array('i')
+        self.edges = array('i')
+        self.strings: List[str] = []
+        self.string_ids: Dict[str, int] = {}
+        # Values of annotations by attribute name and node
+        self.annotations: Dict[str, Dict[int, object]] = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def add(self, tree: AbstractSyntaxTree) -> int:
+        """
+        Adds a tree and returns its root. The nodes of a tree get increasing
+        numbers, children after their parents. The bodies of lazy function
+        declarations are parsed.
+        """
+        root = self.__new_node(tree)
+        pending = [(tree, root)]
+        while pending:
+            node, index = pending.pop()
+            self.first[index] = len(self.edges)
+            items = node if type(node) is list else [getattr(node, name) for name in node.children]
+            self.counts[index] = len(items)
+            for item in items:
+                if item is None:
+                    self.edges.append(NONE)
+                else:
+                    child = self.__new_node(item)
+                    self.edges.append(child)
+                    if type(item) is list or item.children:
+                        pending.append((item, child))
+        return root
+
+    def __new_node(self, node: Union[AbstractSyntaxTree, list]) -> int:
+        index = len(self.kinds)
+        if type(node) is list:
+            self.kinds.append(LIST)
+            self.starts.append(-1)
+            self.ends.append(-1)
+            self.values.append(-1)
+        else:
+            self.kinds.append(KINDS[type(node)])
+            self.starts.append(-1 if node.start is None else node.start)
+            self.ends.append(-1 if node.end is None else node.end)
+            if isinstance(node, Terminal):
+                string_id = self.string_ids.get(node.spelling)
+                if string_id is None:
+                    string_id = self.string_ids[node.spelling] = len(self.strings)
+                    self.strings.append(node.spelling)
+                self.values.append(string_id)
+            else:
+                self.values.append(-1)
+        self.first.append(len(self.edges))
+        self.counts.append(0)
+        return index
+
+    def to_tree(self, root: int) -> AbstractSyntaxTree:
+        """
+        Returns a copy of the tree of a node made of node objects, without
+        its annotations.
+        """
+        order = []
+        pending = [root]
+        while pending:
+            index = pending.pop()
+            order.append(index)
+            pending.extend(child for child in self.children(index) if child != NONE)
+
+        built = {NONE: None}
+        for index in reversed(order):
+            kind = self.kinds[index]
+            if kind == LIST:
+                built[index] = [built[child] for child in self.children(index)]
+                continue
+            cls = _CLASSES[kind]
+            if issubclass(cls, Terminal):
+                node = cls(self.strings[self.values[index]])
+            else:
+                values = dict(zip(cls.children, (built[child] for child in self.children(index))))
+                node = cls(**{name: values.pop(name) for name in _arguments(cls)})
+                for name, value in values.items():
+                    setattr(node, name, value)
+            if self.ends[index] >= 0:
+                node.start = self.starts[index]
+                node.end = self.ends[index]
+            built[index] = node
+        return built[root]
+
+    def node_class(self, index: int) -> type:
+        """
+        Returns the class of a node, or list for a LIST node.
+        """
+        kind = self.kinds[index]
+        return list if kind == LIST else _CLASSES[kind]
+
+    def children(self, index: int) -> Tuple[int, ...]:
+        first = self.first[index]
+        return tuple(self.edges[first:first + self.counts[index]])
+
+    def child(self, index: int, position: int) -> int:
+        """
+        Returns a child of a node by its position in `children`.
+        """
+        return self.edges[self.first[index] + position]
+
+    def spelling(self, index: int) -> str:
+        return self.strings[self.values[index]]
+
+    def span(self, index: int) -> Tuple[Optional[int], Optional[int]]:
+        if self.ends[index] < 0:
+            return None, None
+        return self.starts[index], self.ends[index]
+
+    def view(self, index: int) -> Union['NodeView', List['NodeView'], None]:
+        """
+        Returns a view of a node: None for NONE, a list of views for a LIST
+        node.
+        """
+        if index == NONE:
+            return None
+        kind = self.kinds[index]
+        if kind == LIST:
+            first = self.first[index]
+            return [self.view(child) for child in self.edges[first:first + self.counts[index]]]
+        return _VIEWS[kind](self, index)
+
+    def tobytes(self) -> bytes:
+        """
+        Returns the columns and strings in one buffer, which from_buffer()
+        reads without copying the columns. The ints are in native byte
+        order. Annotations are not stored.
+        """
+        strings = '\0'.join(self.strings).encode('utf-8')
+        header = array('I', [FORMAT_VERSION, len(self.kinds), len(self.edges), len(self.strings), len(strings)])
+        columns = [self.starts, self.ends, self.first, self.counts, self.values, self.edges, self.kinds]
+        return MAGIC + header.tobytes() + b''.join(bytes(column) for column in columns) + strings
+
+    @classmethod
+    def from_buffer(cls, buffer) -> 'AstArena':
+        """
+        Returns an arena whose columns are views of a buffer written by
+        tobytes(). Raises ValueError if the buffer holds no such arena.
+        """
+        data = memoryview(buffer).cast('B')
+        header = array('I')
+        header.frombytes(data[len(MAGIC):len(MAGIC) + 20])
+        if bytes(data[:len(MAGIC)]) != MAGIC or len(header) != 5 or header[0] != FORMAT_VERSION:
+            raise ValueError("Not an arena of this format version and byte order.")
+        _, nodes, edges, count, length = header
+        arena = cls()
+        position = len(MAGIC) + 20
+        for name, typecode, size in (('starts', 'i', nodes), ('ends', 'i', nodes), ('first', 'I', nodes),
+                                     ('counts', 'I', nodes), ('values', 'i', nodes), ('edges', 'i', edges),
+                                     ('kinds', 'B', nodes)):
+            end = position + size * array(typecode).itemsize
+            if end > len(data):
+                raise ValueError("Truncated arena.")
+            setattr(arena, name, data[position:end].cast(typecode))
+            position = end
+        if position + length != len(data):
+            raise ValueError("Truncated arena.")
+        arena.strings = str(data[position:], 'utf-8').split('\0') if count else []
+        arena.string_ids = {string: index for index, string in enumerate(arena.strings)}
+        return arena
+
+
+class NodeView:
+    """
+    A node of an AstArena seen as a node object. Every node class has a view
+    class, which is registered as its virtual subclass and has its
+    `children`, attributes and visit() method. Views of the same node are
+    equal.
+    """
+    __slots__ = ('arena', 'index')
+    children: Tuple[str, ...] = ()
+
+    def __init__(self, arena: AstArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, NodeView) and other.arena is self.arena and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.arena), self.index))
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} {self.index}>'
+
+    @property
+    def start(self) -> Optional[int]:
+        return self.arena.span(self.index)[0]
+
+    @property
+    def end(self) -> Optional[int]:
+        return self.arena.span(self.index)[1]
+
+
+def _arguments(cls: type) -> Tuple[str, ...]:
+    return tuple(inspect.signature(cls.__init__).parameters)[1:]
+
+
+def _child_property(position: int) -> property:
+    def get(self):
+        return self.arena.view(self.arena.child(self.index, position))
+    return property(get)
+
+
+def _annotation_property(name: str) -> property:
+    def get(self):
+        return self.arena.annotations.get(name, {}).get(self.index)
+
+    def set(self, value):
+        self.arena.annotations.setdefault(name, {})[self.index] = value
+    return property(get, set)
+
+
+def _view_class(cls: type) -> type:
+    namespace = {'__slots__': (), 'children': cls.children, 'visit': cls.visit}
+    for position, name in enumerate(cls.children):
+        namespace[name] = _child_property(position)
+    for name in attribute_names(cls):
+        if name not in namespace and name not in ('start', 'end', 'spelling'):
+            namespace[name] = _annotation_property(name)
+    if issubclass(cls, Terminal):
+        namespace['spelling'] = property(lambda self: self.arena.spelling(self.index))
+    if hasattr(cls, 'is_parsed'):
+        namespace['is_parsed'] = True
+    view = type(cls.__name__ + 'View', (NodeView,), namespace)
+    cls.register(view)
+    return view
+
+
+_VIEWS: List[Optional[type]] = [None, None] + [_view_class(cls) for cls in NODE_CLASSES]
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import tempfile
+import weakref
+from typing import Dict, Optional, Union
+
+import serialization
+from abstract_tree import Program
+from parser import DEFAULT_SCANNER, Parser
+
+# Version of the trees the parser builds. Bump it whenever a change to the
+# scanners, the parser or the AST classes gives a different tree for the
+# same source, so entries of older versions are never read.
+COMPILER_VERSION = '1'
+
+DEFAULT_DIRECTORY = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                                 'custom_compiler', 'ast')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SUFFIX = '.ast'
+_STATISTICS = 'statistics.json'
+_COUNTERS = ('hits', 'misses', 'evictions')
+
+
+def _read_statistics(directory: str) -> Dict[str, int]:
+    totals = dict.fromkeys(_COUNTERS, 0)
+    try:
+        with open(os.path.join(directory, _STATISTICS)) as f:
+            saved = json.load(f)
+        for name in totals:
+            totals[name] = int(saved.get(name, 0))
+    except (OSError, ValueError, AttributeError, TypeError):
+        # Missing or damaged statistics start over from zero
+        pass
+    return totals
+
+
+def _flush_statistics(directory: str, pending: Dict[str, int]) -> None:
+    """
+    Adds the pending counts to the statistics file of a directory and sets
+    them back to zero.
+    """
+    if not any(pending.values()):
+        return
+    totals = _read_statistics(directory)
+    for name, count in pending.items():
+        totals[name] += count
+        pending[name] = 0
+    try:
+        descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'w') as f:
+            json.dump(totals, f)
+        os.replace(temporary, os.path.join(directory, _STATISTICS))
+    except OSError:
+        # Statistics are best effort; a failure must not fail the compilation
+        pass
+
+
+class AstCache:
+    """
+    Keeps the trees of parsed programs in a directory, one file per source in
+    the format of serialization.dump(). An entry is named after a hash of the
+    source bytes, of the parser class and of the compiler and format
+    versions, so a program is only scanned and parsed again when one of
+    them changes.
+
+    The entries take at most `max_bytes` together; when a new entry goes
+    over, the least recently used ones are removed. Reading an entry
+    updates its modification time, which is what the order is based on.
+
+    Hits, misses and evictions are counted in `hits`, `misses` and
+    `evictions` for this instance, and added up over all instances in a
+    statistics file in the directory, see statistics(). The file is only
+    written by flush(), which runs once more when the instance is collected
+    or the interpreter exits, so lookups cost no file writes.
+
+    Args:
+        directory: where entries are kept, created when missing
+        max_bytes: total size of the entries to keep
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        # Counts not yet added to the statistics file
+        self.__pending = dict.fromkeys(_COUNTERS, 0)
+        weakref.finalize(self, _flush_statistics, directory, self.__pending)
+
+    @staticmethod
+    def key(source: Union[str, bytes, bytearray, memoryview], parser_class=Parser) -> str:
+        """
+        Returns the name of the entry of a source parsed by parser_class.
+        Text and bytes get different entries, as their spans are counted in
+        characters and in bytes.
+        """
+        parser_name = f'{parser_class.__module__}.{parser_class.__qualname__}'
+        digest = hashlib.sha256(f'{COMPILER_VERSION}/{serialization.FORMAT_VERSION}/{parser_name}/'.encode())
+        if isinstance(source, str):
+            digest.update(b'str/')
+            digest.update(source.encode('utf-8', 'surrogatepass'))
+        else:
+            digest.update(b'bytes/')
+            digest.update(source)
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, source: Union[str, bytes, bytearray, memoryview], parser_class=Parser) -> Optional[Program]:
+        """
+        Returns the tree parser_class built for a source, or None when it is
+        not in the cache. An entry which can't be read counts as a miss and
+        is removed.
+        """
+        path = self.path(self.key(source, parser_class))
+        try:
+            with open(path, 'rb') as f:
+                program = serialization.load(f.read())
+        except FileNotFoundError:
+            program = None
+        except (OSError, ValueError):
+            program = None
+            self.__remove(path)
+        if program is None:
+            self.misses += 1
+            self.__pending['misses'] += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            # Removed by another process meanwhile; the tree was read anyway
+            pass
+        self.hits += 1
+        self.__pending['hits'] += 1
+        return program
+
+    def put(self, source: Union[str, bytes, bytearray, memoryview], program: Program, parser_class=Parser) -> None:
+        """
+        Stores the tree parser_class built for a source, then evicts entries
+        over the size limit.
+        """
+        data = serialization.dump(program)
+        path = self.path(self.key(source, parser_class))
+        # Written under another name first, so no reader sees half an entry
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            self.__remove(temporary)
+            raise
+        self.__evict(keep=path)
+
+    def parse(self, source: Union[str, bytes, bytearray, memoryview], scanner: str = DEFAULT_SCANNER,
+              parser_class=Parser, verbose: bool = True) -> Program:
+        """
+        Returns the tree of a source from the cache, or parses it with a
+        parser_class reading the SCANNERS backend and stores the tree.
+        Unless verbose, the parser reports nothing on stdout.
+        """
+        program = self.get(source, parser_class)
+        if program is None:
+            if isinstance(source, str):
+                parser = parser_class.from_string(source, scanner)
+            else:
+                parser = parser_class.from_bytes(source, scanner)
+            if not verbose:
+                parser.verbose = False
+            program = parser.parse_program()
+            self.put(source, program, parser_class)
+        return program
+
+    def statistics(self) -> Dict[str, int]:
+        """
+        Returns the hits, misses and evictions of this instance and of the
+        flushed instances using the directory, with the number of entries
+        and their total size.
+        """
+        self.flush()
+        totals = _read_statistics(self.directory)
+        entries = self.__entries()
+        totals['entries'] = len(entries)
+        totals['bytes'] = sum(size for _, size, _ in entries)
+        return totals
+
+    def flush(self) -> None:
+        """
+        Adds the counts of this instance since the last flush to the
+        statistics file.
+        """
+        _flush_statistics(self.directory, self.__pending)
+
+    def clear(self) -> None:
+        """
+        Removes all entries and the statistics.
+        """
+        for path, _, _ in self.__entries():
+            self.__remove(path)
+        self.__pending.update(dict.fromkeys(_COUNTERS, 0))
+        self.__remove(os.path.join(self.directory, _STATISTICS))
+
+    def __entries(self):
+        """
+        Returns the path, size and modification time of every entry.
+        """
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        return entries
+
+    def __evict(self, keep: str) -> None:
+        entries = self.__entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self.__remove(path)
+            total -= size
+            evicted += 1
+        if evicted:
+            self.evictions += evicted
+            self.__pending['evictions'] += evicted
+
+    @staticmethod
+    def __remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,42 @@
+"""
+Compares scanning and parsing generated programs with reading their trees
+from an AstCache, and measures the size of the cache entries.
+
+Usage: python -m benchmarks.bench_ast_cache [size in MB ...]
+"""
+import contextlib
+import io
+import sys
+import tempfile
+import time
+
+from ast_cache import AstCache
+from benchmarks.programs import generate_program
+from parser import Parser
+
+
+def best_of(function, repeat: int = 3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as directory:
+        cache = AstCache(directory)
+        for megabytes in sizes:
+            text = generate_program(int(megabytes * 1e6))
+            parse = best_of(lambda: Parser.from_string(text, 'regex').parse_program())
+            miss = best_of(lambda: (cache.clear(), cache.parse(text)))
+            hit = best_of(lambda: cache.parse(text))
+            entry = cache.statistics()['bytes']
+            print(f"{megabytes:>6} MB: parse {parse * 1e3:8.1f} ms, cache miss {miss * 1e3:8.1f} ms, "
+                  f"cache hit {hit * 1e3:8.1f} ms, entry {entry / 1e3:8.1f} kB")
+
+
+if __name__ == '__main__':
+    main([float(a) for a in sys.argv[1:]] or [0.25, 1])
@@ -0,0 +1,114 @@
+"""
+Measures the memory of the AST of generated programs in bytes per node,
+with the node classes of abstract_tree, which use __slots__, with the
+same attributes kept in a per-instance __dict__ as the classes did before,
+and in an AstArena.
+
+The trees are copies of the parsed tree made under tracemalloc, sharing
+its spellings and with lists of their own, so they differ only in the
+layout of the nodes. The arena holds its own table of the spellings.
+
+Usage: python -m benchmarks.bench_ast_memory [number of nodes ...]
+"""
+import contextlib
+import io
+import sys
+import tracemalloc
+
+from abstract_tree import AbstractSyntaxTree
+from abstract_tree.abstract_syntax_tree import attribute_names
+from ast_arena import AstArena
+from benchmarks.programs import generate_program
+from parser import Parser
+
+# Characters of a generated program per AST node, to aim at a node count
+CHARACTERS_PER_NODE = 3.4
+
+
+def copy_tree(program, make):
+    """
+    Copies a tree without recursion, creating every node with
+    make(node, attributes) once its children have been copied.
+    """
+    copies = {}
+    pending = [(program, False)]
+    while pending:
+        node, ready = pending.pop()
+        if node is None or id(node) in copies:
+            continue
+        if isinstance(node, list):
+            if ready:
+                copies[id(node)] = [copies[id(item)] for item in node]
+            else:
+                pending.append((node, True))
+                pending.extend((item, False) for item in node)
+        elif not ready:
+            pending.append((node, True))
+            pending.extend((getattr(node, name), False) for name in attribute_names(type(node))
+                           if isinstance(getattr(node, name), (AbstractSyntaxTree, list)))
+        else:
+            attributes = {}
+            for name in attribute_names(type(node)):
+                value = getattr(node, name)
+                attributes[name] = copies.get(id(value), value) if isinstance(value, (AbstractSyntaxTree, list)) else value
+            copies[id(node)] = make(node, attributes)
+    return copies[id(program)], sum(isinstance(node, AbstractSyntaxTree) for node in copies.values())
+
+
+def make_slotted(node, attributes):
+    copy = object.__new__(type(node))
+    for name, value in attributes.items():
+        setattr(copy, name, value)
+    return copy
+
+
+_DICT_CLASSES = {}
+
+
+def make_with_dict(node, attributes):
+    cls = _DICT_CLASSES.get(type(node))
+    if cls is None:
+        cls = _DICT_CLASSES[type(node)] = type(type(node).__name__, (), {})
+    copy = cls()
+    copy.__dict__.update(attributes)
+    return copy
+
+
+def measure(program, make):
+    """
+    Returns the number of nodes of a copy of the tree and the bytes the copy
+    takes.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # The bookkeeping of copy_tree is freed when it returns, the copy is kept
+    copy, nodes = copy_tree(program, make)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return nodes, size
+
+
+def measure_arena(program):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    arena = AstArena()
+    arena.add(program)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size
+
+
+def main(counts):
+    for count in counts:
+        with contextlib.redirect_stdout(io.StringIO()):
+            program = Parser.from_string(generate_program(int(count * CHARACTERS_PER_NODE)), 'regex').parse_program()
+        nodes, slotted = measure(program, make_slotted)
+        _, with_dict = measure(program, make_with_dict)
+        arena = measure_arena(program)
+        print(f"{nodes:>9} nodes: __dict__ {with_dict / nodes:6.1f} B/node {with_dict / 1e6:8.1f} MB, "
+              f"__slots__ {slotted / nodes:6.1f} B/node {slotted / 1e6:8.1f} MB ({slotted / with_dict:.0%}), "
+              f"AstArena {arena / nodes:6.1f} B/node {arena / 1e6:8.1f} MB ({arena / with_dict:.0%})")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
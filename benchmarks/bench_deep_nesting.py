@@ -0,0 +1,43 @@
+"""
+Measures the parse time of deeply nested programs with StackParser, which
+keeps its pending productions on an explicit stack, and with the recursive
+Parser, which fails once the nesting outgrows the recursion limit.
+
+Usage: python -m benchmarks.bench_deep_nesting [depth ...]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from parser import Parser
+from stack_parser import StackParser
+
+SHAPES = {
+    'if': lambda depth: 'int a ~ 1;\n' + 'if (a):\n' * depth + 'a ~ a - 1;\n' + 'end\n' * depth,
+    'while': lambda depth: 'int a ~ 1;\n' + 'while (a):\n' * depth + 'a ~ a - 1;\n' + 'end\n' * depth,
+    'unary': lambda depth: 'int a ~ ' + '- ' * depth + '1;\n',
+    'call': lambda depth: 'f(' * depth + '1' + ')' * depth + ';\n',
+}
+
+
+def measure(parser_class, text: str) -> str:
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser_class.from_string(text, 'stream').parse_program()
+    except RecursionError:
+        return '  RecursionError'
+    return f"{(time.perf_counter() - start) * 1e3:12.1f} ms"
+
+
+def main(depths):
+    for depth in depths:
+        for shape, generate in SHAPES.items():
+            text = generate(depth)
+            print(f"depth {depth:>7} {shape:<6}: stack {measure(StackParser, text)}, "
+                  f"recursive {measure(Parser, text)}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,72 @@
+"""
+Measures the cost of dispatching a visitor to a node in nanoseconds per
+node, over all nodes of generated programs: double dispatch through
+node.visit(), which looks the visitor method up by name, against a
+DispatchTable of the visitor class. The visitor methods do nothing, so
+only dispatch is timed.
+
+Also times a whole traversal of the tree, by an empty Walker and by
+abstract_tree.walker.walk().
+
+Usage: python -m benchmarks.bench_dispatch [size in MB ...]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from abstract_tree.visitor import Visitor
+from abstract_tree.walker import Walker, dispatch_table, walk
+from benchmarks.programs import generate_program
+from parser import Parser
+
+
+def _nothing(self, node, *args):
+    return None
+
+
+# A visitor whose methods do nothing
+NoOpVisitor = type('NoOpVisitor', (Visitor,), {name: _nothing for name in Visitor.__abstractmethods__})
+
+
+class NoOpWalker(Walker):
+    pass
+
+
+def double_dispatch(nodes, visitor):
+    for node in nodes:
+        node.visit(visitor)
+
+
+def table_dispatch(nodes, visitor):
+    table = dispatch_table(type(visitor))
+    for node in nodes:
+        table[type(node)](visitor, node)
+
+
+def best_time(function, *args, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes):
+    for megabytes in sizes:
+        with contextlib.redirect_stdout(io.StringIO()):
+            program = Parser.from_string(generate_program(int(megabytes * 1e6)), 'regex').parse_program()
+        nodes = list(walk(program))
+        visitor = NoOpVisitor()
+        double = best_time(double_dispatch, nodes, visitor) / len(nodes)
+        table = best_time(table_dispatch, nodes, visitor) / len(nodes)
+        walker = best_time(NoOpWalker().visit, program) / len(nodes)
+        walking = best_time(lambda: sum(1 for _ in walk(program))) / len(nodes)
+        print(f"{megabytes:>6} MB {len(nodes):>9} nodes: node.visit {double * 1e9:6.1f} ns/node, "
+              f"table {table * 1e9:6.1f} ns/node ({table / double:.0%}); "
+              f"traversal: Walker {walker * 1e9:6.1f} ns/node, walk {walking * 1e9:6.1f} ns/node")
+
+
+if __name__ == '__main__':
+    main([float(a) for a in sys.argv[1:]] or [0.1, 1])
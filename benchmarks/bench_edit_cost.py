@@ -0,0 +1,51 @@
+"""
+Measures the cost of an insertion near the start of programs of growing
+size, where the spans of almost every node and token come after the edit:
+the time of TokenStream.edit() alone and of incremental_parser.reparse(),
+which both shift them lazily and should not grow with the file, and of
+incremental_parser.settle() applying the shifts once after all edits.
+
+Usage: python -m benchmarks.bench_edit_cost [size in MB ...]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from benchmarks.programs import generate_program
+from incremental_parser import reparse, settle
+from parser import Parser
+from token_stream import TokenStream
+
+
+def main(sizes):
+    for megabytes in sizes:
+        text = generate_program(int(megabytes * 1e6))
+        # Insert into the multiplier in the body of the first function
+        offset = text.index('* 2') + 2
+        edits = 50
+        with contextlib.redirect_stdout(io.StringIO()):
+            stream = TokenStream.from_buffer(text)
+            program = Parser(stream.cursor()).parse_program()
+
+            edited = stream
+            start = time.perf_counter()
+            for _ in range(edits):
+                edited = edited.edit(offset, 0, '1')
+            relex = (time.perf_counter() - start) / edits
+
+            start = time.perf_counter()
+            for _ in range(edits):
+                program, stream = reparse(program, stream, offset, 0, '1')
+            update = (time.perf_counter() - start) / edits
+
+            start = time.perf_counter()
+            settle(program)
+            settled = time.perf_counter() - start
+
+        print(f"{megabytes:>6} MB, {len(stream):>8} tokens: TokenStream.edit {relex * 1e3:6.2f} ms, "
+              f"reparse {update * 1e3:6.2f} ms per edit, settle {settled * 1e3:8.1f} ms once")
+
+
+if __name__ == '__main__':
+    main([float(a) for a in sys.argv[1:]] or [0.1, 1, 4])
@@ -0,0 +1,92 @@
+"""
+Measures IdentificationTable in nanoseconds per operation as the number of
+declarations grows: inserting that many globals and looking each of them
+up, then opening as many nested scopes with one declaration each, looking
+up a global from the innermost one and closing them all.
+
+For comparison, the same is timed with the table as it was before, a list
+of entries searched from the end, up to LINEAR_LIMIT declarations as its
+time grows with the square of their number.
+
+Usage: python -m benchmarks.bench_identification_table [declarations ...]
+"""
+import sys
+import time
+
+from abstract_tree import Identifier, TypeIndicator, VarDeclaration
+from identification_table import IdEntry, IdentificationTable
+
+LINEAR_LIMIT = 10_000
+
+
+class LinearTable:
+    """
+    The table before it had stacks: every lookup searches the entries from
+    the innermost, and closing a scope pops them one by one.
+    """
+
+    def __init__(self):
+        self.table = []
+        self.level = 0
+
+    def _find(self, identifier):
+        for i in reversed(range(len(self.table))):
+            if self.table[i].identifier == identifier:
+                return self.table[i]
+        return None
+
+    def insert(self, identifier, attr):
+        entry = self._find(identifier)
+        if entry and entry.level == self.level:
+            raise Exception(f"{entry.identifier} was identified twice")
+        self.table.append(IdEntry(level=self.level, identifier=identifier, attr=attr))
+
+    def get(self, identifier):
+        entry = self._find(identifier)
+        return entry.attr if entry else None
+
+    def openScope(self):
+        self.level += 1
+
+    def closeScope(self):
+        pos = len(self.table) - 1
+        while pos >= 0 and self.table[pos].level == self.level:
+            self.table.pop(pos)
+            pos -= 1
+        self.level -= 1
+
+
+def run(table, names, declaration) -> float:
+    """
+    Returns the time per operation of the globals and nested scopes above.
+    """
+    start = time.perf_counter()
+    table.openScope()
+    for name in names:
+        table.insert(name, declaration)
+    for name in names:
+        table.get(name)
+    for name in names:
+        table.openScope()
+        table.insert(name, declaration)
+        table.get(names[0])
+    for _ in names:
+        table.closeScope()
+    table.closeScope()
+    return (time.perf_counter() - start) / (6 * len(names))
+
+
+def main(counts):
+    declaration = VarDeclaration(TypeIndicator('int'), Identifier('a'))
+    for count in counts:
+        names = [f'variable{i}' for i in range(count)]
+        hashed = run(IdentificationTable(), names, declaration)
+        if count <= LINEAR_LIMIT:
+            linear = f"{run(LinearTable(), names, declaration) * 1e9:10.1f} ns/op"
+        else:
+            linear = f"{'-':>16}"
+        print(f"{count:>9} declarations: IdentificationTable {hashed * 1e9:8.1f} ns/op, list {linear}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 10_000, 100_000, 1_000_000])
@@ -0,0 +1,51 @@
+"""
+Measures the time to check a program again with an IncrementalChecker after
+an edit inside one function body, updated by incremental_parser.reparse(),
+against checking it again with the Checker. The program declares a global
+and a number of functions of 10 lines, each calling the one before it.
+
+Usage: python -m benchmarks.bench_incremental_checker [functions ...]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from benchmarks.programs import generate_functions
+from checker import Checker
+from incremental_checker import IncrementalChecker
+from incremental_parser import reparse
+from parser import Parser
+from token_stream import TokenStream
+
+
+def main(counts):
+    for count in counts:
+        text = 'int g ~ 1;\n' + generate_functions(count, lines=10)
+        with contextlib.redirect_stdout(io.StringIO()):
+            stream = TokenStream.from_buffer(text)
+            program = Parser(stream.cursor()).parse_program()
+            checker = IncrementalChecker()
+            checker.check(program, stream.buffer)
+
+            # Edit the multiplier of a line in a function in the middle
+            offset = text.index('* x', len(text) // 2) - 1
+            edits = 20
+            best = float('inf')
+            for i in range(edits):
+                program, stream = reparse(program, stream, offset, 1, str(i % 10))
+                start = time.perf_counter()
+                checker.check(program, stream.buffer)
+                best = min(best, time.perf_counter() - start)
+            assert len(checker.rechecked) == 1
+
+            start = time.perf_counter()
+            Checker().check(program)
+            full = time.perf_counter() - start
+
+        print(f"{count:>6} functions, {text.count(chr(10))} lines: incremental {best * 1e3:7.2f} ms, "
+              f"full {full * 1e3:8.1f} ms ({full / best:.0f}x)")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,50 @@
+"""
+Measures parse time and peak memory of the AST of generated programs
+which declare many functions and call only a few, with Parser and with
+LazyParser, before and after checking with a Checker which drops the
+bodies that are never called.
+
+Usage: python -m benchmarks.bench_lazy_parser [size in MB ...]
+"""
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+
+from benchmarks.programs import generate_library
+from checker import Checker
+from lazy_parser import LazyParser
+from parser import Parser
+from token_stream import TokenStream
+
+
+def measure(parser_class, stream: TokenStream, repeat: int = 3):
+    best = float('inf')
+    for _ in range(repeat):
+        parser = parser_class(stream.cursor())
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.parse_program()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        program = parser_class(stream.cursor()).parse_program()
+        Checker(drop_uncalled=True).check(program)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(sizes):
+    for megabytes in sizes:
+        stream = TokenStream.from_buffer(generate_library(int(megabytes * 1e6)))
+        eager, eager_peak = measure(Parser, stream)
+        lazy, lazy_peak = measure(LazyParser, stream)
+        print(f"{megabytes:>6} MB {len(stream):>8} tokens: Parser {eager * 1e3:8.1f} ms {eager_peak / 1e6:7.1f} MB, "
+              f"LazyParser {lazy * 1e3:8.1f} ms {lazy_peak / 1e6:7.1f} MB")
+
+
+if __name__ == '__main__':
+    main([float(a) for a in sys.argv[1:]] or [0.25, 1])
@@ -0,0 +1,39 @@
+"""
+Measures the throughput of scan_parallel() in MB/s with a growing number of
+worker processes, against TokenStream.from_buffer() in a single process.
+
+Usage: python -m benchmarks.bench_parallel_scanner [size in MB ...]
+"""
+import os
+import sys
+import time
+
+from benchmarks.programs import generate_program
+from parallel_scanner import scan_parallel
+from token_stream import TokenStream
+
+
+def measure(scan, text: str, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scan(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text) / best / 1e6
+
+
+def main(sizes):
+    cpus = os.cpu_count() or 1
+    counts = [n for n in (2, 4, 8, 16, 32) if n <= cpus] or [2]
+    for megabytes in sizes:
+        text = generate_program(int(megabytes * 1e6))
+        single = measure(TokenStream.from_buffer, text)
+        results = []
+        for workers in counts:
+            parallel = measure(lambda t: scan_parallel(t, workers, threshold=0), text)
+            results.append(f"{workers} workers {parallel:6.2f} MB/s ({parallel / single:.2f}x)")
+        print(f"{megabytes:>6} MB: 1 process {single:6.2f} MB/s, " + ', '.join(results))
+
+
+if __name__ == '__main__':
+    main([float(a) for a in sys.argv[1:]] or [4, 20])
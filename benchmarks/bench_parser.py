@@ -0,0 +1,44 @@
+"""
+Measures parser throughput in tokens per second on generated programs,
+parsing from an already tokenized TokenStream so that scanning is not
+counted, with the recursive Parser, with StackParser and with the
+table-driven TableParser.
+
+Usage: python -m benchmarks.bench_parser [size in MB ...]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from benchmarks.programs import generate_expressions, generate_program
+from parser import Parser
+from stack_parser import StackParser
+from table_parser import TableParser
+from token_stream import TokenStream
+
+
+def measure(make_parser, stream: TokenStream, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        parser = make_parser(stream)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.parse_program()
+        best = min(best, time.perf_counter() - start)
+    return len(stream) / best
+
+
+def main(sizes):
+    for megabytes in sizes:
+        for name, generate in (('program', generate_program), ('expressions', generate_expressions)):
+            stream = TokenStream.from_buffer(generate(int(megabytes * 1e6)))
+            speed = measure(lambda s: Parser(s.cursor()), stream)
+            stack = measure(lambda s: StackParser(s.cursor()), stream)
+            table = measure(lambda s: TableParser(s.cursor()), stream)
+            print(f"{megabytes:>6} MB {name:<12} {len(stream):>8} tokens: {speed / 1e3:8.1f} k tokens/s, "
+                  f"StackParser {stack / 1e3:8.1f} k tokens/s, TableParser {table / 1e3:8.1f} k tokens/s")
+
+
+if __name__ == '__main__':
+    main([float(a) for a in sys.argv[1:]] or [1, 4])
@@ -0,0 +1,38 @@
+"""
+Measures the time to update a TokenStream after a one-character edit with
+TokenStream.edit(), against tokenizing the edited source again.
+
+Usage: python -m benchmarks.bench_relex [lines ...]
+"""
+import random
+import sys
+import time
+
+from benchmarks.programs import generate_program
+from token_stream import TokenStream
+
+
+def main(line_counts):
+    rng = random.Random(0)
+    for lines in line_counts:
+        # Generated programs have about 22 characters per line
+        text = generate_program(lines * 22)
+        stream = TokenStream.from_buffer(text)
+        edits = [(rng.randrange(len(text)), rng.choice('a1 ;#\n')) for _ in range(20)]
+
+        start = time.perf_counter()
+        for offset, char in edits:
+            stream.edit(offset, 0, char)
+        incremental = (time.perf_counter() - start) / len(edits)
+
+        start = time.perf_counter()
+        for offset, char in edits[:3]:
+            TokenStream.from_buffer(text[:offset] + char + text[offset:])
+        full = (time.perf_counter() - start) / 3
+
+        print(f"{text.count(chr(10)):>8} lines, {len(stream)} tokens: edit {incremental * 1e3:7.2f} ms, "
+              f"rescan {full * 1e3:8.2f} ms ({full / incremental:.1f}x)")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [5000, 50000])
@@ -0,0 +1,55 @@
+"""
+Measures the time to update a parsed program after an edit inside a
+function body with incremental_parser.reparse(), against scanning and
+parsing the edited source again, for a replacement of the same length
+and for an insertion, which shifts the spans of every node and token after
+it. Those shifts are left pending, see bench_edit_cost for what applying
+them costs.
+
+Usage: python -m benchmarks.bench_reparse [size in MB ...]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from benchmarks.programs import generate_program
+from incremental_parser import reparse
+from parser import Parser
+from token_stream import TokenStream
+
+
+def parse(text: str):
+    stream = TokenStream.from_buffer(text)
+    return Parser(stream.cursor()).parse_program(), stream
+
+
+def main(sizes):
+    for megabytes in sizes:
+        text = generate_program(int(megabytes * 1e6))
+        with contextlib.redirect_stdout(io.StringIO()):
+            program, stream = parse(text)
+            # Edit the multiplier in the body of a function in the middle
+            offset = text.index('* 2', len(text) // 2) + 2
+            edits = 20
+            start = time.perf_counter()
+            for i in range(edits):
+                program, stream = reparse(program, stream, offset, 1, str(i % 10))
+            replace = (time.perf_counter() - start) / edits
+
+            start = time.perf_counter()
+            for i in range(edits):
+                program, stream = reparse(program, stream, offset, 0, '1')
+            insert = (time.perf_counter() - start) / edits
+
+            start = time.perf_counter()
+            parse(stream.buffer)
+            full = time.perf_counter() - start
+
+        print(f"{megabytes:>6} MB, {len(stream)} tokens: replace {replace * 1e3:7.2f} ms, "
+              f"insert {insert * 1e3:7.2f} ms, full parse {full * 1e3:8.1f} ms "
+              f"({full / replace:.0f}x, {full / insert:.0f}x)")
+
+
+if __name__ == '__main__':
+    main([float(a) for a in sys.argv[1:]] or [0.1, 1, 4])
@@ -0,0 +1,129 @@
+"""
+Measures scanner throughput in MB/s.
+
+Compares the original SourceFile, which called read(1) once per character,
+with the buffered SourceFile that loads the whole file and scans it by an
+integer offset (and maps files above SourceFile.MMAP_THRESHOLD), and with
+the RegexScanner backend.
+
+Usage: python -m benchmarks.bench_scanner [size in MB ...]
+"""
+import os
+import sys
+import time
+
+from benchmarks.programs import generate_program, write_program
+from regex_scanner import RegexScanner
+from scanner import Scanner, SourceFile
+from tokens import Kind
+
+try:
+    from numpy_scanner import scan_arrays
+except ImportError:
+    scan_arrays = None
+
+
+class ReadOneScanner(Scanner):
+    """
+    The scanner before buffering, kept as a baseline: every character is
+    read from the file with read(1) and taken one at a time.
+    """
+
+    def __init__(self, filename):
+        self.file = open(filename, 'r')
+        self.current_spelling = []
+        self.current_char = self.file.read(1)
+        self.offset = 0
+        self.line = 1
+        self.column = 0
+
+    @property
+    def current_offset(self) -> int:
+        return self.offset
+
+    def scan_token(self) -> Kind:
+        if self.current_char.isalpha():
+            self.take_it()
+            while self.current_char.isalpha() or self.current_char.isdigit():
+                self.take_it()
+            return Kind.IDENTIFIER
+        elif self.current_char.isdigit():
+            self.take_it()
+            while self.current_char.isdigit():
+                self.take_it()
+            return Kind.INTEGER_LITERAL
+        elif self.current_char == SourceFile.EOT:
+            self.file.close()
+            return Kind.EOT
+        return super().scan_token()
+
+    def discard_separator(self):
+        if self.current_char == '#':
+            self.take_it()
+            while self.current_char not in [SourceFile.EOL, SourceFile.EOT]:
+                self.take_it()
+            if self.current_char == SourceFile.EOL:
+                self.take_it()
+        else:
+            self.take_it()
+
+    def take_it(self):
+        self.current_spelling.append(self.current_char)
+        self.current_char = str(self.file.read(1))
+        self.offset += 1
+        if self.current_char == '\n':
+            self.line = self.line + 1
+            self.column = 0
+        else:
+            self.column = self.column + 1
+
+
+def scan_all(scanner: Scanner) -> int:
+    count = 0
+    while scanner.scan().kind is not Kind.EOT:
+        count += 1
+    return count
+
+
+def measure(make_scanner, path: str, repeat: int = 3) -> float:
+    size = os.path.getsize(path)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scan_all(make_scanner(path))
+        best = min(best, time.perf_counter() - start)
+    return size / best / 1e6
+
+
+def measure_arrays(path: str, repeat: int = 3) -> float:
+    size = os.path.getsize(path)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        source = SourceFile(path)
+        scan_arrays(source.buffer)
+        source.close()
+        best = min(best, time.perf_counter() - start)
+    return size / best / 1e6
+
+
+def main(sizes):
+    for megabytes in sizes:
+        path = write_program(generate_program(int(megabytes * 1e6)))
+        try:
+            before = measure(ReadOneScanner, path)
+            after = measure(Scanner, path)
+            regex = measure(RegexScanner, path)
+            mapped = os.path.getsize(path) >= SourceFile.MMAP_THRESHOLD
+            print(f"{megabytes:>6} MB: read(1) {before:6.2f} MB/s, "
+                  f"{'mmap' if mapped else 'buffered'} {after:6.2f} MB/s "
+                  f"({after / before:.2f}x), regex {regex:6.2f} MB/s ({regex / before:.2f}x)")
+            if scan_arrays is not None:
+                vectorized = measure_arrays(path)
+                print(f"{'':>6}     numpy {vectorized:6.2f} MB/s ({vectorized / before:.2f}x)")
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main([float(a) for a in sys.argv[1:]] or [1, 4, 20])
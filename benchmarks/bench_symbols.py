@@ -0,0 +1,78 @@
+"""
+Measures what the Encoder does for every use of a variable, in nanoseconds
+per use: loading a variable through its symbol, reading the level,
+displacement and size from the columns of the SymbolTable, against loading
+it as before, through the Address and TypeIndicator of its declaration,
+whose size is looked up in a dictionary by spelling.
+
+The code store holds 1024 instructions, so the uses are encoded in batches
+of 1000.
+
+Usage: python -m benchmarks.bench_symbols [batches]
+"""
+import sys
+import time
+
+from TAM.machine import Machine
+from abstract_tree import Identifier, TypeIndicator, VarDeclaration, VarExpression
+from address import Address
+from encoder import Encoder
+
+BATCH = 1000
+
+
+class DeclarationEncoder(Encoder):
+    """
+    Loads variables through their declarations, as the Encoder did before
+    symbols.
+    """
+
+    def visit_var_expression(self, ve, *args):
+        value_needed = args[0]
+        declaration = self.symbols.declarations[ve.symbol]
+        address = declaration.address
+        register = self._Encoder__display_register(self.current_level, address.level)
+        size = self.visit_type_indicator(declaration.type_indicator, None)
+        if value_needed:
+            self._Encoder__emit(Machine.LOADop, size, register, address.displacement)
+        return address
+
+
+def run(encoder: Encoder, batches: int) -> float:
+    """
+    Returns the best time per use of loading variables of two levels.
+    """
+    uses = []
+    for level in (0, 1):
+        declaration = VarDeclaration(TypeIndicator('int'), Identifier(f'v{level}'))
+        declaration.address = Address(level, 3)
+        declaration.symbol = encoder.symbols.add(declaration)
+        encoder.symbols.allocate(declaration.symbol, level, 3)
+        expression = VarExpression(Identifier(f'v{level}'))
+        expression.symbol = declaration.symbol
+        uses.append(expression)
+    uses = uses * (BATCH // 2)
+    encoder.current_level = 1
+
+    visit = encoder.visit_var_expression
+    best = float('inf')
+    for _ in range(batches):
+        encoder.next_address = Machine.CB
+        start = time.perf_counter()
+        for expression in uses:
+            visit(expression, True)
+        best = min(best, time.perf_counter() - start)
+    return best / len(uses)
+
+
+def main(batches: int):
+    Machine.code = [None] * Machine.PB
+    symbols = declarations = float('inf')
+    for _ in range(5):
+        symbols = min(symbols, run(Encoder(), batches))
+        declarations = min(declarations, run(DeclarationEncoder(), batches))
+    print(f"symbols {symbols * 1e9:7.1f} ns/use, declarations {declarations * 1e9:7.1f} ns/use")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
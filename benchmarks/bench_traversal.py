@@ -0,0 +1,65 @@
+"""
+Measures the Checker and the Encoder, which visit trees with the explicit
+stack of abstract_tree.traversal.Traversal, in nodes per second: on a small
+program of long expressions, encoded many times as the TAM code store
+holds 1024 instructions, and on chains `a + a + ... + a` of the given
+lengths, whose BinaryExpression spines are as deep. The chains are in
+statements whose value is not needed, so the Encoder emits no code for
+them.
+
+Usage: python -m benchmarks.bench_traversal [chain length ...]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from abstract_tree.walker import walk
+from benchmarks.programs import generate_expressions
+from checker import Checker
+from encoder import Encoder
+from parser import Parser
+
+
+def parse(text: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Parser.from_string(text, 'regex').parse_program()
+
+
+def measure(program, repeat: int):
+    """
+    Returns the best time of checking the program and of encoding it.
+    """
+    check = encode = float('inf')
+    output = io.StringIO()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Checker().check(program)
+        check = min(check, time.perf_counter() - start)
+        encoder = Encoder()
+        with contextlib.redirect_stdout(output):
+            start = time.perf_counter()
+            encoder.encode(program)
+            encode = min(encode, time.perf_counter() - start)
+        output.seek(0)
+        output.truncate()
+    return check, encode
+
+
+def report(name: str, program, repeat: int) -> None:
+    nodes = sum(1 for _ in walk(program))
+    check, encode = measure(program, repeat)
+    print(f"{name:<24} {nodes:>8} nodes: Checker {nodes / check / 1e3:8.1f} k nodes/s, "
+          f"Encoder {nodes / encode / 1e3:8.1f} k nodes/s")
+
+
+def main(lengths):
+    report('expressions', parse(generate_expressions(1500)), 200)
+    for length in lengths:
+        text = 'int a ~ 1;\nif (a):\n    ' + ' + '.join(['a'] * length) + ';\nelse:\n    a ~ 0;\nend\n'
+        report(f'chain of {length}', parse(text), 3)
+    print(f"recursion limit: {sys.getrecursionlimit()}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 10_000, 100_000])
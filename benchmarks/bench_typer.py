@@ -0,0 +1,42 @@
+"""
+Measures the time the Typer takes to infer the type of every expression of
+a checked program, against the time the Checker takes to check it, in
+nanoseconds per node. The program declares a global and a number of
+functions of 10 lines, each calling the one before it.
+
+Usage: python -m benchmarks.bench_typer [functions ...]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from abstract_tree.walker import walk
+from benchmarks.programs import generate_functions
+from checker import Checker
+from parser import Parser
+from typer import Typer
+
+
+def main(counts):
+    for count in counts:
+        text = 'int g ~ 1;\n' + generate_functions(count, lines=10) + f'g ~ f{count - 1}(g);\n'
+        with contextlib.redirect_stdout(io.StringIO()):
+            program = Parser.from_string(text, 'stream').parse_program()
+        nodes = sum(1 for _ in walk(program))
+
+        check = infer = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            Checker().check(program)
+            check = min(check, time.perf_counter() - start)
+            start = time.perf_counter()
+            Typer().infer(program)
+            infer = min(infer, time.perf_counter() - start)
+
+        print(f"{count:>6} functions, {nodes} nodes: typer {infer / nodes * 1e9:6.0f} ns/node, "
+              f"checker {check / nodes * 1e9:6.0f} ns/node")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,93 @@
+"""
+Generators of synthetic source programs used by the benchmarks.
+"""
+import os
+import tempfile
+
+_FUNCTION = """\
+func helper{n}(a{n}, b{n}):
+    # accumulate into the globals
+    int local{n} ~ a{n} * 2 + b{n} - 7;
+    while (local{n}):
+        local{n} ~ local{n} - 1;
+    end
+    return local{n}
+end
+
+"""
+
+_STATEMENT = """\
+int value{n} ~ {n} + {n} * 3;
+if (value{n}):
+    value{n} ~ helper{f}(value{n}, {n});
+else:
+    value{n} ~ 0;
+end
+"""
+
+
+def generate_program(size: int) -> str:
+    """
+    Returns a program of roughly `size` characters made of function
+    declarations followed by statements calling them.
+    """
+    parts = []
+    length = 0
+    n = 0
+    while length < size:
+        part = _FUNCTION.format(n=n) + _STATEMENT.format(n=n, f=n)
+        parts.append(part)
+        length += len(part)
+        n += 1
+    return ''.join(parts)
+
+
+def write_program(text: str) -> str:
+    """
+    Writes a generated program into a temporary file and returns its path.
+    """
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    return path
+
+
+def generate_expressions(size: int) -> str:
+    """
+    Returns a program of roughly `size` characters made of assignments of
+    long arithmetic expressions over a few globals.
+    """
+    header = 'int a ~ 1;\nint b ~ 2;\nint c ~ 3;\n'
+    statement = 'a ~ a + b * c - 4 / b + c * 5 - a * b + 6 - - c;\n'
+    return header + statement * max(1, (size - len(header)) // len(statement))
+
+
+def generate_library(size: int, calls: int = 3) -> str:
+    """
+    Returns a program of roughly `size` characters made of function
+    declarations, of which only the first `calls` are called.
+    """
+    parts = ['int a ~ 1;\nint b ~ 2;\n']
+    length = len(parts[0])
+    n = 0
+    while length < size:
+        part = _FUNCTION.format(n=n).replace(f'(a{n}, b{n})', '(a, b)').replace(f'a{n}', 'a').replace(f'b{n}', 'b')
+        parts.append(part)
+        length += len(part)
+        n += 1
+    parts.extend(f'a ~ helper{i}(a, b);\n' for i in range(min(calls, n)))
+    return ''.join(parts)
+
+
+def generate_functions(count: int, lines: int = 3, name: str = 'f') -> str:
+    """
+    Returns the declarations of `count` functions of `lines` local
+    variables over a global `g`, each calling the one before it, which the
+    Checker accepts once `g` is declared.
+    """
+    parts = []
+    for i in range(count):
+        body = ''.join(f'    int x{k} ~ g + {k} * x{k - 1};\n' for k in range(1, lines))
+        call = f'    x0 ~ {name}{i - 1}(1);\n' if i else ''
+        parts.append(f'func {name}{i}(1):\n    int x0 ~ g;\n{body}{call}    return x0\nend\n')
+    return ''.join(parts)
@@ -8,25 +8,53 @@ from typing import List
 # from abstract_tree.program import Program
 # from abstract_tree.statements import IfStatement, ExpressionStatement, WhileStatement, ReturnStatement
 # from abstract_tree.terminals import BooleanLiteral, Identifier, IntegerLiteral, Operator, TypeIndicator
+from abstract_tree.traversal import Traversal
 from abstract_tree.visitor import Visitor
 from abstract_tree import *
 from exceptions import UndeclaredVariableException, InvalidOperatorException
 from expression_type import ExpressionType
 from identification_table import IdentificationTable
+from symbols import SymbolTable
 from tokens import ADDOPS, MULOPS, ASSIGNOPS
 
+_UNARY_OPERATORS = ADDOPS + MULOPS
 
-class Checker(Visitor):
-    def __init__(self):
+
+class Checker(Traversal, Visitor):
+    """
+    Checks the declarations and expressions of a program. It is a
+    Traversal, so programs of any depth can be checked; terminals are
+    visited by calling their visit method directly.
+
+    Every declaration gets a symbol in `symbols`, which the expressions
+    using it store instead of the declaration; the table is left in
+    Program.symbols for the Encoder.
+
+    A body LazyParser left unparsed is parsed and checked in the scope it
+    was declared in when it is first called, or else when that scope is
+    closed, so a program is accepted or rejected as if it was parsed up
+    front. With drop_uncalled, bodies which are never called stay unparsed
+    instead: their errors are not reported and the Encoder emits no code
+    for them.
+    """
+
+    def __init__(self, drop_uncalled: bool = False):
         self.idTable = IdentificationTable()
+        self.symbols = SymbolTable()
+        self.drop_uncalled = drop_uncalled
+        # Functions whose bodies are not parsed yet, with the scope they
+        # are checked in once they are called
+        self.deferred = {}
+        # The functions left unparsed in each open scope, innermost last
+        self.unparsed: List[List[FuncDeclaration]] = []
 
     def check(self, p: Program):
-        p.visit(self)
+        self.traverse(p)
 
     def visit_binary_expression(self, be: BinaryExpression, *args) -> ExpressionType:
-        t1: ExpressionType = be.expression1.visit(self)
-        _: ExpressionType = be.expression2.visit(self)
-        operator = be.operator.visit(self)
+        t1: ExpressionType = yield be.expression1
+        _: ExpressionType = yield be.expression2
+        operator = self.visit_operator(be.operator)
 
         if operator in ASSIGNOPS and t1.is_rvalue:
             raise Exception("Left-hand side of the expression must be a variable.")
@@ -34,8 +62,8 @@ class Checker(Visitor):
         return ExpressionType(True)
 
     def visit_call_expression(self, ce: CallExpression, *args):
-        func_name: str = ce.name.visit(self)
-        types: List[ExpressionType] = ce.args.visit(self)
+        func_name: str = self.visit_identifier(ce.name)
+        types: List[ExpressionType] = (yield ce.args) if ce.args is not None else []
         declaration = self.idTable.get(func_name)
 
         if not declaration:
@@ -43,36 +71,39 @@ class Checker(Visitor):
 
         if isinstance(declaration, FuncDeclaration):
             fd: FuncDeclaration = declaration
-            ce.declaration = fd
-            if len(types) != len(fd.args.expressions):
-                raise Exception(f"Function {func_name} expects {len(fd.args.expressions)} number of arguments.")
+            ce.symbol = fd.symbol
+            expected = len(fd.args.expressions) if fd.args is not None else 0
+            if len(types) != expected:
+                raise Exception(f"Function {func_name} expects {expected} number of arguments.")
+            if fd in self.deferred:
+                yield from self._check_deferred(fd)
         else:
             raise Exception(f"{func_name} is not callable.")
 
         return ExpressionType(False)
 
     def visit_unary_expression(self, ue: UnaryExpression, *args) -> ExpressionType:
-        ue.expression.visit(self)
-        operator = ue.operator.visit(self)
+        yield ue.expression
+        operator = self.visit_operator(ue.operator)
 
-        if operator not in ADDOPS + MULOPS:
+        if operator not in _UNARY_OPERATORS:
             raise InvalidOperatorException(f"Operator {operator} is not allowed here.")
         return ExpressionType(True)
 
     def visit_boolean_literal_expression(self, be: BooleanLiteralExpression, *args) -> ExpressionType:
-        be.literal.visit(self)
+        self.visit_boolean_literal(be.literal)
         return ExpressionType(True)
 
     def visit_int_literal_expression(self, ie: IntLiteralExpression, *args) -> ExpressionType:
-        ie.literal.visit(self)
+        self.visit_integer_literal(ie.literal)
         return ExpressionType(True)
 
     def visit_var_expression(self, ve: VarExpression, *args) -> ExpressionType:
-        identifier: str = ve.name.visit(self)
+        identifier: str = self.visit_identifier(ve.name)
         declaration = self.idTable.get(identifier)
 
         if declaration:
-            ve.declaration = declaration
+            ve.symbol = declaration.symbol
             return ExpressionType(False)
         else:
             raise UndeclaredVariableException(f"Variable {identifier} is not defined.")
@@ -81,81 +112,124 @@ class Checker(Visitor):
         types: List[ExpressionType] = []
 
         for a in al.expressions:
-            types.append(a.visit(self))
+            types.append((yield a))
 
         return types
 
     def visit_expression_list(self, el: ExpressionList, *args) -> None:
         for expression in el.expressions:
-            expression.visit(self)
+            yield expression
         return None
 
     def visit_program(self, p: Program, *args) -> object:
+        p.symbols = self.symbols
         self.idTable.openScope()
-        p.command_list.visit(self)
+        self.unparsed.append([])
+        yield p.command_list
+        yield from self._check_uncalled()
         self.idTable.closeScope()
         return None
 
     def visit_command_list(self, c: CommandList, *args) -> object:
         for command in c.commands:
-            command.visit(self)
+            yield command
         return None
 
     def visit_declaration_command(self, dc: DeclarationCommand, *args) -> object:
         for declaration in dc.declaration_list.declarations:
-            declaration.visit(self, )
+            yield declaration
         return None
 
     def visit_statement_command(self, sc: StatementCommand, *args) -> object:
-        sc.statement.visit(self)
+        yield sc.statement
         return None
 
     def visit_declaration_list(self, d: DeclarationList, *args) -> object:
         for declaration in d.declarations:
-            declaration.visit(self, )
+            yield declaration
         return None
 
     def visit_func_declaration(self, fd: FuncDeclaration, *args) -> object:
-        identifier = fd.identifier.visit(self)
+        identifier = self.visit_identifier(fd.identifier)
 
         self.idTable.insert(identifier=identifier, attr=fd)
-        self.idTable.openScope()
-
-        fd.commands.visit(self)
-        fd.args.visit(self)
+        fd.symbol = self.symbols.add(fd)
+        if not fd.is_parsed:
+            # Parsed and checked when it is first called
+            self.deferred[fd] = self.idTable.snapshot()
+            self.unparsed[-1].append(fd)
+            return None
+
+        yield from self._check_body(fd)
+        return None
 
+    def _check_body(self, fd: FuncDeclaration) -> None:
+        """
+        Checks the body of a function in a scope of its own, opened in the
+        current one.
+        """
+        self.idTable.openScope()
+        self.unparsed.append([])
+        yield fd.commands
+        if fd.args is not None:
+            yield fd.args
+        yield from self._check_uncalled()
         self.idTable.closeScope()
-        return None
+
+    def _check_deferred(self, fd: FuncDeclaration) -> None:
+        """
+        Checks the body of a function left unparsed when it was declared,
+        in the scope it was declared in.
+        """
+        saved = self.idTable.restore(self.deferred.pop(fd))
+        try:
+            yield from self._check_body(fd)
+        finally:
+            self.idTable.restore(saved)
+
+    def _check_uncalled(self) -> None:
+        """
+        Checks the bodies left unparsed in the current scope which were not
+        called, unless drop_uncalled, before the scope is closed.
+        """
+        for fd in self.unparsed.pop():
+            if fd in self.deferred and not self.drop_uncalled:
+                yield from self._check_deferred(fd)
 
     def visit_var_declaration(self, vd: VarDeclaration, *args) -> None:
-        identifier: str = vd.identifier.visit(self)
+        identifier: str = self.visit_identifier(vd.identifier)
 
         self.idTable.insert(identifier=identifier, attr=vd)
+        vd.symbol = self.symbols.add(vd)
         return None
 
     def visit_var_declaration_with_assignment(self, vd: VarDeclarationWithAssignment, *args) -> object:
-        identifier: str = vd.identifier.visit(self)
+        identifier: str = self.visit_identifier(vd.identifier)
+        # The initial value can't use the variable it initializes
+        yield vd.expression
 
         self.idTable.insert(identifier, vd)
+        vd.symbol = self.symbols.add(vd)
         return None
 
     def visit_expression_statement(self, es: ExpressionStatement, *args) -> object:
-        es.expressions.visit(self)
+        yield es.expressions
         return None
 
     def visit_if_statement(self, ifs: IfStatement, *args) -> object:
-        ifs.expr.visit(self)
-        ifs.if_com.visit(self)
-        ifs.else_com.visit(self)
+        yield ifs.expr
+        yield ifs.if_com
+        if ifs.else_com is not None:
+            yield ifs.else_com
         return None
 
     def visit_while_statement(self, ws: WhileStatement, *args) -> object:
-        ws.expr.visit(self)
-        ws.command.visit(self)
+        yield ws.expr
+        yield ws.command
         return None
 
     def visit_return_statement(self, rs: ReturnStatement, *args) -> object:
-        rs.expression.visit(self)
+        yield rs.expression
         return None
 
     def visit_identifier(self, i: Identifier, *args) -> object:
@@ -1,20 +1,49 @@
+from typing import Optional, Union
+
+from ast_cache import AstCache
 from checker import Checker
-from scanner import Scanner
-from parser import Parser
+from parser import DEFAULT_SCANNER, Parser
 from encoder import Encoder
+from typer import Typer
 
 fileDir = './example_files/prog1.txt'
+targetDir = './example_files/prog1.tam'
 
 
-if __name__ == "__main__":
-    scanner = Scanner(fileDir)
-    parser = Parser(scanner)
-    checker = Checker()
-    encoder = Encoder()
+def compile_source(source: Union[str, bytes, bytearray, memoryview], scanner: str = DEFAULT_SCANNER,
+                   cache: Optional[AstCache] = None) -> bytes:
+    """
+    Compiles a program held in memory and returns the target program, in the
+    format Encoder.save_target_program() writes. Unless a cache is given,
+    nothing is read from or written to the filesystem, and nothing is
+    printed; errors are raised as the exceptions of the parser, checker and
+    typer.
 
-    program = parser.parse_program()
-    checker.check(program)
+    Args:
+        source: program text, or its bytes
+        scanner: name of the scanner backend, see parser.SCANNERS
+        cache: where the tree is taken from when the source was parsed
+            before, and stored otherwise
+    """
+    if cache is not None:
+        program = cache.parse(source, scanner, verbose=False)
+    else:
+        if isinstance(source, str):
+            parser = Parser.from_string(source, scanner)
+        else:
+            parser = Parser.from_bytes(source, scanner)
+        parser.verbose = False
+        program = parser.parse_program()
+    Checker().check(program)
+    Typer().infer(program)
+    encoder = Encoder()
+    encoder.verbose = False
     encoder.encode(program)
-    encoder.save_target_program('examples_files/prog1.tam')
+    return encoder.target_program()
+
 
-    # print(json.dumps(program, default=lambda x: x.__dict__, indent=2))
+if __name__ == "__main__":
+    with open(fileDir) as source:
+        target_program = compile_source(source.read(), cache=AstCache())
+    with open(targetDir, 'wb') as target:
+        target.write(target_program)
@@ -1,16 +1,46 @@
+from io import BytesIO
+from typing import BinaryIO
+
 from TAM.instruction import Instruction
 from TAM.machine import Machine
+from abstract_tree.traversal import Traversal
 from abstract_tree import Visitor, TypeIndicator, Operator, BooleanLiteral, IntegerLiteral, Identifier, ArgumentsList, \
     VarExpression, BooleanLiteralExpression, IntLiteralExpression, UnaryExpression, CallExpression, ReturnStatement, \
     BinaryExpression, ExpressionList, WhileStatement, IfStatement, ExpressionStatement, VarDeclarationWithAssignment, \
     VarDeclaration, FuncDeclaration, DeclarationList, StatementCommand, DeclarationCommand, CommandList, Program
 from address import Address
+from symbols import SymbolTable
+
+# Primitive routines of the arithmetic operators
+_PROCEDURES = {
+    '+': Machine.addDisplacement,
+    '-': Machine.negDisplacement,
+    '/': Machine.divDisplacement,
+    '*': Machine.multDisplacement,
+    '%': Machine.modDisplacement
+}
+
+
+class Encoder(Traversal, Visitor):
+    """
+    Generates the TAM instructions of a checked program into Machine.code.
+    It is a Traversal, so programs of any depth can be encoded; terminals
+    are visited by calling their visit method directly.
+
+    Variables and functions are used through their symbol: their address
+    and size are read from the columns of `symbols`, the SymbolTable the
+    Checker left in Program.symbols. The sizes follow from the types there,
+    so type indicators are not visited; types TAM cannot represent are
+    rejected by the Typer.
+    """
+    # Whether encoding reports its progress on stdout, as the compiler
+    # always has
+    verbose: bool = True
 
-
-class Encoder(Visitor):
     def __init__(self):
         self.next_address = Machine.CB
         self.current_level = 0
+        self.symbols = SymbolTable()
 
     def __emit(self, operation: int, length: int,
                register_n: int, displacement: int):
@@ -32,6 +62,19 @@ class Encoder(Visitor):
     def __patch(self, adr: int, displacement: int):
         Machine.code[adr].operand = displacement
 
+    def __report(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+
+    def __allocate(self, declaration, address: Address) -> None:
+        """
+        Records the address of a declaration in the columns of its symbol,
+        adding one for a declaration the Checker did not see.
+        """
+        if declaration.symbol is None:
+            declaration.symbol = self.symbols.add(declaration)
+        self.symbols.allocate(declaration.symbol, address.level, address.displacement)
+
     def __display_register(self, current_level: int, entity_level: int):
         if entity_level == 0:
             return Machine.SBr
@@ -43,45 +86,66 @@ class Encoder(Visitor):
     def save_target_program(self, file_name: str):
         try:
             with open(f"{file_name}", mode='wb') as f:
-                print(f"Length of instructions: {self.next_address}")
+                self.__report(f"Length of instructions: {self.next_address}")
                 for i in range(self.next_address):
-                    print(f"[{i}]: Op_code {Machine.code[i].op_code}")
-                    Machine.code[i].write(f)
+                    self.__report(f"[{i}]: Op_code {Machine.code[i].op_code}")
+                self.write_target_program(f)
         except(Exception) as e:
             raise e
 
+    def write_target_program(self, output: BinaryIO) -> None:
+        """
+        Writes the encoded instructions to a binary stream.
+        """
+        for i in range(self.next_address):
+            Machine.code[i].write(output)
+
+    def target_program(self) -> bytes:
+        """
+        Returns the encoded instructions in the format of save_target_program().
+        """
+        output = BytesIO()
+        self.write_target_program(output)
+        return output.getvalue()
+
     def encode(self, p: Program):
-        p.visit(self)
+        self.traverse(p)
 
     def visit_program(self, p: Program, *args) -> object:
+        if p.symbols is not None:
+            self.symbols = p.symbols
         self.current_level = 0
-        p.command_list.visit(self, Address())
+        yield p.command_list, Address()
         self.__emit(Machine.HALTop, 0, 0, 0)
         return
 
     def visit_command_list(self, c: CommandList, *args) -> object:
         for command in c.commands:
-            command.visit(self, *args)
+            yield (command,) + args
         return
 
     def visit_declaration_command(self, dc: DeclarationCommand, *args) -> object:
-        print(f"Number of declarations: {len(dc.declaration_list.declarations)}")
-        return dc.declaration_list.visit(self, *args)
+        self.__report(f"Number of declarations: {len(dc.declaration_list.declarations)}")
+        return (yield (dc.declaration_list,) + args)
 
     def visit_statement_command(self, sc: StatementCommand, *args) -> object:
-        return sc.statement.visit(self, *args)
+        return (yield (sc.statement,) + args)
 
     def visit_declaration_list(self, d: DeclarationList, *args) -> object:
         address: Address = args[0]
         start_displacement = address.displacement
         for declaration in d.declarations:
-            address = declaration.visit(self, address)
+            address = yield declaration, address
 
         size = address.displacement - start_displacement
         return size
 
     def visit_func_declaration(self, fd: FuncDeclaration, *args) -> object:
+        if not fd.is_parsed:
+            # Never called, and dropped by the Checker, see drop_uncalled
+            return args[0]
         fd.address = Address(self.current_level, self.next_address)
+        self.__allocate(fd, fd.address)
         self.current_level += 1
         address = Address.from_address(args[0])  # Inner frame
         # Jump over the Command part so that it's not executed during the
@@ -94,12 +158,12 @@ class Encoder(Visitor):
             register_n=Machine.CBr,
             displacement=0
         )
-        fd.commands.visit(self, Address.from_address(address, Machine.link_data_size))
+        yield fd.commands, Address.from_address(address, Machine.link_data_size)
         self.__emit(
             operation=Machine.RETURNop,
             length=1,  # TODO: Refactor to set length dynamically
             register_n=0,
-            displacement=len(fd.args.expressions)  # TODO: How to do this properly?
+            displacement=len(fd.args.expressions) if fd.args is not None else 0  # TODO: How to do this properly?
         )
         # This is the end of the function, and the jump instruction can be patched
         self.__patch(jump_instr, self.next_address)
@@ -115,8 +179,9 @@ class Encoder(Visitor):
     def visit_var_declaration(self, vd: VarDeclaration, *args) -> object:
         address = args[0]
         vd.address = address
+        self.__allocate(vd, address)
         register = self.__display_register(self.current_level, address.level)
-        size: int = vd.type_indicator.visit(self)
+        size: int = self.symbols.sizes[vd.symbol]
         self.__emit(
             operation=Machine.PUSHop,
             length=0,
@@ -127,13 +192,14 @@ class Encoder(Visitor):
 
     def visit_var_declaration_with_assignment(self, vd: VarDeclarationWithAssignment, *args) -> object:
         address = args[0]  # An address for the new variable
-        print(f"Received address: {address}")
+        self.__report(f"Received address: {address}")
         vd.address = address
+        self.__allocate(vd, address)
         register = self.__display_register(self.current_level, address.level)
-        size: int = vd.type_indicator.visit(self)
+        size: int = self.symbols.sizes[vd.symbol]
         # Evaluate expression and LOAD it's value on to the stack. Because the value will be
         # stored right away, it's not necessary to call PUSH.
-        vd.expression.visit(self, True)
+        yield vd.expression, True
         # Pop the value from the stack top and store it into the register
         self.__emit(
             operation=Machine.STOREop,
@@ -142,23 +208,23 @@ class Encoder(Visitor):
             displacement=address.displacement
         )
         new_address = Address.from_address(address=address, increment=1)
-        print(f"Returning from function: {new_address}")
+        self.__report(f"Returning from function: {new_address}")
         return new_address
 
     def visit_expression_statement(self, es: ExpressionStatement, *args) -> object:
-        es.expressions.visit(self, *args)
+        yield (es.expressions,) + args
         return
 
     def visit_if_statement(self, ifs: IfStatement, *args) -> object:
         # Evaluate an expression and push the result to the stack top
-        ifs.expr.visit(self, True)
+        yield ifs.expr, True
         # Emit JUMPIF instruction that will jump to the else-part of
         # the block. (This value will be patched once we generate
         # code for the if-part of the block)
         jump1_addr = self.next_address
         self.__emit(Machine.JUMPIFop, 0, Machine.CBr, 0)
         # Generate instructions for the if-part of the block
-        ifs.if_com.visit(self, None)
+        yield ifs.if_com, None
         # Emit JUMP instruction that will jump to the end of the
         # if-else block
         jump2_addr = self.next_address
@@ -167,7 +233,8 @@ class Encoder(Visitor):
         # the else-part of the block begins
         self.__patch(jump1_addr, self.next_address)
         # Generate instructions for the else-part of the block
-        ifs.else_com.visit(self, None)
+        if ifs.else_com is not None:
+            yield ifs.else_com, None
         self.__patch(jump2_addr, self.next_address)
         # Patch the JUMP instruction, pointing to the address after
         # the if-else block.
@@ -176,7 +243,7 @@ class Encoder(Visitor):
     def visit_while_statement(self, ws: WhileStatement, *args) -> object:
         start_address = self.next_address
         # Evaluate an expression pushing the result on the top of the stack
-        ws.expr.visit(self, True)
+        yield ws.expr, True
         # Jump at the end of the while block if the above expression
         # evaluates to false
         jump_address = self.next_address
@@ -186,7 +253,7 @@ class Encoder(Visitor):
             register_n=Machine.CBr,
             displacement=0
         )
-        ws.command.visit(self, None)
+        yield ws.command, None
         # Jump back to the beginning of the while block and evaluate
         # the expression
         self.__emit(
@@ -200,37 +267,34 @@ class Encoder(Visitor):
 
     def visit_expression_list(self, el: ExpressionList, *args) -> object:
         for expression in el.expressions:
-            expression.visit(self, *args)
+            yield (expression,) + args
         return
 
     def visit_binary_expression(self, be: BinaryExpression, *args) -> object:
         value_needed = args[0]
-        operator: str = be.operator.visit(self, None)
+        operator: str = self.visit_operator(be.operator, None)
 
         if operator == '~':
-            address: Address = be.expression1.visit(self, False)
-            be.expression2.visit(self, True)
+            symbol: int = yield be.expression1, False
+            yield be.expression2, True
 
-            register = self.__display_register(self.current_level, address.level)
+            symbols = self.symbols
+            register = self.__display_register(self.current_level, symbols.levels[symbol])
+            displacement = symbols.displacements[symbol]
+            size = symbols.sizes[symbol]
             self.__emit(
                 operation=Machine.STOREop,
-                length=1,
+                length=size,
                 register_n=register,
-                displacement=address.displacement
+                displacement=displacement
             )
             if value_needed:
-                self.__emit(Machine.LOADop, 1, register, address.displacement)
+                self.__emit(Machine.LOADop, size, register, displacement)
         else:
-            be.expression1.visit(self, *args)
-            be.expression2.visit(self, *args)
+            yield be.expression1, value_needed
+            yield be.expression2, value_needed
             if value_needed:
-                procedure = {
-                    '+': Machine.addDisplacement,
-                    '-': Machine.negDisplacement,
-                    '/': Machine.divDisplacement,
-                    '*': Machine.multDisplacement,
-                    '%': Machine.modDisplacement
-                }.get(operator)
+                procedure = _PROCEDURES.get(operator)
                 self.__emit(
                     operation=Machine.CALLop,
                     length=0,
@@ -244,14 +308,15 @@ class Encoder(Visitor):
     def visit_call_expression(self, ce: CallExpression, *args) -> object:
         value_needed = args[0]
         # Load all parameters on the top of the stack
-        ce.args.visit(self, True)
-        address = ce.declaration.address
-        register = self.__display_register(self.current_level, address.level)
+        if ce.args is not None:
+            yield ce.args, True
+        symbol = ce.symbol
+        register = self.__display_register(self.current_level, self.symbols.levels[symbol])
         self.__emit(
             operation=Machine.CALLop,
             length=0,
             register_n=register,
-            displacement=address.displacement + 1  # Skip the JUMPop and execute Command part
+            displacement=self.symbols.displacements[symbol] + 1  # Skip the JUMPop and execute Command part
         )
         # If the return value is not needed, remove it from the stack top
         if not value_needed:
@@ -265,8 +330,8 @@ class Encoder(Visitor):
 
     def visit_unary_expression(self, be: UnaryExpression, *args) -> object:
         value_needed: bool = args[0]
-        operator = be.operator.visit(self)
-        be.expression.visit(self, value_needed)
+        operator = self.visit_operator(be.operator)
+        yield be.expression, value_needed
 
         if operator == '-' and value_needed:
             self.__emit(
@@ -279,14 +344,14 @@ class Encoder(Visitor):
 
     def visit_int_literal_expression(self, ie: IntLiteralExpression, *args) -> object:
         value_needed: bool = args[0]
-        value: int = ie.literal.visit(self, None)
+        value: int = self.visit_integer_literal(ie.literal, None)
         if value_needed:
             self.__emit(Machine.LOADLop, 1, 0, value)
         return
 
     def visit_boolean_literal_expression(self, be: BooleanLiteralExpression, *args) -> object:
         value_needed: bool = args[0]
-        value: int = be.literal.visit(self, None)
+        value: int = self.visit_boolean_literal(be.literal, None)
         if value_needed:
             self.__emit(
                 operation=Machine.LOADLop,
@@ -298,21 +363,20 @@ class Encoder(Visitor):
 
     def visit_var_expression(self, ve: VarExpression, *args) -> object:
         value_needed: bool = args[0]
-        address = ve.declaration.address
-        register = self.__display_register(self.current_level, address.level)
-        size: int = ve.declaration.type_indicator.visit(self, None)  # TODO: Size probably in the Address object
+        symbol = ve.symbol
         if value_needed:
+            symbols = self.symbols
             self.__emit(
                 operation=Machine.LOADop,
-                length=size,
-                register_n=register,
-                displacement=address.displacement
+                length=symbols.sizes[symbol],
+                register_n=self.__display_register(self.current_level, symbols.levels[symbol]),
+                displacement=symbols.displacements[symbol]
             )
-        return address
+        return symbol
 
     def visit_arguments_list(self, al: ArgumentsList, *args) -> object:
         for expr in al.expressions:
-            expr.visit(self, True)
+            yield expr, True
         return
 
     def visit_identifier(self, i: Identifier, *args) -> object:
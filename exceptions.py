@@ -30,6 +30,7 @@ class UnexpectedTokenException(Exception):
     """
 
     def __init__(self, expected_kind: Kind, current_token: Token, current_line: int, current_column: int):
+        self.expected_kind = expected_kind
         self.line = current_line
         self.column = current_column
         self.message = (
@@ -105,3 +106,37 @@ class UndeclaredVariableException(Exception):
 
 class InvalidOperatorException(Exception):
     pass
+
+
+class InvalidTypeException(Exception):
+    pass
+
+
+class NonAsciiSourceException(Exception):
+    """
+    An exception thrown when a program given as bytes, which large source
+    files are scanned as, holds a byte outside of ASCII anywhere but in a
+    comment. Programs in another encoding are decoded and given as text.
+
+    Args:
+        byte: the byte found
+        offset: offset of the byte in the source
+        current_line: line on which the byte was found
+        current_column: column on which the byte was found
+    """
+
+    def __init__(self, byte: int, offset: int, current_line: int, current_column: int):
+        self.byte = byte
+        self.offset = offset
+        self.line = current_line
+        self.column = current_column
+        self.message = (
+            f"Error on line {current_line}, column {current_column}.\n"
+            f"Byte 0x{byte:02x} is not ASCII. Decode the program and pass it as text."
+        )
+
+        super().__init__(self.message)
+
+    def __reduce__(self):
+        # Raised in scanner worker processes, too
+        return type(self), (self.byte, self.offset, self.line, self.column)
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 
 from abstract_tree.declarations import AbstractDeclaration
 
@@ -14,40 +14,113 @@ class IdEntry:
 
 
 class IdentificationTable:
+    """
+    The visible declarations by identifier. Every identifier has a stack of
+    its entries, the innermost last, so a lookup and an insertion take
+    constant time however many identifiers are declared; the identifiers
+    inserted at every level are listed, so closing a scope only touches its
+    own entries.
+
+    `table` lists all visible entries in the order they were inserted.
+    """
+
     def __init__(self):
         self.table: List[IdEntry] = []
         self.level = 0
+        self.entries: Dict[str, List[IdEntry]] = {}
+        # Identifiers inserted at every level, by level
+        self.scopes: List[List[str]] = [[]]
 
     def _find(self, identifier: str) -> Optional[IdEntry]:
-        for i in reversed(range(len(self.table))):
-            if self.table[i].identifier == identifier:
-                return self.table[i]
-        return None
+        stack = self.entries.get(identifier)
+        return stack[-1] if stack else None
 
     def insert(self, identifier: str, attr: AbstractDeclaration):
-        entry = self._find(identifier)
+        stack = self.entries.get(identifier)
 
-        if entry and entry.level == self.level:
-            raise Exception(f"{entry.identifier} was identified twice")
+        if stack and stack[-1].level == self.level:
+            raise Exception(f"{stack[-1].identifier} was identified twice")
         else:
-            self.table.append(
-                IdEntry(level=self.level, identifier=identifier, attr=attr)
-            )
+            entry = IdEntry(level=self.level, identifier=identifier, attr=attr)
+            self.table.append(entry)
+            if stack is None:
+                self.entries[identifier] = [entry]
+            else:
+                stack.append(entry)
+            self.scopes[self.level].append(identifier)
 
     def get(self, identifier: str) -> Optional[AbstractDeclaration]:
-        entry = self._find(identifier)
+        stack = self.entries.get(identifier)
 
-        if entry:
-            return entry.attr
+        if stack:
+            return stack[-1].attr
         else:
             return None
 
+    def snapshot(self) -> Tuple[List[IdEntry], int, int]:
+        """
+        Returns the state of the table, for restore(). The entries visible
+        now stay in place until the current scope is closed, since scopes
+        are only opened and closed above them, so they are shared with the
+        table instead of copied.
+        """
+        return self.table, len(self.table), self.level
+
+    def restore(self, state: Tuple[List[IdEntry], int, int]) -> Tuple[List[IdEntry], int, int]:
+        """
+        Sets the table back to a snapshot() taken while the current scope
+        or one around it was open, and returns a snapshot of the state it
+        replaced. The entries of both states agree up to the shorter one,
+        so only the entries after it are removed and added.
+        """
+        previous = self.snapshot()
+        table, count, level = state
+        common = min(count, len(self.table))
+        for entry in reversed(self.table[common:]):
+            self.__remove(entry)
+        self.table = table if count == len(table) else table[:count]
+        for entry in self.table[common:]:
+            self.__push(entry)
+        self.level = level
+        while len(self.scopes) <= level:
+            self.scopes.append([])
+        return previous
+
     def openScope(self) -> None:
         self.level += 1
+        if len(self.scopes) == self.level:
+            self.scopes.append([])
 
     def closeScope(self) -> None:
-        pos = len(self.table) - 1
-        while pos >= 0 and self.table[pos].level == self.level:
-            self.table.pop(pos)
-            pos -= 1
+        names = self.scopes[self.level]
+        entries = self.entries
+        for identifier in names:
+            stack = entries[identifier]
+            stack.pop()
+            if not stack:
+                del entries[identifier]
+        if names:
+            del self.table[-len(names):]
+            names.clear()
         self.level -= 1
+
+    def __push(self, entry: IdEntry) -> None:
+        stack = self.entries.get(entry.identifier)
+        if stack is None:
+            self.entries[entry.identifier] = [entry]
+        else:
+            stack.append(entry)
+        while len(self.scopes) <= entry.level:
+            self.scopes.append([])
+        self.scopes[entry.level].append(entry.identifier)
+
+    def __remove(self, entry: IdEntry) -> None:
+        """
+        Takes the entry, the last inserted one of those in the table, out of
+        the stacks and the scopes.
+        """
+        stack = self.entries[entry.identifier]
+        stack.pop()
+        if not stack:
+            del self.entries[entry.identifier]
+        self.scopes[entry.level].pop()
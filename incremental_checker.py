@@ -0,0 +1,269 @@
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
+
+from abstract_tree import AbstractDeclaration, AbstractSyntaxTree, CommandList, FuncDeclaration, Program
+from checker import Checker
+from identification_table import IdentificationTable
+from incremental_parser import settle
+from symbols import SymbolTable
+
+Buffer = Union[str, bytes, bytearray, memoryview]
+
+# Where a node incremental_parser.reparse() may replace hangs: its parent
+# and an attribute name, or a list and an index, with the node
+Slot = Tuple[object, Union[str, int], AbstractSyntaxTree]
+
+
+class FunctionRecord:
+    """
+    What checking the body of a top-level function found: the global names
+    it resolved, each with the symbol of the global it stood for or None if
+    none was visible, the symbols it gave the declarations in the body, and
+    the function with the slots of the nodes in its body which reparse()
+    may replace, so a body still holding the checked nodes is known.
+    """
+    __slots__ = ('function', 'names', 'symbols', 'slots')
+
+    def __init__(self, function: FuncDeclaration, names: Dict[str, Optional[int]], symbols: List[int],
+                 slots: List[Slot]):
+        self.function = function
+        self.names = names
+        self.symbols = symbols
+        self.slots = slots
+
+
+class DependencyTable(IdentificationTable):
+    """
+    An IdentificationTable which records, while `resolved` is a dict, the
+    identifiers looked up at the global level, the symbol of the global
+    each was found as or None.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.resolved: Optional[Dict[str, Optional[int]]] = None
+
+    def get(self, identifier: str) -> Optional[AbstractDeclaration]:
+        stack = self.entries.get(identifier)
+        entry = stack[-1] if stack else None
+        if self.resolved is not None and (entry is None or entry.level == 1):
+            self.resolved[identifier] = None if entry is None else entry.attr.symbol
+        return None if entry is None else entry.attr
+
+
+class StableSymbolTable(SymbolTable):
+    """
+    A SymbolTable which gives a declaration it has seen before the symbol
+    it had, so the symbols stored in the nodes of bodies which are not
+    checked again stay right.
+
+    The symbols added or kept since the last collect() are `live`; the
+    others belong to declarations no longer in the program. collect() drops
+    them, leaving None in `declarations`, and new declarations get their
+    numbers, so the table only grows with the program.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.known: Dict[int, int] = {}
+        self.live: List[int] = []
+        self.free: List[int] = []
+
+    def add(self, declaration: AbstractDeclaration) -> int:
+        symbol = self.known.get(id(declaration))
+        if symbol is None or self.declarations[symbol] is not declaration:
+            if self.free:
+                symbol = self.free.pop()
+                self.describe(symbol, declaration)
+            else:
+                symbol = super().add(declaration)
+            self.known[id(declaration)] = symbol
+        self.live.append(symbol)
+        return symbol
+
+    def keep(self, symbols: Sequence[int]) -> None:
+        """
+        Marks the symbols of declarations which were not added again, as
+        they are in a body which was not checked again, as live.
+        """
+        self.live.extend(symbols)
+
+    def collect(self) -> None:
+        """
+        Drops the symbols which are not live and starts over.
+        """
+        live = set(self.live)
+        self.live = []
+        for symbol, declaration in enumerate(self.declarations):
+            if declaration is not None and symbol not in live:
+                del self.known[id(declaration)]
+                self.declarations[symbol] = None
+                self.free.append(symbol)
+
+
+def slots(fd: FuncDeclaration) -> List[Slot]:
+    """
+    Returns the slots of the CommandLists and FuncDeclarations in the body
+    of a function, which reparse() replaces when it parses part of a body
+    again.
+    """
+    found = []
+    pending = [fd]
+    while pending:
+        node = pending.pop()
+        for name in node.children:
+            child = getattr(node, name)
+            if type(child) is list:
+                for index, item in enumerate(child):
+                    if isinstance(item, FuncDeclaration):
+                        found.append((child, index, item))
+                    pending.append(item)
+            elif isinstance(child, AbstractSyntaxTree):
+                if isinstance(child, CommandList):
+                    found.append((node, name, child))
+                if not isinstance(child, FuncDeclaration) or child.is_parsed:
+                    pending.append(child)
+    return found
+
+
+class IncrementalChecker(Checker):
+    """
+    A Checker for a program checked again after every edit, e.g. by
+    incremental_parser.reparse(). The top level is checked every time, but
+    the body of a top-level function only when it changed or a global it
+    resolves did.
+
+    Checking a body records the global names it looks up, with the global
+    each stands for. The record is kept under a hash of the source of the
+    function, and is still valid in the next check when the function has
+    the same source, the same nodes and every name in it stands for the
+    same global. That body keeps the symbols stored in it; the symbols of
+    the declarations kept by reparse() do not change, and those of the
+    declarations no longer in the program are dropped after every check,
+    see StableSymbolTable.
+
+    A name stands for another global once reparse() replaces the
+    declaration of the global, so editing the header of a function checks
+    again the bodies calling it, while editing its body does not.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.symbols = StableSymbolTable()
+        # Records of the top-level functions checked, by source hash
+        self.records: Dict[int, FunctionRecord] = {}
+        # The top-level functions whose bodies were checked by the last
+        # check(), in the order they were checked
+        self.rechecked: List[FuncDeclaration] = []
+        self.source: Optional[Buffer] = None
+        self.__previous: Dict[int, FunctionRecord] = {}
+
+    def check(self, p: Program, source: Optional[Buffer] = None):
+        """
+        Checks a program parsed from `source`. Without a source, every body
+        is checked.
+        """
+        # The records are found by the source of the functions, so their
+        # spans have to be up to date, but not the ones in their bodies
+        settle(p, (FuncDeclaration,))
+        self.idTable = DependencyTable()
+        self.deferred = {}
+        self.unparsed = []
+        self.source = source
+        self.rechecked = []
+        self.symbols.live = []
+        previous, self.records = self.records, {}
+        self.__previous = previous
+        try:
+            self.traverse(p)
+        except Exception:
+            # Keep what is not known to be stale for the next check
+            self.records = {**previous, **self.records}
+            raise
+        self.symbols.collect()
+
+    @property
+    def dependencies(self) -> Dict[str, FrozenSet[str]]:
+        """
+        The global names resolved by the body of every top-level function,
+        by the name of the function.
+        """
+        return {record.function.identifier.spelling: frozenset(record.names) for record in self.records.values()}
+
+    def dependents(self, name: str) -> List[str]:
+        """
+        Returns the top-level functions whose bodies resolve a global name.
+        """
+        return [function for function, names in self.dependencies.items() if name in names]
+
+    def visit_func_declaration(self, fd: FuncDeclaration, *args) -> object:
+        # A plain function, so a body not checked again costs no generator
+        table = self.idTable
+        if table.level != 1 or not fd.is_parsed:
+            return Checker.visit_func_declaration.__traversal__(self, fd, *args)
+
+        table.insert(identifier=fd.identifier.spelling, attr=fd)
+        fd.symbol = self.symbols.add(fd)
+        key = self.__key(fd)
+        record = self.__previous.get(key)
+        if record is not None and self.__valid(record, fd):
+            self.records[key] = record
+            self.symbols.keep(record.symbols)
+            return None
+        return self.__check_recording(fd, key)
+
+    def __check_recording(self, fd: FuncDeclaration, key: Optional[int]) -> object:
+        """
+        Checks the body of a top-level function, recording the global names
+        it resolves.
+        """
+        table = self.idTable
+        table.resolved = {}
+        first = len(self.symbols.live)
+        try:
+            yield from self._check_body(fd)
+            names = table.resolved
+        finally:
+            table.resolved = None
+        self.rechecked.append(fd)
+        if key is not None:
+            self.records[key] = FunctionRecord(fd, names, self.symbols.live[first:], slots(fd))
+
+    def _check_deferred(self, fd: FuncDeclaration) -> None:
+        # The names a function called from a body resolves are its own
+        table = self.idTable
+        outer, table.resolved = table.resolved, None
+        try:
+            yield from super()._check_deferred(fd)
+        finally:
+            table.resolved = outer
+
+    def __key(self, fd: FuncDeclaration) -> Optional[int]:
+        """
+        Returns the hash of the source of a function. Records only live as
+        long as the checker, so the hash of the built-in types does.
+        """
+        if self.source is None or fd.start is None:
+            return None
+        text = self.source[fd.start:fd.end]
+        return hash(text if isinstance(text, (str, bytes)) else bytes(text))
+
+    def __valid(self, record: FunctionRecord, fd: FuncDeclaration) -> bool:
+        """
+        Whether a record of the source of fd holds for fd now: its nodes
+        were the ones checked, and the names its body resolved stand for
+        the same globals.
+        """
+        if record.function is not fd:
+            return False
+        for holder, key, node in record.slots:
+            if type(key) is str:
+                if getattr(holder, key) is not node:
+                    return False
+            elif key >= len(holder) or holder[key] is not node:
+                return False
+        entries = self.idTable.entries
+        for name, symbol in record.names.items():
+            stack = entries.get(name)
+            if (stack[-1].attr.symbol if stack else None) != symbol:
+                return False
+        return True
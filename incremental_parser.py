@@ -0,0 +1,334 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple, Union
+
+from interning import Interner
+from parser import Parser
+from token_stream import TokenStream
+from abstract_tree import *
+from exceptions import UnexpectedTokenException, UnsupportedTokenException
+
+Buffer = Union[str, bytes]
+
+# A node on the way from the program to an edit: the node, its parent, the
+# attribute of the parent holding it and its index when that is a list
+Step = Tuple[AbstractSyntaxTree, Optional[AbstractSyntaxTree], Optional[str], Optional[int]]
+
+# The span shifts of a program not applied yet, by the id of what they
+# shift: a node, as [node, difference], which holds for the node and its
+# whole subtree; or a list of children, as [list, runs, differences], where
+# from index runs[i] up to the next run, the items and their subtrees are
+# short of differences[i]
+Shifts = Dict[int, list]
+
+# Edits far apart leave a run of a list each, so past this many in a list
+# the shifts are all applied
+MAX_RUNS = 256
+
+# The nodes which can hold a node parsed again on their own. The lists of
+# their children hold nodes with a span only.
+_CONTAINERS = (CommandList, AbstractCommand, DeclarationList, FuncDeclaration, IfStatement, WhileStatement)
+
+
+def reparse(program: Program, stream: TokenStream, offset: int, deleted: int, inserted: Buffer,
+            interner: Optional[Interner] = None, parser_class=Parser) -> Tuple[Program, TokenStream]:
+    """
+    Updates a program after replacing `deleted` characters at `offset` of
+    its source with `inserted`, and returns it with the tokens of the new
+    source (see TokenStream.edit()).
+
+    Only the smallest CommandList, FuncDeclaration or top-level command
+    around the edit is parsed again. It replaces the old node in its
+    parent and every other subtree is kept as the same object. If that
+    node does not parse into exactly the same range of tokens, the next
+    larger one is tried, and at last the whole program.
+
+    The spans of the nodes after the edit are shifted lazily, so an edit
+    costs the same in a file of any size: only the nodes around the edit
+    get their span changed, the others get the shift of their subtree, or
+    of a run of a list, kept in Program.shifts. The next reparse() applies
+    the shifts on its way to its edit; settle() applies them all, and has
+    to be called before reading the spans of the nodes after an edit.
+
+    The previous program is updated in place. Its semantic annotations are
+    left as they were, so it has to be checked again. A program parsed with
+    an interner is parsed again with the same one; its shared nodes have no
+    span and are never changed, so an edit inside one parses the closest
+    unshared node around it. The parts parsed again are parsed by
+    parser_class, which should be the class the program was parsed with,
+    e.g. StackParser for programs nested deeper than the recursion limit.
+
+    Args:
+        program: the program parsed from the tokens of `stream`
+        stream: the tokens of the source before the edit
+        offset: offset of the edit in the source before the edit
+        deleted: number of characters removed at `offset`
+        inserted: the text inserted at `offset`, of the type of the source
+        interner: the interner the program was parsed with, if any
+        parser_class: the Parser class the program was parsed with
+    """
+    new_stream = stream.edit(offset, deleted, inserted)
+    shift = len(inserted) - deleted
+    edit_end = offset + deleted
+
+    if program.shifts is None:
+        program.shifts = {}
+    shifts = program.shifts
+    path = _path(program, shifts, offset, edit_end)
+    # The top-level command and the nodes below it, from the innermost
+    for depth in range(len(path) - 1, 1, -1):
+        node, parent, name, index = path[depth]
+        method = _parse_method(node, depth)
+        if method is None:
+            continue
+        parser = parser_class(new_stream.cursor(new_stream.index_of(node.start)), interner)
+        try:
+            new_node = getattr(parser, method)()
+        except (UnexpectedTokenException, UnsupportedTokenException):
+            continue
+        if parser.previous_end != node.end + shift:
+            continue
+
+        if shifts:
+            _forget(shifts, node)
+        if index is None:
+            setattr(parent, name, new_node)
+        else:
+            getattr(parent, name)[index] = new_node
+        if shift and _shift_after(shifts, path[:depth + 1], shift) > MAX_RUNS:
+            settle(program)
+        return program, new_stream
+
+    parser = parser_class(new_stream.cursor(), interner)
+    parser.verbose = False
+    return parser.parse_program(), new_stream
+
+
+def settle(program: Program, stop: Tuple[type, ...] = ()) -> None:
+    """
+    Applies the span shifts reparse() left in a program. The nodes of the
+    `stop` classes get their own span updated, while their children keep
+    their shifts, so the spans down to them cost no walk below them.
+    """
+    shifts = program.shifts
+    if not shifts:
+        program.shifts = None
+        return
+    # The program and its command list hold every edit, so they have no shift
+    pending = [(program.command_list, 0)]
+    while pending:
+        node, delta = pending.pop()
+        if node is None or node.start is None:
+            continue
+        entry = shifts.pop(id(node), None)
+        if entry is not None:
+            delta += entry[1]
+        if isinstance(node, stop):
+            _push(shifts, node, delta)
+            continue
+        if delta:
+            node.start += delta
+            node.end += delta
+        for name in node.children:
+            child = getattr(node, name)
+            if type(child) is list:
+                entry = shifts.pop(id(child), None)
+                if entry is None:
+                    pending.extend((item, delta) for item in child)
+                else:
+                    pending.extend((item, delta + _run_delta(entry, index)) for index, item in enumerate(child))
+            else:
+                pending.append((child, delta))
+    if not stop:
+        # What is left belongs to nodes no longer in the program
+        program.shifts = None
+
+
+def _parse_method(node: AbstractSyntaxTree, depth: int) -> Optional[str]:
+    """
+    Returns the name of the Parser method which parses a node on the way to
+    an edit again, or None when it can't be parsed on its own.
+    """
+    if depth == 2:
+        return 'parse_single_command'
+    if isinstance(node, CommandList):
+        return 'parse_command_list'
+    if isinstance(node, FuncDeclaration):
+        return 'parse_single_declaration'
+    return None
+
+
+def _path(program: Program, shifts: Shifts, offset: int, edit_end: int) -> List[Step]:
+    """
+    Returns the program, its command list and the containers whose span
+    holds the edit with at least one unchanged character on either side,
+    from the outermost to the innermost. Their spans are brought up to
+    date on the way.
+    """
+    path = [(program, None, None, None), (program.command_list, program, 'command_list', None)]
+    node = program.command_list
+    while True:
+        step = _child_around(shifts, node, offset, edit_end)
+        if step is None:
+            return path
+        path.append(step)
+        node = step[0]
+
+
+def _child_around(shifts: Shifts, node: AbstractSyntaxTree, offset: int, edit_end: int) -> Optional[Step]:
+    """
+    Returns the container child of the node whose span holds the edit,
+    with its span up to date.
+    """
+    for name in node.children:
+        child = getattr(node, name)
+        if type(child) is list:
+            entry = shifts.get(id(child))
+            if entry is None:
+                index = bisect_left(range(len(child)), offset, key=lambda i: child[i].start) - 1
+            else:
+                index = bisect_left(range(len(child)), offset,
+                                    key=lambda i: child[i].start + _run_delta(entry, i)) - 1
+            if index < 0 or not isinstance(child[index], _CONTAINERS):
+                continue
+            _settle_item(shifts, child, index)
+            if edit_end < child[index].end:
+                return child[index], node, name, index
+        elif isinstance(child, _CONTAINERS):
+            entry = shifts.get(id(child))
+            delta = entry[1] if entry is not None else 0
+            if child.start + delta < offset and edit_end < child.end + delta:
+                _settle_node(shifts, child)
+                return child, node, name, None
+    return None
+
+
+def _shift_after(shifts: Shifts, path: List[Step], shift: int) -> int:
+    """
+    Shifts the spans of the nodes after an edit inside the last node of
+    `path`: the end of the nodes around it now, and the subtrees after it
+    lazily. Returns the largest number of runs of the lists shifted.
+    """
+    most = 0
+    for depth in range(len(path) - 1):
+        parent = path[depth][0]
+        _, _, name, index = path[depth + 1]
+        parent.end += shift
+        after = False
+        for child_name in parent.children:
+            if child_name == name:
+                after = True
+                if index is not None:
+                    most = max(most, _shift_items(shifts, getattr(parent, name), index + 1, shift))
+                continue
+            if after:
+                child = getattr(parent, child_name)
+                if type(child) is list:
+                    most = max(most, _shift_items(shifts, child, 0, shift))
+                else:
+                    _shift_node(shifts, child, shift)
+    return most
+
+
+def _run_delta(entry: list, index: int) -> int:
+    _, runs, deltas = entry
+    run = bisect_right(runs, index) - 1
+    return deltas[run] if run >= 0 else 0
+
+
+def _shift_node(shifts: Shifts, node: Optional[AbstractSyntaxTree], delta: int) -> None:
+    """
+    Shifts the spans of a node and its subtree by delta, lazily. Shared
+    nodes have no span to shift.
+    """
+    if node is None or node.start is None:
+        return
+    entry = shifts.get(id(node))
+    if entry is None:
+        shifts[id(node)] = [node, delta]
+    else:
+        entry[1] += delta
+
+
+def _shift_items(shifts: Shifts, items: list, first: int, delta: int) -> int:
+    """
+    Shifts the spans of the items of a list from index `first` on, and of
+    their subtrees, by delta, lazily. Returns the number of runs the list
+    has now.
+    """
+    if first >= len(items):
+        return 0
+    entry = shifts.get(id(items))
+    if entry is None:
+        shifts[id(items)] = [items, [first], [delta]]
+        return 1
+    _, runs, deltas = entry
+    run = bisect_left(runs, first)
+    if run == len(runs) or runs[run] != first:
+        runs.insert(run, first)
+        deltas.insert(run, deltas[run - 1] if run else 0)
+    for run in range(run, len(runs)):
+        deltas[run] += delta
+    return len(runs)
+
+
+def _push(shifts: Shifts, node: AbstractSyntaxTree, delta: int) -> None:
+    """
+    Applies the shift of a subtree to the span of its root, and leaves it
+    to its children.
+    """
+    if not delta:
+        return
+    node.start += delta
+    node.end += delta
+    for name in node.children:
+        child = getattr(node, name)
+        if type(child) is list:
+            _shift_items(shifts, child, 0, delta)
+        else:
+            _shift_node(shifts, child, delta)
+
+
+def _settle_node(shifts: Shifts, node: AbstractSyntaxTree) -> None:
+    """
+    Brings the span of a node up to date.
+    """
+    entry = shifts.pop(id(node), None)
+    if entry is not None:
+        _push(shifts, node, entry[1])
+
+
+def _settle_item(shifts: Shifts, items: list, index: int) -> None:
+    """
+    Brings the span of an item of a list up to date, taking it out of the
+    run of its shift.
+    """
+    entry = shifts.get(id(items))
+    if entry is not None:
+        delta = _run_delta(entry, index)
+        if delta:
+            _shift_items(shifts, items, index, -delta)
+            _shift_items(shifts, items, index + 1, delta)
+            _shift_node(shifts, items[index], delta)
+    _settle_node(shifts, items[index])
+
+
+def _forget(shifts: Shifts, node: AbstractSyntaxTree) -> None:
+    """
+    Drops the shifts of a subtree taken out of the program. The bodies of
+    lazy functions not parsed yet hold none.
+    """
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if node is None or node.start is None:
+            continue
+        shifts.pop(id(node), None)
+        if isinstance(node, FuncDeclaration) and not node.is_parsed:
+            continue
+        for name in node.children:
+            child = getattr(node, name)
+            if type(child) is list:
+                shifts.pop(id(child), None)
+                pending.extend(child)
+            else:
+                pending.append(child)
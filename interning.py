@@ -0,0 +1,92 @@
+from typing import Dict, Optional, Set, Tuple
+
+from abstract_tree import *
+from tokens import ASSIGNOPS
+
+
+class Interner:
+    """
+    Hands out one shared node for all occurrences of the same terminal and,
+    with `expressions`, of the same pure expression: a literal expression,
+    or a unary or binary expression over pure expressions whose operator is
+    not an assignment. Expressions naming a variable or calling a function
+    are never shared, so annotations like VarExpression.symbol stay on
+    a node of their own, while their Identifier is shared.
+
+    A shared node stands for many places in the source, so it has no span;
+    the span of an occurrence is the one of its closest unshared parent.
+    Passes can memoize results per shared node by identity.
+
+    Parser uses it when given one, see Parser.interner. One interner can be
+    used for any number of programs.
+
+    Args:
+        expressions: whether pure expressions are shared, besides terminals
+    """
+
+    def __init__(self, expressions: bool = False):
+        self.expressions = expressions
+        self.terminals: Dict[Tuple[type, str], Terminal] = {}
+        # Shared expressions by their class and children
+        self.shared: Dict[tuple, AbstractExpression] = {}
+        # Ids of all shared nodes, which are kept alive by the tables above
+        self.ids: Set[int] = set()
+        # Created and reused nodes, for statistics
+        self.created = 0
+        self.reused = 0
+
+    def terminal(self, cls: type, spelling: str) -> Terminal:
+        """
+        Returns the shared terminal node of a class and spelling.
+        """
+        node = self.terminals.get((cls, spelling))
+        if node is None:
+            node = self.terminals[cls, spelling] = cls(spelling)
+            self.ids.add(id(node))
+            self.created += 1
+        else:
+            self.reused += 1
+        return node
+
+    def expression(self, node: AbstractExpression) -> AbstractExpression:
+        """
+        Returns the shared node of an expression whose children are already
+        shared, or the expression itself when it is not pure or expressions
+        are not shared. A node which becomes shared loses its span.
+        """
+        if not self.expressions:
+            return node
+        key = self.__key(node)
+        if key is None:
+            return node
+        shared = self.shared.get(key)
+        if shared is None:
+            node.start = node.end = None
+            shared = self.shared[key] = node
+            self.ids.add(id(node))
+            self.created += 1
+        else:
+            self.reused += 1
+        return shared
+
+    def is_shared(self, node: AbstractSyntaxTree) -> bool:
+        return id(node) in self.ids
+
+    def __key(self, node: AbstractExpression) -> Optional[tuple]:
+        """
+        Returns what identifies a pure expression among the others, or None
+        for an expression which is not pure.
+        """
+        cls = type(node)
+        ids = self.ids
+        if cls is IntLiteralExpression or cls is BooleanLiteralExpression:
+            if id(node.literal) in ids:
+                return cls, node.literal
+        elif cls is UnaryExpression:
+            if id(node.operator) in ids and id(node.expression) in ids:
+                return cls, node.operator, node.expression
+        elif cls is BinaryExpression:
+            if id(node.operator) in ids and node.operator.spelling not in ASSIGNOPS \
+                    and id(node.expression1) in ids and id(node.expression2) in ids:
+                return cls, node.operator, node.expression1, node.expression2
+        return None
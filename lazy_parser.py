@@ -0,0 +1,67 @@
+from parser import Parser
+from token_stream import TokenCursor
+from tokens import Kind as K, KIND_CODES
+from abstract_tree import *
+
+# Kind codes of the keywords which open a block closed by an END
+_OPENING = frozenset(KIND_CODES[kind] for kind in (K.FUNC, K.IF, K.WHILE))
+_END = KIND_CODES[K.END]
+
+
+class LazyParser(Parser):
+    """
+    A Parser which does not parse function bodies up front. The first pass
+    only finds the END closing each body by counting the blocks opened and
+    closed in the tokens, and builds a LazyFuncDeclaration which parses the
+    body when its commands are first needed.
+
+    Skipping a body needs lookahead over the whole token stream, so this
+    only happens when reading a TokenCursor; with the other scanners every
+    body is parsed right away. A syntax error in a body is raised when the
+    body is parsed, which the Checker does for every body unless it drops
+    the uncalled ones, see Checker.
+    """
+
+    def parse_single_declaration(self):
+        if self.current_terminal.kind is not K.FUNC or not isinstance(self.scanner, TokenCursor):
+            return super().parse_single_declaration()
+
+        start = self.current_terminal.start
+        self.accept(K.FUNC)
+        idf = self.parse_identifier()
+        self.accept(K.LEFT_PAR)
+        args = self.parse_expressions_list()
+        self.accept(K.RIGHT_PAR)
+        self.accept(K.COLON)
+
+        stream = self.scanner.stream
+        # The current terminal is the one before the cursor
+        body = self.scanner.index - 1
+        self.scanner.index = self.skip_block(body)
+        self.current_terminal = self.scanner.scan()
+        self.accept(K.END)
+
+        def parse_body() -> CommandList:
+            parser = type(self)(TokenCursor(stream, body), self.interner)
+            command_list = parser.parse_command_list()
+            parser.accept(K.END)
+            return command_list
+
+        return self.spanned(LazyFuncDeclaration(identifier=idf, args=args, parse_body=parse_body), start)
+
+    def skip_block(self, index: int) -> int:
+        """
+        Returns the index of the END which closes the block whose body starts
+        at token `index`, or of the EOT when the block is never closed.
+        """
+        kinds = self.scanner.stream.kinds
+        depth = 0
+        for index in range(index, len(kinds)):
+            code = kinds[index]
+            if code in _OPENING:
+                depth += 1
+            elif code == _END:
+                if not depth:
+                    return index
+                depth -= 1
+        return len(kinds) - 1
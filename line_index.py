@@ -0,0 +1,50 @@
+from array import array
+from bisect import bisect_right
+from typing import Optional, Tuple, Union
+
+
+class LineIndex:
+    """
+    Translates offsets in a source buffer into line and column numbers.
+
+    The offsets at which lines start are only collected on the first
+    lookup, so scanning a source costs nothing extra until a diagnostic
+    needs a position.
+
+    Args:
+        buffer: the source text (or the bytes of a mapped file)
+    """
+    EOL = '\n'
+
+    def __init__(self, buffer: Union[str, bytes]):
+        self.buffer = buffer
+        self.line_starts: Optional[array] = None
+
+    def __build(self) -> array:
+        eol = self.EOL if isinstance(self.buffer, str) else self.EOL.encode()
+        line_starts = array('I', [0])
+        find = self.buffer.find
+        position = find(eol)
+        while position >= 0:
+            line_starts.append(position + 1)
+            position = find(eol, position + 1)
+        return line_starts
+
+    def detach(self) -> None:
+        """
+        Collects the line starts now and lets go of the buffer, so a mapped
+        source can be released while positions can still be looked up.
+        """
+        if self.line_starts is None:
+            self.line_starts = self.__build()
+        self.buffer = None
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """
+        Returns the line and column of the character at `offset`, both
+        counted from 1.
+        """
+        if self.line_starts is None:
+            self.line_starts = self.__build()
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
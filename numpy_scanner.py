@@ -0,0 +1,213 @@
+from array import array
+from typing import Tuple, Union
+
+import numpy as np
+
+from scanner import Scanner, non_ascii_error
+from token_stream import TokenStream, TokenCursor
+from tokens import Kind, KIND_CODES, KEYWORD_KINDS
+
+Buffer = Union[str, bytes]
+
+# Character classes of the lexer. Comments are masked as BLANK.
+BLANK, ALPHA, DIGIT, EQUALS, HASH, OTHER = range(6)
+
+
+def _char_class(char: str) -> int:
+    # Same tests, in the same order, as Scanner.scan() and Scanner.scan_token()
+    if char in Scanner.BLANKS:
+        return BLANK
+    if char == '#':
+        return HASH
+    if char.isalpha():
+        return ALPHA
+    if char.isdigit():
+        return DIGIT
+    if char == '=':
+        return EQUALS
+    return OTHER
+
+
+def _symbol_kind(char: str) -> int:
+    return KIND_CODES[Scanner.SYMBOLS.get(char, Kind.ERROR)]
+
+
+# Lookup tables for the characters up to U+00FF, which are all the
+# characters of a mapped file. Wider characters are classified one distinct
+# value at a time.
+CLASSES = np.array([_char_class(chr(c)) for c in range(256)], dtype=np.uint8)
+SYMBOL_KINDS = np.array([_symbol_kind(chr(c)) for c in range(256)], dtype=np.uint8)
+
+# Keywords packed into integers, one byte per character, so identifiers
+# can be looked up with a binary search. Every keyword fits in 8 bytes.
+_KEYWORD_LENGTH = max(len(k) for k in KEYWORD_KINDS)
+_KEYWORDS = sorted(
+    (sum(ord(char) << (8 * i) for i, char in enumerate(spelling)), KIND_CODES[kind])
+    for spelling, kind in KEYWORD_KINDS.items()
+)
+KEYWORD_KEYS = np.array([key for key, _ in _KEYWORDS], dtype=np.uint64)
+KEYWORD_CODES = np.array([code for _, code in _KEYWORDS], dtype=np.uint8)
+
+_IDENTIFIER = KIND_CODES[Kind.IDENTIFIER]
+_INTEGER_LITERAL = KIND_CODES[Kind.INTEGER_LITERAL]
+_OPERATOR = KIND_CODES[Kind.OPERATOR]
+_ERROR = KIND_CODES[Kind.ERROR]
+_EOT = KIND_CODES[Kind.EOT]
+
+
+def characters(buffer: Buffer) -> np.ndarray:
+    """
+    Returns the characters of the buffer as an array of code points. Bytes
+    and memory maps are viewed in place with np.frombuffer.
+    """
+    if isinstance(buffer, str):
+        return np.frombuffer(buffer.encode('utf-32-le'), dtype=np.uint32)
+    return np.frombuffer(buffer, dtype=np.uint8)
+
+
+def classify(chars: np.ndarray) -> np.ndarray:
+    """
+    Returns the character class of every character.
+    """
+    if chars.dtype == np.uint8:
+        return CLASSES[chars]
+    classes = np.empty(len(chars), dtype=np.uint8)
+    wide = chars > 0xff
+    narrow = ~wide
+    classes[narrow] = CLASSES[chars[narrow]]
+    if wide.any():
+        values, inverse = np.unique(chars[wide], return_inverse=True)
+        classes[wide] = np.array([_char_class(chr(v)) for v in values], dtype=np.uint8)[inverse]
+    return classes
+
+
+def mask_comments(chars: np.ndarray, classes: np.ndarray, is_text: bool) -> None:
+    """
+    Marks the characters of every comment as BLANK. A comment runs from a
+    '#' outside of another comment up to the end of its line, see
+    Scanner.discard_separator(). Mapped files end lines at a bare \\r too.
+    """
+    hashes = np.flatnonzero(classes == HASH)
+    if not len(hashes):
+        return
+    eol = chars == 10 if is_text else (chars == 10) | (chars == 13)
+    line_ends = np.flatnonzero(eol)
+    ends = np.append(line_ends, len(chars))[np.searchsorted(line_ends, hashes)]
+    # The first '#' of a line starts the comment, the rest are inside it
+    first = np.empty(len(hashes), dtype=bool)
+    first[0] = True
+    np.not_equal(ends[1:], ends[:-1], out=first[1:])
+    delta = np.zeros(len(chars) + 1, dtype=np.int8)
+    delta[hashes[first]] = 1
+    delta[ends[first]] -= 1
+    classes[np.cumsum(delta[:-1], dtype=np.int8).view(bool)] = BLANK
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the start and end offsets of every run of True in the mask.
+    """
+    edges = np.diff(mask.view(np.int8), prepend=0, append=0)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def scan_arrays(buffer: Buffer) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Splits the buffer into the tokens Scanner.scan() finds and returns the
+    kind code, start and end offset of each of them, the last token being
+    EOT. Every character is classified through a lookup table and token
+    boundaries are found on whole arrays instead of character by character.
+    """
+    chars = characters(buffer)
+    length = len(chars)
+    classes = classify(chars)
+    mask_comments(chars, classes, isinstance(buffer, str))
+    if chars.dtype == np.uint8:
+        # Bytes outside of ASCII are only allowed in comments, see SourceFile
+        outside = np.flatnonzero((chars > 0x7f) & (classes != BLANK))
+        if len(outside):
+            raise non_ascii_error(buffer, int(outside[0]))
+
+    # Runs of letters and digits. Leading digits make an integer literal,
+    # everything from the first letter on an identifier.
+    alpha = classes == ALPHA
+    word_starts, word_ends = _runs(alpha | (classes == DIGIT))
+    letters = np.flatnonzero(alpha)
+    first_letters = np.append(letters, length)[np.searchsorted(letters, word_starts)]
+    first_letters = np.minimum(first_letters, word_ends)
+    is_integer = first_letters > word_starts
+    is_identifier = first_letters < word_ends
+
+    # Runs of '=' are read as '==' operators, with a lone '=' left over as
+    # an error at the end of an odd run
+    equals_starts, equals_ends = _runs(classes == EQUALS)
+    counts = (equals_ends - equals_starts + 1) // 2
+    firsts = np.cumsum(counts) - counts
+    pairs = np.arange(counts.sum()) - np.repeat(firsts, counts)
+    pair_starts = np.repeat(equals_starts, counts) + 2 * pairs
+    pair_ends = np.minimum(pair_starts + 2, np.repeat(equals_ends, counts))
+
+    singles = np.flatnonzero(classes == OTHER)
+
+    starts = np.concatenate((word_starts[is_integer], first_letters[is_identifier], pair_starts, singles))
+    ends = np.concatenate((first_letters[is_integer], word_ends[is_identifier], pair_ends, singles + 1))
+    kinds = np.concatenate((
+        np.full(is_integer.sum(), _INTEGER_LITERAL, dtype=np.uint8),
+        _identifier_kinds(chars, first_letters[is_identifier], word_ends[is_identifier]),
+        np.where(pair_ends - pair_starts == 2, _OPERATOR, _ERROR).astype(np.uint8),
+        _single_kinds(chars[singles]),
+    ))
+
+    order = np.argsort(starts, kind='stable')
+    return (np.append(kinds[order], np.uint8(_EOT)),
+            np.append(starts[order], length).astype(np.uint32),
+            np.append(ends[order], length).astype(np.uint32))
+
+
+def _identifier_kinds(chars: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Returns the kind code of every identifier, looking its spelling up in
+    the packed keywords.
+    """
+    lengths = ends - starts
+    keys = np.zeros(len(starts), dtype=np.uint64)
+    ascii = lengths <= _KEYWORD_LENGTH
+    last = len(chars) - 1
+    for i in range(_KEYWORD_LENGTH):
+        inside = i < lengths
+        values = chars[np.minimum(starts + i, last)].astype(np.uint64)
+        ascii &= ~inside | (values < 0x80)
+        keys |= np.where(inside, values, 0) << np.uint64(8 * i)
+
+    positions = np.minimum(np.searchsorted(KEYWORD_KEYS, keys), len(KEYWORD_KEYS) - 1)
+    is_keyword = ascii & (KEYWORD_KEYS[positions] == keys)
+    return np.where(is_keyword, KEYWORD_CODES[positions], _IDENTIFIER).astype(np.uint8)
+
+
+def _single_kinds(chars: np.ndarray) -> np.ndarray:
+    kinds = np.full(len(chars), _ERROR, dtype=np.uint8)
+    narrow = chars <= 0xff
+    kinds[narrow] = SYMBOL_KINDS[chars[narrow]]
+    return kinds
+
+
+def token_stream(buffer: Buffer) -> TokenStream:
+    """
+    Tokenizes the buffer with scan_arrays() into a TokenStream.
+    """
+    kinds, starts, ends = scan_arrays(buffer)
+    return TokenStream(buffer, array('B', kinds.tobytes()), _uint_array(starts), _uint_array(ends))
+
+
+def _uint_array(values: np.ndarray) -> array:
+    result = array('I')
+    result.frombytes(values.astype(np.dtype('I')).tobytes())
+    return result
+
+
+class NumpyCursor(TokenCursor):
+    """
+    A TokenCursor over a stream tokenized with scan_arrays(), for sources
+    too large to scan one token at a time.
+    """
+    scan_buffer = staticmethod(token_stream)
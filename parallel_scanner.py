@@ -0,0 +1,108 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+from exceptions import NonAsciiSourceException
+from regex_scanner import tokenize
+from scanner import SourceFile
+from token_stream import TokenStream, TokenCursor
+from tokens import Kind, KIND_CODES
+
+Buffer = Union[str, bytes]
+
+# Sources smaller than this are scanned in the calling process, where
+# starting workers would cost more than it saves
+PARALLEL_THRESHOLD = 8 * 1024 * 1024
+
+
+def split_lines(buffer: Buffer, count: int) -> List[Tuple[int, int]]:
+    """
+    Splits the buffer into at most `count` ranges of about equal size, each
+    ending right after a line break. No token spans a line break and a
+    comment always ends at one (see Scanner.discard_separator()), so every
+    range can be scanned on its own.
+    """
+    eol = SourceFile.EOL if isinstance(buffer, str) else SourceFile.EOL.encode()
+    length = len(buffer)
+    ranges = []
+    start = 0
+    for i in range(1, count + 1):
+        if start >= length:
+            break
+        end = length
+        if i < count:
+            end = buffer.find(eol, max(start, length * i // count))
+            end = length if end < 0 else end + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def scan_chunk(chunk: Buffer, offset: int) -> Tuple[array, array, array]:
+    """
+    Tokenizes one range of a source, which starts at `offset`, and returns
+    the kind codes and the start and end offsets in the whole source of its
+    tokens, without the final EOT.
+    """
+    kinds = array('B')
+    starts = array('I')
+    ends = array('I')
+    codes = KIND_CODES
+    add_kind, add_start, add_end = kinds.append, starts.append, ends.append
+    for kind, start, end in tokenize(chunk):
+        if kind is Kind.EOT:
+            break
+        add_kind(codes[kind])
+        add_start(start + offset)
+        add_end(end + offset)
+    return kinds, starts, ends
+
+
+def scan_parallel(buffer: Buffer, workers: Optional[int] = None,
+                  threshold: int = PARALLEL_THRESHOLD) -> TokenStream:
+    """
+    Tokenizes a source into a TokenStream, splitting it at line breaks into
+    one range per worker process when it is at least `threshold` characters
+    long. The tokens are the same as TokenStream.from_buffer() finds.
+
+    Args:
+        buffer: the source text (or the bytes of a mapped file)
+        workers: number of worker processes, by default one per CPU
+        threshold: smallest source size scanned in parallel
+    """
+    workers = workers or os.cpu_count() or 1
+    if len(buffer) < threshold or workers < 2:
+        return TokenStream.from_buffer(buffer)
+
+    ranges = split_lines(buffer, workers)
+    if len(ranges) < 2:
+        # Empty, or without a line break to split at
+        return TokenStream.from_buffer(buffer)
+    kinds = array('B')
+    starts = array('I')
+    ends = array('I')
+    try:
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            chunks = [buffer[start:end] for start, end in ranges]
+            offsets = [start for start, _ in ranges]
+            for chunk_kinds, chunk_starts, chunk_ends in executor.map(scan_chunk, chunks, offsets):
+                kinds.extend(chunk_kinds)
+                starts.extend(chunk_starts)
+                ends.extend(chunk_ends)
+    except NonAsciiSourceException:
+        # A worker only knows the lines of its range. Scanning here raises
+        # the error again with its position in the whole source.
+        return TokenStream.from_buffer(buffer)
+
+    kinds.append(KIND_CODES[Kind.EOT])
+    starts.append(len(buffer))
+    ends.append(len(buffer))
+    return TokenStream(buffer, kinds, starts, ends)
+
+
+class ParallelCursor(TokenCursor):
+    """
+    A TokenCursor over a stream tokenized by scan_parallel().
+    """
+    scan_buffer = staticmethod(scan_parallel)
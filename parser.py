@@ -1,5 +1,11 @@
+from typing import Optional
+
+from interning import Interner
+from parallel_scanner import ParallelCursor
+from regex_scanner import RegexScanner
 from scanner import Scanner
-from tokens import Kind as K, TYPE_DENOTERS
+from token_stream import TokenCursor
+from tokens import Kind as K, TYPE_DENOTERS, BINARY_PRECEDENCE
 from abstract_tree import *
 from exceptions import (UnexpectedTokenException,
                         UnsupportedExpressionTokenException,
@@ -7,55 +13,163 @@ from exceptions import (UnexpectedTokenException,
                         UnsupportedDeclarationTokenException,
                         UnexpectedEndOfProgramException)
 
+# Scanner backends a parser can read a source with
+SCANNERS = {
+    'char': Scanner,
+    'regex': RegexScanner,
+    'stream': TokenCursor,
+    'parallel': ParallelCursor,
+}
+
+try:
+    from numpy_scanner import NumpyCursor
+    SCANNERS['numpy'] = NumpyCursor
+except ImportError:
+    # NumPy is optional; without it the 'numpy' backend is not offered
+    pass
+
+# The backend used when none is named, by every parser and compile_source().
+# LazyParser and TableParser only work ahead of the scanner on its tokens.
+DEFAULT_SCANNER = 'stream'
+
 
 class Parser:
-    def __init__(self, scanner: Scanner):
+    # Whether parse_program() reports a program parsed without errors on
+    # stdout, as the compiler always has
+    verbose: bool = True
+
+    def __init__(self, scanner: Scanner, interner: Optional[Interner] = None):
         self.scanner = scanner
+        # Shares terminal nodes, and pure expressions if it is asked to,
+        # between their occurrences. Shared nodes have no span.
+        self.interner = interner
+        self.previous_end = 0
         self.current_terminal = scanner.scan()
 
+    @classmethod
+    def from_file(cls, filename: str, scanner: str = DEFAULT_SCANNER) -> 'Parser':
+        """
+        Creates a parser for a source file, read by one of the SCANNERS backends.
+        """
+        return cls(SCANNERS[scanner].from_file(filename))
+
+    @classmethod
+    def from_string(cls, text: str, scanner: str = DEFAULT_SCANNER) -> 'Parser':
+        """
+        Creates a parser for program text held in memory.
+        """
+        return cls(SCANNERS[scanner].from_string(text))
+
+    @classmethod
+    def from_bytes(cls, data, scanner: str = DEFAULT_SCANNER) -> 'Parser':
+        """
+        Creates a parser for program bytes held in memory.
+        """
+        return cls(SCANNERS[scanner].from_bytes(data))
+
+    @property
+    def current_line(self) -> int:
+        """
+        Line of the current terminal, for diagnostics.
+        """
+        return self.scanner.line_index.position(self.current_terminal.start)[0]
+
+    @property
+    def current_column(self) -> int:
+        """
+        Column of the current terminal, for diagnostics.
+        """
+        return self.scanner.line_index.position(self.current_terminal.start)[1]
+
+    def advance(self) -> None:
+        """
+        Moves to the next terminal, remembering where the consumed one ended.
+        """
+        self.previous_end = self.current_terminal.end
+        self.current_terminal = self.scanner.scan()
+
+    def spanned(self, node: AbstractSyntaxTree, start: int) -> AbstractSyntaxTree:
+        """
+        Sets the span of a node which was parsed from `start` up to the last
+        consumed terminal. A node which consumed nothing gets an empty span.
+        """
+        node.start = start
+        node.end = max(start, self.previous_end)
+        return node
+
+    def terminal_node(self, cls: type) -> Terminal:
+        """
+        Returns a node of the class for the current terminal and moves past
+        it. With an interner, it is the node shared by all its occurrences.
+        """
+        spelling = self.current_terminal.spelling
+        if self.interner is not None:
+            self.advance()
+            return self.interner.terminal(cls, spelling)
+        start = self.current_terminal.start
+        self.advance()
+        return self.spanned(cls(spelling), start)
+
+    def shared(self, expression: AbstractExpression) -> AbstractExpression:
+        """
+        Returns the node shared by all occurrences of a pure expression when
+        the interner shares expressions, or else the expression itself.
+        """
+        if self.interner is None:
+            return expression
+        return self.interner.expression(expression)
+
     def parse_program(self) -> Program:
+        start = self.current_terminal.start
         cmd = self.parse_command_list()
 
         if self.current_terminal.kind is not K.EOT:
             raise UnexpectedEndOfProgramException(self.current_terminal)
-        print(f"Successfully parsed the program.")
-        return Program(command_list=cmd)
+        self.report_success()
+        return self.spanned(Program(command_list=cmd), start)
+
+    def report_success(self) -> None:
+        if self.verbose:
+            print(f"Successfully parsed the program.")
 
     def parse_command_list(self) -> CommandList:
         valid_kinds = [K.IDENTIFIER, K.FUNC, K.IF,
                        K.WHILE, K.RETURN] + TYPE_DENOTERS
+        start = self.current_terminal.start
         cmd_list = CommandList()
         while self.current_terminal.kind in valid_kinds:
             cmd = self.parse_single_command()
             cmd_list.commands.append(cmd)
-        return cmd_list
+        return self.spanned(cmd_list, start)
 
     def parse_single_command(self) -> AbstractCommand:
+        start = self.current_terminal.start
         if self.current_terminal.kind is K.FUNC:
             dec = self.parse_declaration_list()
-            return DeclarationCommand(declaration_list=dec)
+            return self.spanned(DeclarationCommand(declaration_list=dec), start)
 
         elif self.current_terminal.kind in [K.RETURN, K.IF, K.WHILE]:
             st = self.parse_single_statement()
-            return StatementCommand(statement=st)
+            return self.spanned(StatementCommand(statement=st), start)
 
         elif self.current_terminal.kind is K.IDENTIFIER:
             st = self.parse_single_statement()
             self.accept(K.SEMICOLON)
-            return StatementCommand(statement=st)
+            return self.spanned(StatementCommand(statement=st), start)
 
         elif self.current_terminal.kind in TYPE_DENOTERS:
             dec = self.parse_declaration_list()
-            return DeclarationCommand(declaration_list=dec)
+            return self.spanned(DeclarationCommand(declaration_list=dec), start)
 
         else:
             raise UnsupportedCommandTokenException(
                 current_token=self.current_terminal,
-                current_line=self.scanner.current_line,
-                current_column=self.scanner.current_column
+                current_line=self.current_line,
+                current_column=self.current_column
             )
 
     def parse_single_statement(self):
+        start = self.current_terminal.start
         if self.current_terminal.kind is K.IF:
             self.accept(K.IF)
             self.accept(K.LEFT_PAR)
@@ -69,11 +183,11 @@ class Parser:
                 self.accept(K.COLON)
                 else_block = self.parse_command_list()
             self.accept(K.END)
-            return IfStatement(
+            return self.spanned(IfStatement(
                 expr=exp,
                 if_com=if_block,
                 else_com=else_block
-            )
+            ), start)
 
         elif self.current_terminal.kind is K.WHILE:
             self.accept(K.WHILE)
@@ -83,27 +197,29 @@ class Parser:
             self.accept(K.COLON)
             cmd_list = self.parse_command_list()
             self.accept(K.END)
-            return WhileStatement(
+            return self.spanned(WhileStatement(
                 expr=exp,
                 command=cmd_list
-            )
+            ), start)
 
         elif self.current_terminal.kind is K.RETURN:
             self.accept(K.RETURN)
             exp = self.parse_single_expression()
-            return ReturnStatement(exp)
+            return self.spanned(ReturnStatement(exp), start)
 
         elif self.current_terminal.kind is K.IDENTIFIER:
             exp_list = self.parse_expression_list_assign_operator()
-            return ExpressionStatement(expressions=exp_list)
+            return self.spanned(ExpressionStatement(expressions=exp_list), start)
 
     def parse_declaration_list(self):
+        start = self.current_terminal.start
         res = DeclarationList()
         while self.current_terminal.kind in [K.FUNC] + TYPE_DENOTERS:
             res.declarations.append(self.parse_single_declaration())
-        return res
+        return self.spanned(res, start)
 
     def parse_single_declaration(self):
+        start = self.current_terminal.start
         if self.current_terminal.kind is K.FUNC:
             self.accept(K.FUNC)
             idf = self.parse_identifier()
@@ -112,13 +228,12 @@ class Parser:
             self.accept(K.RIGHT_PAR)
             self.accept(K.COLON)
             command_list = self.parse_command_list()
-            self.parse_command_list()
             self.accept(K.END)
-            return FuncDeclaration(
+            return self.spanned(FuncDeclaration(
                 identifier=idf,
                 args=args,
                 commands=command_list
-            )
+            ), start)
 
         elif self.current_terminal.kind in [K.STRING_TYPE, K.INTEGER_TYPE, K.BOOLEAN_TYPE]:
             type_i = self.parse_type_indicator()
@@ -127,75 +242,62 @@ class Parser:
                 opr = self.parse_operator()
                 exp_list = self.parse_expression_list_assign_operator()
                 self.accept(K.SEMICOLON)
-                return VarDeclarationWithAssignment(
+                return self.spanned(VarDeclarationWithAssignment(
                     type_indicator=type_i,
                     identifier=idf,
                     operator=opr,
-                    expression=exp_list)
+                    expression=exp_list), start)
             else:
                 self.accept(K.SEMICOLON)
-                return VarDeclaration(
+                return self.spanned(VarDeclaration(
                     type_indicator=type_i,
-                    identifier=idf)
+                    identifier=idf), start)
 
         else:
             raise UnsupportedDeclarationTokenException(
                 current_token=self.current_terminal,
-                current_line=self.scanner.current_line,
-                current_column=self.scanner.current_column
+                current_line=self.current_line,
+                current_column=self.current_column
             )
 
     def parse_expression_list_assign_operator(self):
-        res = self.parse_expression_list_add_operator()
-        while self.current_terminal.is_assign_operator():
-            opr = self.parse_operator()
-            tmp = self.parse_expression_list_add_operator()
-            res = BinaryExpression(
-                operator=opr,
-                expression1=res,
-                expression2=tmp
-            )
-        return res
-
-    def parse_expression_list_add_operator(self):
-        res = self.parse_expression_list_mul_operator()
-        while self.current_terminal.is_add_operator():
-            opr = self.parse_operator()
-            tmp = self.parse_expression_list_mul_operator()
-
-            res = BinaryExpression(
-                operator=opr,
-                expression1=res,
-                expression2=tmp
-            )
-        return res
-
-    def parse_expression_list_mul_operator(self):
-        res = self.parse_single_expression()
-        while self.current_terminal.is_mul_operator():
-            opr = self.parse_operator()
-            tmp = self.parse_single_expression()
-
-            res = BinaryExpression(
-                operator=opr,
-                expression1=res,
-                expression2=tmp
-            )
-        return res
+        """
+        Parses an expression by precedence climbing over BINARY_PRECEDENCE.
+        Left operands wait on a stack with their operator until one that
+        binds no tighter follows, which then applies them.
+        """
+        precedence_of = BINARY_PRECEDENCE.get
+        # The starts are kept apart, as shared operands have no span
+        start = self.current_terminal.start
+        operand = self.parse_single_expression()
+        pending = []
+        while True:
+            # Only operator tokens are spelled like a binary operator
+            precedence = precedence_of(self.current_terminal.spelling, 0)
+            while pending and pending[-1][2] >= precedence:
+                left, operator, _, start = pending.pop()
+                node = BinaryExpression(operator=operator, expression1=left, expression2=operand)
+                operand = self.shared(self.spanned(node, start))
+            if not precedence:
+                return operand
+            pending.append((operand, self.parse_operator(), precedence, start))
+            start = self.current_terminal.start
+            operand = self.parse_single_expression()
 
     def parse_single_expression(self):
+        start = self.current_terminal.start
         if self.current_terminal.kind is K.INTEGER_LITERAL:
             int_literal = self.parse_integer_literal()
-            return IntLiteralExpression(literal=int_literal)
+            return self.shared(self.spanned(IntLiteralExpression(literal=int_literal), start))
 
         elif self.current_terminal.kind in [K.TRUE, K.FALSE]:
             bool_literal = self.parse_boolean()
-            return BooleanLiteralExpression(literal=bool_literal)
+            return self.shared(self.spanned(BooleanLiteralExpression(literal=bool_literal), start))
 
         elif self.current_terminal.kind is K.OPERATOR:
             opr = self.parse_operator()
             exp_list = self.parse_single_expression()
-            return UnaryExpression(operator=opr, expression=exp_list)
+            return self.shared(self.spanned(UnaryExpression(operator=opr, expression=exp_list), start))
 
         elif self.current_terminal.kind is K.IDENTIFIER:
             idf = self.parse_identifier()
@@ -204,83 +306,74 @@ class Parser:
                 self.accept(K.LEFT_PAR)
                 exp_list = self.parse_expressions_list()
                 self.accept(K.RIGHT_PAR)
-                return CallExpression(name=idf, args=exp_list)
+                return self.spanned(CallExpression(name=idf, args=exp_list), start)
             # identifier ~ expression
             elif self.current_terminal.is_assign_operator():
-                var_exp = VarExpression(idf)
+                var_exp = self.spanned(VarExpression(idf), start)
                 opr = self.parse_operator()
                 exp_list = self.parse_expression_list_assign_operator()
-                return BinaryExpression(
+                return self.spanned(BinaryExpression(
                     operator=opr,
                     expression1=var_exp,
                     expression2=exp_list
-                )
+                ), start)
             else:
-                return VarExpression(idf)
+                return self.spanned(VarExpression(idf), start)
 
         else:
             raise UnsupportedExpressionTokenException(
                 current_token=self.current_terminal,
-                current_line=self.scanner.current_line,
-                current_column=self.scanner.current_column
+                current_line=self.current_line,
+                current_column=self.current_column
             )
 
     def parse_expressions_list(self):
         if self.current_terminal.kind in [K.IDENTIFIER, K.INTEGER_LITERAL, K.OPERATOR, K.TRUE, K.FALSE]:
+            start = self.current_terminal.start
             exp_list = ArgumentsList()
             exp = self.parse_expression_list_assign_operator()
             exp_list.expressions.append(exp)
             while self.current_terminal.kind is K.COMMA:
                 self.accept(K.COMMA)
                 exp_list.expressions.append(self.parse_expression_list_assign_operator())
-            return exp_list
+            return self.spanned(exp_list, start)
 
     def parse_type_indicator(self):
         if self.current_terminal.kind in TYPE_DENOTERS:
-            type_i = TypeIndicator(spelling=self.current_terminal.spelling)
-            self.current_terminal = self.scanner.scan()
-            return type_i
+            return self.terminal_node(TypeIndicator)
 
     def parse_integer_literal(self) -> IntegerLiteral:
         if self.current_terminal.kind is K.INTEGER_LITERAL:
-            int_literal = IntegerLiteral(self.current_terminal.spelling)
-            self.current_terminal = self.scanner.scan()
-            return int_literal
+            return self.terminal_node(IntegerLiteral)
 
     def parse_identifier(self) -> Identifier:
         if self.current_terminal.kind is K.IDENTIFIER:
-            idf = Identifier(self.current_terminal.spelling)
-            self.current_terminal = self.scanner.scan()
-            return idf
+            return self.terminal_node(Identifier)
 
     def parse_boolean(self) -> BooleanLiteral:
         if self.current_terminal.kind in [K.TRUE, K.FALSE]:
-            bool_literal = BooleanLiteral(spelling=self.current_terminal.spelling)
-            self.current_terminal = self.scanner.scan()
-            return bool_literal
+            return self.terminal_node(BooleanLiteral)
 
     def parse_operator(self) -> Operator:
         if self.current_terminal.kind is K.OPERATOR:
-            opr = Operator(self.current_terminal.spelling)
-            self.current_terminal = self.scanner.scan()
-            return opr
+            return self.terminal_node(Operator)
         else:
             raise UnexpectedTokenException(
                 expected_kind=K.OPERATOR,
                 current_token=self.current_terminal,
-                current_line=self.scanner.current_line,
-                current_column=self.scanner.current_column
+                current_line=self.current_line,
+                current_column=self.current_column
             )
 
     def accept(self, token: K):
         if self.current_terminal.kind is token:
-            self.current_terminal = self.scanner.scan()
+            self.advance()
             return True
         else:
             # return False
             raise UnexpectedTokenException(
                 expected_kind=token,
                 current_token=self.current_terminal,
-                current_line=self.scanner.current_line,
-                current_column=self.scanner.current_column
+                current_line=self.current_line,
+                current_column=self.current_column
             )
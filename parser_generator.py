@@ -0,0 +1,285 @@
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# The symbol standing for the empty sequence
+EPSILON = 'ε'
+
+_TOKEN = re.compile(r'\s*(::=|=>|[()|*]|[^\s()|*]+)')
+
+
+class GrammarError(Exception):
+    """
+    An exception thrown when a grammar description can't be read, or when
+    the grammar it describes is not LL(1).
+    """
+
+
+class Production:
+    """
+    One alternative of a nonterminal.
+
+    Args:
+        lhs: the nonterminal
+        rhs: the symbols of the alternative, empty for ε
+        action: name of the action which builds the value of the
+            alternative, or None when the values of its symbols are left
+            to the enclosing alternative
+    """
+
+    def __init__(self, lhs: str, rhs: Sequence[str], action: Optional[str] = None):
+        self.lhs = lhs
+        self.rhs = tuple(rhs)
+        self.action = action
+
+    def __repr__(self):
+        rhs = ' '.join(self.rhs) or EPSILON
+        action = f' => {self.action}' if self.action else ''
+        return f'{self.lhs} ::= {rhs}{action}'
+
+
+class Grammar:
+    """
+    A context-free grammar over a fixed list of terminals, with the FIRST
+    and FOLLOW sets and the LL(1) prediction table computed from it. Sets of
+    terminals are int bitmasks, bit i standing for terminals[i].
+
+    Args:
+        terminals: names of the terminals, in the order of their bits
+        productions: all alternatives, the first one of the start symbol
+        end: the terminal which follows the start symbol
+    """
+
+    def __init__(self, terminals: Sequence[str], productions: List[Production], end: str):
+        self.terminals = list(terminals)
+        self.productions = productions
+        self.start = productions[0].lhs
+        self.end = end
+        self.nonterminals: List[str] = []
+        for production in productions:
+            if production.lhs not in self.nonterminals:
+                self.nonterminals.append(production.lhs)
+
+        self.bits: Dict[str, int] = {t: 1 << i for i, t in enumerate(self.terminals)}
+        for production in productions:
+            for symbol in production.rhs:
+                if symbol not in self.bits and symbol not in self.nonterminals:
+                    raise GrammarError(f"{symbol} in '{production}' is neither a terminal nor a nonterminal.")
+        if end not in self.bits:
+            raise GrammarError(f"{end} is not a terminal.")
+
+        self.nullable = self.__nullable()
+        self.first = self.__first()
+        self.follow = self.__follow()
+
+    def __nullable(self) -> frozenset:
+        nullable = set()
+        changed = True
+        while changed:
+            changed = False
+            for p in self.productions:
+                if p.lhs not in nullable and all(s in nullable for s in p.rhs):
+                    nullable.add(p.lhs)
+                    changed = True
+        return frozenset(nullable)
+
+    def first_of(self, symbols: Sequence[str], first: Dict[str, int] = None) -> int:
+        """
+        Returns the terminals a sequence of symbols can start with.
+        """
+        first = self.first if first is None else first
+        result = 0
+        for symbol in symbols:
+            if symbol in self.bits:
+                return result | self.bits[symbol]
+            result |= first[symbol]
+            if symbol not in self.nullable:
+                break
+        return result
+
+    def __first(self) -> Dict[str, int]:
+        first = {n: 0 for n in self.nonterminals}
+        changed = True
+        while changed:
+            changed = False
+            for p in self.productions:
+                bits = first[p.lhs] | self.first_of(p.rhs, first)
+                if bits != first[p.lhs]:
+                    first[p.lhs] = bits
+                    changed = True
+        return first
+
+    def __follow(self) -> Dict[str, int]:
+        follow = {n: 0 for n in self.nonterminals}
+        follow[self.start] = self.bits[self.end]
+        changed = True
+        while changed:
+            changed = False
+            for p in self.productions:
+                for i, symbol in enumerate(p.rhs):
+                    if symbol in self.bits:
+                        continue
+                    rest = p.rhs[i + 1:]
+                    bits = follow[symbol] | self.first_of(rest)
+                    if all(s in self.nullable for s in rest):
+                        bits |= follow[p.lhs]
+                    if bits != follow[symbol]:
+                        follow[symbol] = bits
+                        changed = True
+        return follow
+
+    def predict(self, production: Production) -> int:
+        """
+        Returns the terminals on which the production is chosen.
+        """
+        bits = self.first_of(production.rhs)
+        if all(s in self.nullable for s in production.rhs):
+            bits |= self.follow[production.lhs]
+        return bits
+
+    def table(self) -> Tuple[List[List[int]], List[int]]:
+        """
+        Returns the prediction table: for every nonterminal, the index of
+        the production chosen on each terminal, or -1. Also returns the
+        production of every nonterminal which derives ε, or -1; a parser
+        may choose it on terminals without an entry, leaving the error to
+        be found at the next terminal.
+
+        When an alternative which derives ε and one starting with the
+        terminal are both predicted, the latter is chosen, so a repetition
+        or optional part takes as much input as it can, like a hand-written
+        parser does. Any other conflict is a GrammarError.
+        """
+        index = {n: i for i, n in enumerate(self.nonterminals)}
+        starts = [self.first_of(p.rhs) for p in self.productions]
+        rows = [[-1] * len(self.terminals) for _ in self.nonterminals]
+        defaults = [-1] * len(self.nonterminals)
+        for number, p in enumerate(self.productions):
+            row = rows[index[p.lhs]]
+            if all(s in self.nullable for s in p.rhs):
+                defaults[index[p.lhs]] = number
+            predicted = self.predict(p)
+            for t, terminal in enumerate(self.terminals):
+                if not predicted >> t & 1:
+                    continue
+                other = row[t]
+                if other >= 0:
+                    # Only one of them may start with the terminal
+                    if starts[number] >> t & 1 == starts[other] >> t & 1:
+                        raise GrammarError(f"{p.lhs} is not LL(1): '{self.productions[other]}' and '{p}' "
+                                           f"are both predicted on {terminal}.")
+                    if not starts[number] >> t & 1:
+                        continue
+                row[t] = number
+        return rows, defaults
+
+
+def read_grammar(text: str, terminals: Sequence[str], end: str) -> Grammar:
+    """
+    Reads a grammar description in the notation of README.md. Every rule is
+
+        Nonterminal ::= alternative | alternative ...
+
+    where a rule may go on over lines which start with `|` or `=>`, and
+    everything after a `#` is a comment. An alternative is a sequence of
+    terminals and nonterminals, or ε. Parts can be grouped in parentheses and repeated with
+    a trailing `*`. A top-level alternative may end with `=> action`, naming
+    the action which builds its value. Groups and repetitions become
+    nonterminals of their own, named after their text.
+    """
+    reader = _Reader()
+    rules: List[Tuple[str, List[str]]] = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        tokens = _TOKEN.findall(line)
+        if len(tokens) > 1 and tokens[1] == '::=':
+            rules.append((tokens[0], tokens[2:]))
+        elif tokens[0] in ('|', '=>') and rules:
+            rules[-1][1].extend(tokens)
+        else:
+            raise GrammarError(f"Line {number} of the grammar is not a rule: {line}")
+
+    for lhs, tokens in rules:
+        reader.rule(lhs, tokens)
+    return Grammar(terminals, reader.productions + reader.generated_productions, end)
+
+
+class _Reader:
+    """
+    Turns the tokens of rules into productions, adding a nonterminal for
+    every group and repetition.
+    """
+
+    def __init__(self):
+        self.productions: List[Production] = []
+        self.generated_productions: List[Production] = []
+        self.generated = set()
+
+    def rule(self, lhs: str, tokens: List[str]) -> None:
+        position = 0
+        while True:
+            rhs, position = self.sequence(tokens, position)
+            action = None
+            if position < len(tokens) and tokens[position] == '=>':
+                if position + 1 >= len(tokens):
+                    raise GrammarError(f"Missing action in the rule of {lhs}.")
+                action = tokens[position + 1]
+                position += 2
+            self.productions.append(Production(lhs, rhs, action))
+            if position == len(tokens):
+                return
+            if tokens[position] != '|':
+                raise GrammarError(f"Unexpected '{tokens[position]}' in the rule of {lhs}.")
+            position += 1
+
+    def alternatives(self, tokens: List[str], position: int) -> Tuple[List[List[str]], int]:
+        result = []
+        while True:
+            rhs, position = self.sequence(tokens, position)
+            result.append(rhs)
+            if position < len(tokens) and tokens[position] == '|':
+                position += 1
+            else:
+                return result, position
+
+    def sequence(self, tokens: List[str], position: int) -> Tuple[List[str], int]:
+        rhs = []
+        while position < len(tokens) and tokens[position] not in ('|', ')', '=>'):
+            token = tokens[position]
+            position += 1
+            if token == '(':
+                alternatives, position = self.alternatives(tokens, position)
+                if position >= len(tokens) or tokens[position] != ')':
+                    raise GrammarError(f"Unclosed group in '{' '.join(tokens)}'.")
+                position += 1
+                symbol = self.group(alternatives)
+            elif token == EPSILON:
+                continue
+            elif token in ('*', '::='):
+                raise GrammarError(f"Unexpected '{token}' in '{' '.join(tokens)}'.")
+            else:
+                symbol = token
+            if position < len(tokens) and tokens[position] == '*':
+                position += 1
+                symbol = self.repetition(symbol)
+            rhs.append(symbol)
+        return rhs, position
+
+    def group(self, alternatives: List[List[str]]) -> str:
+        if len(alternatives) == 1 and len(alternatives[0]) == 1:
+            return alternatives[0][0]
+        name = '(' + ' | '.join(' '.join(rhs) or EPSILON for rhs in alternatives) + ')'
+        if name not in self.generated:
+            self.generated.add(name)
+            for rhs in alternatives:
+                self.generated_productions.append(Production(name, rhs))
+        return name
+
+    def repetition(self, symbol: str) -> str:
+        name = symbol + '*'
+        if name not in self.generated:
+            self.generated.add(name)
+            self.generated_productions.append(Production(name, [symbol, name]))
+            self.generated_productions.append(Production(name, []))
+        return name
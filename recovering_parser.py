@@ -0,0 +1,107 @@
+from typing import List, Optional, Tuple
+
+from interning import Interner
+from parser import Parser
+from tokens import Kind as K, TYPE_DENOTERS
+from abstract_tree import *
+from exceptions import (UnexpectedTokenException,
+                        UnsupportedTokenException,
+                        UnsupportedCommandTokenException)
+
+# Exceptions which report a syntax error inside of a command
+PARSE_ERRORS = (UnexpectedTokenException, UnsupportedTokenException)
+
+# Kinds a command or a declaration starts with
+COMMAND_FIRST = frozenset([K.IDENTIFIER, K.FUNC, K.IF, K.WHILE, K.RETURN] + TYPE_DENOTERS)
+# Kinds which may follow a command list
+COMMAND_LIST_FOLLOW = frozenset([K.END, K.ELSE, K.EOT])
+# Kinds a command is resumed at after an error. Identifiers are left out,
+# since they occur inside of expressions as well.
+SYNCHRONIZING = frozenset([K.FUNC, K.IF, K.WHILE, K.RETURN] + TYPE_DENOTERS) | COMMAND_LIST_FOLLOW
+# Commands which are closed by an END
+BLOCKS = frozenset([K.FUNC, K.IF, K.WHILE])
+
+
+class RecoveringParser(Parser):
+    """
+    A Parser which does not stop at the first syntax error. Every error is
+    recorded in `errors` and parsing goes on with the next command, so one
+    pass reports all the errors of a program. The returned Program holds
+    the commands which parsed without errors.
+    """
+
+    def __init__(self, scanner, interner: Optional[Interner] = None):
+        super().__init__(scanner, interner)
+        self.errors: List[Exception] = []
+
+    def parse(self) -> Tuple[Program, List[Exception]]:
+        """
+        Parses the whole program and returns it with the syntax errors found.
+        """
+        return self.parse_program(), self.errors
+
+    def parse_program(self) -> Program:
+        start = self.current_terminal.start
+        cmd = self.parse_command_list()
+
+        # An END or ELSE without a block ends the command list early
+        while self.current_terminal.kind is not K.EOT:
+            self.errors.append(self.__unsupported_command())
+            self.advance()
+            cmd.commands.extend(self.parse_command_list().commands)
+            cmd.end = max(cmd.start, self.previous_end)
+
+        if not self.errors:
+            self.report_success()
+        return self.spanned(Program(command_list=cmd), start)
+
+    def parse_command_list(self) -> CommandList:
+        start = self.current_terminal.start
+        cmd_list = CommandList()
+        # ENDs (and ELSEs) left over by blocks whose header failed to parse
+        unclosed = 0
+        while True:
+            kind = self.current_terminal.kind
+            if kind in COMMAND_FIRST:
+                command_start = self.current_terminal.start
+                try:
+                    cmd_list.commands.append(self.parse_single_command())
+                except PARSE_ERRORS as error:
+                    self.errors.append(error)
+                    if kind in BLOCKS and not (isinstance(error, UnexpectedTokenException)
+                                               and error.expected_kind is K.END):
+                        unclosed += 1
+                    if self.current_terminal.start == command_start:
+                        self.advance()
+                    self.synchronize()
+            elif unclosed and kind in (K.END, K.ELSE):
+                if kind is K.END:
+                    unclosed -= 1
+                self.advance()
+                if kind is K.ELSE and self.current_terminal.kind is K.COLON:
+                    self.advance()
+            elif kind in COMMAND_LIST_FOLLOW:
+                break
+            else:
+                self.errors.append(self.__unsupported_command())
+                self.advance()
+                self.synchronize()
+        return self.spanned(cmd_list, start)
+
+    def synchronize(self) -> None:
+        """
+        Skips terminals up to the start of the next command: past a
+        semicolon, or up to a keyword a command starts or a block ends with.
+        """
+        while self.current_terminal.kind not in SYNCHRONIZING:
+            kind = self.current_terminal.kind
+            self.advance()
+            if kind is K.SEMICOLON:
+                return
+
+    def __unsupported_command(self) -> UnsupportedCommandTokenException:
+        return UnsupportedCommandTokenException(
+            current_token=self.current_terminal,
+            current_line=self.current_line,
+            current_column=self.current_column
+        )
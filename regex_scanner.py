@@ -0,0 +1,177 @@
+import re
+from typing import Iterator, Tuple, Union
+
+from scanner import Scanner, SourceFile, non_ascii_error
+from tokens import Kind, Token, KEYWORD_KINDS
+
+# Each match skips the separators in front of a token and captures the token
+# in one of the numbered groups below. The final match captures nothing.
+_TOKEN_PATTERN = r'''
+    (?:[ \t\r\n]|\#[^{eol}]*)*
+    (?:
+        ([A-Za-z][A-Za-z0-9]*)
+      | ([0-9]+)
+      | (==|[~+\-/*])
+      | ([;()":,])
+      | (.)
+      | $
+    )
+'''
+_IDENTIFIER, _INTEGER_LITERAL, _OPERATOR, _SYMBOL, _ERROR = range(1, 6)
+
+# Master patterns, indexed by SourceFile.is_text. Mapped files end comments
+# at a bare \r as well, see SourceFile.get_line_rest().
+TOKEN_PATTERNS = (
+    re.compile(_TOKEN_PATTERN.format(eol=r'\r\n').encode(), re.VERBOSE | re.DOTALL),
+    re.compile(_TOKEN_PATTERN.format(eol=r'\n'), re.VERBOSE | re.DOTALL),
+)
+
+_BYTE_CHARS = SourceFile._BYTE_CHARS
+
+Buffer = Union[str, bytes]
+
+
+def tokenize(buffer: Buffer, position: int = 0) -> Iterator[Tuple[Kind, int, int]]:
+    """
+    Splits the buffer into tokens with a single master pattern and yields the
+    kind, start and end offset of each of them, from `position` up to and
+    including the EOT token.
+
+    The pattern only knows ASCII letters and digits. When a run of them
+    continues with another character, the token is scanned with the rules of
+    Scanner.scan_token() instead, so that both scanners agree on every input.
+    A byte buffer may only hold other bytes in comments, see SourceFile.
+    """
+    text = isinstance(buffer, str)
+    pattern = TOKEN_PATTERNS[text]
+    length = len(buffer)
+    symbols = Scanner.SYMBOLS
+    keyword_kind = KEYWORD_KINDS.get
+
+    while True:
+        for match in pattern.finditer(buffer, position):
+            group = match.lastindex
+            if group is None:
+                break
+
+            start, end = match.span(group)
+            if group <= _INTEGER_LITERAL:
+                if end < length and _char_at(buffer, text, end) > '\x7f':
+                    break
+                if group == _IDENTIFIER:
+                    spelling = match.group(group) if text else match.group(group).decode('ascii')
+                    yield keyword_kind(spelling, Kind.IDENTIFIER), start, end
+                else:
+                    yield Kind.INTEGER_LITERAL, start, end
+            elif group == _OPERATOR:
+                yield Kind.OPERATOR, start, end
+            elif group == _SYMBOL:
+                yield symbols[_char_at(buffer, text, start)], start, end
+            else:
+                char = _char_at(buffer, text, start)
+                if char > '\x7f' and (char.isalpha() or char.isdigit()):
+                    break
+                yield Kind.ERROR, start, end
+
+        if group is None:
+            break
+
+        kind, end = _scan_with_character_rules(buffer, text, start)
+        if kind is Kind.IDENTIFIER:
+            kind = keyword_kind(_spelling(buffer, text, start, end), Kind.IDENTIFIER)
+        yield kind, start, end
+        position = end
+
+    yield Kind.EOT, length, length
+
+
+def _char_at(buffer: Buffer, text: bool, position: int) -> str:
+    if text:
+        return buffer[position]
+    byte = buffer[position]
+    if byte > 0x7f:
+        raise non_ascii_error(buffer, position)
+    return _BYTE_CHARS[byte]
+
+
+def _spelling(buffer: Buffer, text: bool, start: int, end: int) -> str:
+    if text:
+        return buffer[start:end]
+    return bytes(buffer[start:end]).decode('ascii')
+
+
+def _scan_with_character_rules(buffer: Buffer, text: bool, start: int) -> Tuple[Kind, int]:
+    """
+    Scans an identifier or integer literal which contains characters outside
+    of ASCII, applying the same tests as Scanner.scan_token().
+    """
+    length = len(buffer)
+    end = start + 1
+    if _char_at(buffer, text, start).isalpha():
+        while end < length and (_char_at(buffer, text, end).isalpha() or _char_at(buffer, text, end).isdigit()):
+            end += 1
+        return Kind.IDENTIFIER, end
+    while end < length and _char_at(buffer, text, end).isdigit():
+        end += 1
+    return Kind.INTEGER_LITERAL, end
+
+
+class RegexScanner:
+    """
+    A scanner producing the same tokens as Scanner, which splits the whole
+    source with one compiled pattern instead of reading it character by
+    character.
+
+    Args:
+        source: path of the source program
+    """
+
+    def __init__(self, source: str):
+        self.__start(SourceFile(source))
+
+    @classmethod
+    def from_file(cls, filename: str) -> 'RegexScanner':
+        return cls(filename)
+
+    @classmethod
+    def from_string(cls, text: str) -> 'RegexScanner':
+        scanner = cls.__new__(cls)
+        scanner.__start(SourceFile.from_string(text))
+        return scanner
+
+    @classmethod
+    def from_bytes(cls, data) -> 'RegexScanner':
+        scanner = cls.__new__(cls)
+        scanner.__start(SourceFile.from_bytes(data))
+        return scanner
+
+    def __start(self, source: SourceFile) -> None:
+        self.source = source
+        self.line_index = source.line_index
+        self.tokens = tokenize(source.buffer)
+        self.end = 0
+
+    @property
+    def current_line(self) -> int:
+        return self.line_index.position(self.end)[0]
+
+    @property
+    def current_column(self) -> int:
+        return self.line_index.position(self.end)[1]
+
+    def scan(self) -> Token:
+        """
+        Returns the next token. Once the source is exhausted every call
+        returns an EOT token.
+        """
+        kind, start, end = next(self.tokens, (Kind.EOT, self.end, self.end))
+        self.end = end
+        if kind is Kind.EOT:
+            # Nothing is read from the source after its end
+            self.tokens = iter(())
+            self.source.close()
+            return Token(Kind.EOT, SourceFile.EOT, start, end)
+        return Token(kind, _spelling(self.source.buffer, self.source.is_text, start, end), start, end)
+
+    def close(self) -> None:
+        self.source.close()
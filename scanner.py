@@ -1,70 +1,273 @@
+import mmap
+import os
+import re
 from typing import List
 
+from exceptions import NonAsciiSourceException
+from line_index import LineIndex
 from tokens import Kind, Token
 
 
+def _is_letter_or_digit(char: str) -> bool:
+    return char.isalpha() or char.isdigit()
+
+
+def non_ascii_error(buffer, offset: int) -> NonAsciiSourceException:
+    """
+    Returns the error for the byte at `offset` of a byte source, which is
+    outside of ASCII.
+    """
+    line, column = LineIndex(buffer).position(offset)
+    return NonAsciiSourceException(buffer[offset], offset, line, column)
+
+
 class SourceFile:
+    """
+    A source program loaded into memory and read by an integer offset.
+
+    Files up to MMAP_THRESHOLD bytes are read in one call and scanned as a
+    str. Larger files are memory-mapped and scanned as bytes, each byte
+    standing for one character. Bytes outside of ASCII are only allowed in
+    comments; anywhere else they raise a NonAsciiSourceException, since the
+    encoding they belong to is not known. The file is closed as soon as its content
+    is loaded; the map of a mapped file is released by close(), which the
+    scanners call when they reach EOT.
+
+    Args:
+        filename: path of the source program
+    """
     EOL = '\n'
     EOT = ''
+    MMAP_THRESHOLD = 16 * 1024 * 1024
+
+    # Characters for every byte value, so mapped files can be read without
+    # creating a new str per character. Only the ASCII ones are ever read.
+    _BYTE_CHARS = [chr(b) for b in range(256)]
+
+    # Patterns matching the ASCII part of a run, indexed by is_text
+    _LETTER_OR_DIGIT_RUN = (re.compile(rb'[A-Za-z0-9]*'), re.compile(r'[A-Za-z0-9]*'))
+    _DIGIT_RUN = (re.compile(rb'[0-9]*'), re.compile(r'[0-9]*'))
+    _BLANK_RUN = (re.compile(rb'[ \t\r\n]*'), re.compile(r'[ \t\r\n]*'))
+    # Text files get their line endings translated to EOL when they are read,
+    # so in mapped files a bare \r ends a line as well
+    _LINE_REST = (re.compile(rb'[^\r\n]*'), re.compile(r'[^\n]*'))
 
     def __init__(self, filename):
         try:
-            self.source = open(filename, 'r')
+            size = os.stat(filename).st_size
+        except OSError:
+            size = 0
+
+        try:
+            if size >= self.MMAP_THRESHOLD:
+                self.source = open(filename, 'rb')
+            else:
+                self.source = open(filename, 'r')
         except OSError as oserr:
             print(oserr)
             exit(1)
 
+        self.mapped = None
+        if size >= self.MMAP_THRESHOLD:
+            self.mapped = mmap.mmap(self.source.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__load(self.mapped)
+        else:
+            self.__load(self.source.read())
+        self.source.close()
+
+    @classmethod
+    def from_string(cls, text: str) -> 'SourceFile':
+        """
+        Creates a source from program text held in memory.
+        """
+        source = cls.__new__(cls)
+        source.mapped = None
+        source.__load(text)
+        return source
+
+    @classmethod
+    def from_bytes(cls, data) -> 'SourceFile':
+        """
+        Creates a source from program bytes held in memory (bytes, bytearray
+        or memoryview). Like a mapped file, it is scanned as bytes, each byte
+        standing for one character.
+        """
+        source = cls.__new__(cls)
+        source.mapped = None
+        source.__load(data if isinstance(data, bytes) else bytes(data))
+        return source
+
+    def __load(self, buffer) -> None:
+        self.position = 0
+        self.buffer = buffer
+        self.is_text = isinstance(buffer, str)
+        self.length = len(buffer)
+        self.line_index = LineIndex(buffer)
+
     def get_next_char(self):
-        char = self.source.read(1)
-        if not char:
+        position = self.position
+        if position >= self.length:
             return self.EOT
-        return char
+        self.position = position + 1
+        if self.is_text:
+            return self.buffer[position]
+        return self.__char_at(position)
+
+    def get_letters_and_digits(self) -> str:
+        """
+        Reads characters while they are letters or digits and returns them.
+        """
+        return self.__get_run(self._LETTER_OR_DIGIT_RUN, _is_letter_or_digit)
+
+    def get_digits(self) -> str:
+        """
+        Reads characters while they are digits and returns them.
+        """
+        return self.__get_run(self._DIGIT_RUN, str.isdigit)
+
+    def get_blanks(self) -> str:
+        """
+        Reads spaces, tabs and line breaks and returns them.
+        """
+        return self.__get_run(self._BLANK_RUN, None)
+
+    def get_line_rest(self) -> str:
+        """
+        Reads characters up to, but not including, the end of the line and returns them.
+        """
+        return self.__get_run(self._LINE_REST, None)
+
+    def __get_run(self, patterns, accepts) -> str:
+        # The pattern covers the ASCII characters of a run. Anything after it
+        # is checked one character at a time, which only happens for
+        # characters outside of ASCII.
+        end = patterns[self.is_text].match(self.buffer, self.position).end()
+        if accepts is not None and end < self.length and self.__char_at(end) > '\x7f':
+            while end < self.length and accepts(self.__char_at(end)):
+                end += 1
+        return self.__take(end)
+
+    def __char_at(self, position: int) -> str:
+        if self.is_text:
+            return self.buffer[position]
+        byte = self.buffer[position]
+        if byte > 0x7f:
+            raise non_ascii_error(self.buffer, position)
+        return self._BYTE_CHARS[byte]
+
+    def __take(self, end: int) -> str:
+        start = self.position
+        self.position = end
+        if self.is_text:
+            return self.buffer[start:end]
+        # Only the runs of comments, whose text is dropped, can hold bytes
+        # outside of ASCII
+        return self.buffer[start:end].decode('utf-8', 'replace')
+
+    def close(self) -> None:
+        """
+        Releases the memory map of a large source file. Text buffers need
+        no cleanup, since the file itself was closed after it was read. The
+        line index keeps answering, for diagnostics after the end.
+        """
+        if self.mapped is not None:
+            self.line_index.detach()
+            self.buffer = b''
+            self.length = 0
+            self.mapped.close()
+            self.mapped = None
 
 
 class Scanner:
+    SEPARATORS = frozenset(['#', '\n', '\t', '\r', ' '])
+    BLANKS = frozenset(['\n', '\t', '\r', ' '])
+    SYMBOLS = {
+        '~': Kind.OPERATOR,
+        '+': Kind.OPERATOR,
+        '-': Kind.OPERATOR,
+        '/': Kind.OPERATOR,
+        '*': Kind.OPERATOR,
+        ';': Kind.SEMICOLON,
+        '(': Kind.LEFT_PAR,
+        ')': Kind.RIGHT_PAR,
+        '"': Kind.QUOTE,
+        ':': Kind.COLON,
+        ',': Kind.COMMA
+    }
+
     def __init__(self, source: str):
-        self.source = SourceFile(source)
+        self.__start(SourceFile(source))
+
+    @classmethod
+    def from_file(cls, filename: str) -> 'Scanner':
+        return cls(filename)
+
+    @classmethod
+    def from_string(cls, text: str) -> 'Scanner':
+        """
+        Creates a scanner over program text held in memory.
+        """
+        scanner = cls.__new__(cls)
+        scanner.__start(SourceFile.from_string(text))
+        return scanner
+
+    @classmethod
+    def from_bytes(cls, data) -> 'Scanner':
+        """
+        Creates a scanner over program bytes held in memory.
+        """
+        scanner = cls.__new__(cls)
+        scanner.__start(SourceFile.from_bytes(data))
+        return scanner
+
+    def __start(self, source: SourceFile) -> None:
+        self.source = source
+        self.line_index = source.line_index
         self.current_spelling: List[str] = []
-        self.current_char = self.source.get_next_char()
-        self.current_line = 1
-        self.current_column = 0
+        self.current_char = source.get_next_char()
 
-    def __count_position(self) -> None:
-        if self.current_char == '\n':
-            self.current_line = self.current_line + 1
-            self.current_column = 0
-        else:
-            self.current_column = self.current_column + 1
+    @property
+    def current_offset(self) -> int:
+        """
+        Offset of the current character in the source.
+        """
+        return self.source.position - len(self.current_char)
+
+    @property
+    def current_line(self) -> int:
+        return self.line_index.position(self.current_offset)[0]
+
+    @property
+    def current_column(self) -> int:
+        return self.line_index.position(self.current_offset)[1]
 
     def scan(self) -> Token:
         """
         Scans through characters, finds the next token and returns it as a Token object.
         """
-        while self.current_char in ['#', '\n', '\t', '\r', ' ']:
+        while self.current_char in self.SEPARATORS:
             self.discard_separator()
 
         self.current_spelling.clear()
+        start = self.current_offset
         kind: Kind = self.scan_token()
 
-        return Token(kind, "".join(self.current_spelling))
+        return Token(kind, "".join(self.current_spelling), start, self.current_offset)
 
     def scan_token(self) -> Kind:
         """
         Scans through the current character(s) and returns it's kind
         """
         if self.current_char.isalpha():
-            self.take_it()
-            while self.current_char.isalpha() or self.current_char.isdigit():
-                self.take_it()
+            self.take_run(self.source.get_letters_and_digits())
             return Kind.IDENTIFIER
 
         elif self.current_char.isdigit():
-            self.take_it()
-            while self.current_char.isdigit():
-                self.take_it()
+            self.take_run(self.source.get_digits())
             return Kind.INTEGER_LITERAL
 
         elif self.current_char == SourceFile.EOT:
+            self.source.close()
             return Kind.EOT
 
         elif self.current_char == '=':
@@ -78,36 +281,37 @@ class Scanner:
         else:
             char = self.current_char
             self.take_it()
-            return {
-                '~': Kind.OPERATOR,
-                '+': Kind.OPERATOR,
-                '-': Kind.OPERATOR,
-                '/': Kind.OPERATOR,
-                '*': Kind.OPERATOR,
-                ';': Kind.SEMICOLON,
-                '(': Kind.LEFT_PAR,
-                ')': Kind.RIGHT_PAR,
-                '"': Kind.QUOTE,
-                ':': Kind.COLON,
-                ',': Kind.COMMA
-            }.get(char, Kind.ERROR)
+            return self.SYMBOLS.get(char, Kind.ERROR)
 
     def discard_separator(self):
         """
-        Discards the current character and moves the pointer to the next one, or if the
-        curret character is a comment symbol (#), moves the pointer to the next line.
+        Discards the current run of blank characters and moves the pointer to the next
+        character, or if the curret character is a comment symbol (#), moves the pointer
+        to the next line.
         """
         if self.current_char == '#':
-            self.take_it()
-            while self.current_char not in [SourceFile.EOL, SourceFile.EOT]:
-                self.take_it()
+            self.take_run(self.source.get_line_rest())
 
             if self.current_char == SourceFile.EOL:
                 self.take_it()
+        elif self.current_char in self.BLANKS:
+            self.take_run(self.source.get_blanks())
         else:
             self.take_it()
 
     def take_it(self):
         self.current_spelling.append(self.current_char)
-        self.current_char = str(self.source.get_next_char())
-        self.__count_position()
+        self.current_char = self.source.get_next_char()
+
+    def take_run(self, run: str):
+        """
+        Takes the current character together with `run`, the characters read
+        right after it.
+        """
+        self.current_spelling.append(self.current_char)
+        if run:
+            self.current_spelling.append(run)
+        self.current_char = self.source.get_next_char()
+
+    def close(self) -> None:
+        self.source.close()
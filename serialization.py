@@ -0,0 +1,234 @@
+import gc
+import inspect
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from typing import List, Tuple
+
+from abstract_tree import *
+from incremental_parser import settle
+
+# Identifies serialized trees, followed by the version of the format
+MAGIC = b'TAST'
+FORMAT_VERSION = 2
+
+# Node classes in the order of their codes. Codes 0 and 1 stand for None
+# and a list of nodes. Appending a class changes no other code, anything
+# else needs a new FORMAT_VERSION.
+NODE_CLASSES = [
+    Program, CommandList, DeclarationCommand, StatementCommand, DeclarationList,
+    FuncDeclaration, VarDeclaration, VarDeclarationWithAssignment, ArgumentsList,
+    ExpressionList, BinaryExpression, BooleanLiteralExpression, CallExpression,
+    IntLiteralExpression, UnaryExpression, VarExpression, ExpressionStatement,
+    IfStatement, ReturnStatement, WhileStatement,
+    BooleanLiteral, Identifier, IntegerLiteral, Operator, TypeIndicator,
+]
+_NONE = 0
+_LIST = 1
+_CODES = {cls: code for code, cls in enumerate(NODE_CLASSES, 2)}
+# A lazy declaration is stored with its body, as a plain one
+_CODES[LazyFuncDeclaration] = _CODES[FuncDeclaration]
+# The length of a node without a span
+_NO_SPAN = -1
+
+
+def dump(program: Program) -> bytes:
+    """
+    Serializes a tree into bytes which load() turns back into an equal tree.
+
+    The nodes are written in postorder: a node follows its children, each a
+    node, None or the nodes of a list. The children come in the order of
+    the arguments of the node's constructor, followed by the lists it
+    creates empty, so load() can call the constructor on them. Four columns of 32-bit ints are stored:
+    - the structure: the code of every node's class, and for a list the
+      code of lists followed by the number of its nodes
+    - the start of every node, as the distance from the start of the node
+      before it
+    - the length of every node, or -1 for a node without a span
+    - the spelling of every terminal, as an index into a table of them
+    The spellings are stored once each, and everything is compressed with
+    zlib.
+
+    Only the syntax is stored: semantic annotations like addresses and
+    declarations are left for the Checker and the Encoder to set again. The
+    spans reparse() has left to shift are shifted first, see
+    incremental_parser.settle().
+    """
+    settle(program)
+    # The reverse of the postorder is a preorder which takes the children
+    # from last to first, so the columns are written backwards in one pass
+    # over the tree and reversed at the end.
+    structure = array('i')
+    starts = array('i')
+    lengths = array('i')
+    spelled = array('i')
+    layouts = {cls: (code, _fields(NODE_CLASSES[code - 2]), issubclass(cls, Terminal)) for cls, code in _CODES.items()}
+    spellings = {}
+    pending = [program]
+    push = pending.append
+    while pending:
+        node = pending.pop()
+        if node is None:
+            structure.append(_NONE)
+            continue
+        if type(node) is list:
+            structure.append(len(node))
+            structure.append(_LIST)
+            pending.extend(node)
+            continue
+
+        code, names, terminal = layouts[type(node)]
+        structure.append(code)
+        start = node.start
+        if start is None:
+            starts.append(starts[-1] if starts else 0)
+            lengths.append(_NO_SPAN)
+        else:
+            starts.append(start)
+            lengths.append(node.end - start)
+        if terminal:
+            spelled.append(spellings.setdefault(node.spelling, len(spellings)))
+        for name in names:
+            push(getattr(node, name))
+    for column in (structure, starts, lengths, spelled):
+        column.reverse()
+    deltas = array('i', [start - previous for previous, start in zip([0] + starts.tolist(), starts)])
+
+    strings = '\0'.join(spellings).encode('utf-8')
+    header = array('I', [len(strings), len(structure), len(deltas), len(spelled)])
+    payload = [header, strings, structure, deltas, lengths, spelled]
+    if sys.byteorder == 'big':
+        for column in payload:
+            if isinstance(column, array):
+                column.byteswap()
+    return MAGIC + bytes([FORMAT_VERSION]) + zlib.compress(b''.join(payload))
+
+
+def load(data: bytes) -> Program:
+    """
+    Reads a tree written by dump(). Raises ValueError if the data is not a
+    tree of this format.
+    """
+    if data[:len(MAGIC)] != MAGIC or data[len(MAGIC):len(MAGIC) + 1] != bytes([FORMAT_VERSION]):
+        raise ValueError("Not a serialized tree of this format version.")
+    try:
+        payload = zlib.decompress(data[len(MAGIC) + 1:])
+        header = _column(payload[:16], 'I')
+        if len(header) != 4:
+            raise ValueError("truncated header")
+        length, structure_count, node_count, terminal_count = header
+        strings = payload[16:16 + length].decode('utf-8').split('\0')
+        position = 16 + length
+        columns = []
+        for count in (structure_count, node_count, node_count, terminal_count):
+            columns.append(_column(payload[position:position + 4 * count], 'i'))
+            position += 4 * count
+        if position != len(payload):
+            raise ValueError("the columns don't fill the data")
+        structure, deltas, lengths, spelled = columns
+        values = _build(structure.tolist(), list(accumulate(deltas)), lengths.tolist(),
+                        [strings[index] for index in spelled])
+    except (zlib.error, IndexError, KeyError, TypeError, ValueError, StopIteration,
+            UnicodeDecodeError) as error:
+        raise ValueError(f"Corrupt serialized tree: {error}") from error
+    if len(values) != 1 or not isinstance(values[0], Program):
+        raise ValueError("Corrupt serialized tree: not a single program.")
+    return values[0]
+
+
+def _column(data: bytes, typecode: str) -> array:
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+
+def _build(structure: List[int], starts: List[int], lengths: List[int], spellings: List[str]) -> list:
+    """
+    Builds the nodes from the columns of dump() on a stack, each node from
+    the values of its children on top of it, and returns the stack.
+
+    The cyclic garbage collector is paused meanwhile: the nodes only ever
+    reference nodes built before them, and otherwise it would run over the
+    growing tree again and again, which takes most of the time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _build_nodes(structure, starts, lengths, spellings)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _build_nodes(structure: List[int], starts: List[int], lengths: List[int], spellings: List[str]) -> list:
+    layouts = [None, None] + [_layout(cls) for cls in NODE_CLASSES]
+    next_span = zip(starts, lengths).__next__
+    next_spelling = iter(spellings).__next__
+    values = []
+    push = values.append
+    position = 0
+    count = len(structure)
+    while position < count:
+        code = structure[position]
+        position += 1
+        if code == _NONE:
+            push(None)
+            continue
+        if code == _LIST:
+            size = structure[position]
+            position += 1
+            if size:
+                items = values[-size:]
+                del values[-size:]
+                push(items)
+            else:
+                push([])
+            continue
+
+        cls, arity, lists = layouts[code]
+        if arity < 0:
+            node = cls(next_spelling())
+        else:
+            if lists:
+                items = values[-len(lists):]
+                del values[-len(lists):]
+            if arity:
+                node = cls(*values[-arity:])
+                del values[-arity:]
+            else:
+                node = cls()
+            if lists:
+                for name, value in zip(lists, items):
+                    setattr(node, name, value)
+        start, length = next_span()
+        if length != _NO_SPAN:
+            node.start = start
+            node.end = start + length
+        push(node)
+    return values
+
+
+def _fields(cls: type) -> Tuple[str, ...]:
+    """
+    Returns the children of a node class in the order they are stored: the
+    arguments of its constructor, then the lists it creates empty.
+    """
+    if issubclass(cls, Terminal):
+        return ()
+    arguments = tuple(inspect.signature(cls.__init__).parameters)[1:]
+    return arguments + tuple(name for name in cls.children if name not in arguments)
+
+
+def _layout(cls: type) -> Tuple[type, int, Tuple[str, ...]]:
+    """
+    Returns the class, the number of arguments of its constructor, -1 for a
+    terminal, and the names of the lists set after construction.
+    """
+    if issubclass(cls, Terminal):
+        return cls, -1, ()
+    fields = _fields(cls)
+    arity = len(inspect.signature(cls.__init__).parameters) - 1
+    return cls, arity, fields[arity:]
@@ -0,0 +1,271 @@
+from typing import Generator
+
+from parser import Parser
+from tokens import Kind as K, TYPE_DENOTERS, BINARY_PRECEDENCE
+from abstract_tree import *
+from exceptions import (UnsupportedExpressionTokenException,
+                        UnsupportedCommandTokenException,
+                        UnsupportedDeclarationTokenException)
+
+# A production parsed on the explicit stack. It yields the routine of every
+# production it descends into and is sent back that routine's result.
+Routine = Generator[object, object, object]
+
+
+class StackParser(Parser):
+    """
+    A Parser which builds the same Program, but keeps its pending
+    productions on an explicit stack instead of the Python call stack. Each
+    recursive production is a generator run by run(), so programs of any
+    nesting depth parse in constant Python stack.
+    """
+
+    def run(self, routine: Routine) -> object:
+        """
+        Runs a production to its end and returns its node.
+        """
+        stack = [routine]
+        value = None
+        while True:
+            try:
+                call = stack[-1].send(value)
+            except StopIteration as done:
+                stack.pop()
+                if not stack:
+                    return done.value
+                value = done.value
+            else:
+                stack.append(call)
+                value = None
+
+    def parse_command_list(self) -> CommandList:
+        return self.run(self.command_list())
+
+    def parse_single_command(self) -> AbstractCommand:
+        return self.run(self.single_command())
+
+    def parse_single_statement(self):
+        return self.run(self.single_statement())
+
+    def parse_declaration_list(self):
+        return self.run(self.declaration_list())
+
+    def parse_single_declaration(self):
+        return self.run(self.single_declaration())
+
+    def parse_expression_list_assign_operator(self):
+        return self.run(self.expression())
+
+    def parse_single_expression(self):
+        return self.run(self.single_expression())
+
+    def parse_expressions_list(self):
+        return self.run(self.expressions_list())
+
+    # The productions below mirror the methods of Parser they are named after
+
+    def command_list(self) -> Routine:
+        valid_kinds = [K.IDENTIFIER, K.FUNC, K.IF,
+                       K.WHILE, K.RETURN] + TYPE_DENOTERS
+        start = self.current_terminal.start
+        cmd_list = CommandList()
+        while self.current_terminal.kind in valid_kinds:
+            cmd = yield self.single_command()
+            cmd_list.commands.append(cmd)
+        return self.spanned(cmd_list, start)
+
+    def single_command(self) -> Routine:
+        start = self.current_terminal.start
+        if self.current_terminal.kind is K.FUNC:
+            dec = yield self.declaration_list()
+            return self.spanned(DeclarationCommand(declaration_list=dec), start)
+
+        elif self.current_terminal.kind in [K.RETURN, K.IF, K.WHILE]:
+            st = yield self.single_statement()
+            return self.spanned(StatementCommand(statement=st), start)
+
+        elif self.current_terminal.kind is K.IDENTIFIER:
+            st = yield self.single_statement()
+            self.accept(K.SEMICOLON)
+            return self.spanned(StatementCommand(statement=st), start)
+
+        elif self.current_terminal.kind in TYPE_DENOTERS:
+            dec = yield self.declaration_list()
+            return self.spanned(DeclarationCommand(declaration_list=dec), start)
+
+        else:
+            raise UnsupportedCommandTokenException(
+                current_token=self.current_terminal,
+                current_line=self.current_line,
+                current_column=self.current_column
+            )
+
+    def single_statement(self) -> Routine:
+        start = self.current_terminal.start
+        if self.current_terminal.kind is K.IF:
+            self.accept(K.IF)
+            self.accept(K.LEFT_PAR)
+            exp = yield self.expression()
+            self.accept(K.RIGHT_PAR)
+            self.accept(K.COLON)
+            if_block = yield self.command_list()
+            else_block = None
+            if self.current_terminal.kind is K.ELSE:
+                self.accept(K.ELSE)
+                self.accept(K.COLON)
+                else_block = yield self.command_list()
+            self.accept(K.END)
+            return self.spanned(IfStatement(
+                expr=exp,
+                if_com=if_block,
+                else_com=else_block
+            ), start)
+
+        elif self.current_terminal.kind is K.WHILE:
+            self.accept(K.WHILE)
+            self.accept(K.LEFT_PAR)
+            exp = yield self.expression()
+            self.accept(K.RIGHT_PAR)
+            self.accept(K.COLON)
+            cmd_list = yield self.command_list()
+            self.accept(K.END)
+            return self.spanned(WhileStatement(
+                expr=exp,
+                command=cmd_list
+            ), start)
+
+        elif self.current_terminal.kind is K.RETURN:
+            self.accept(K.RETURN)
+            exp = yield self.single_expression()
+            return self.spanned(ReturnStatement(exp), start)
+
+        elif self.current_terminal.kind is K.IDENTIFIER:
+            exp_list = yield self.expression()
+            return self.spanned(ExpressionStatement(expressions=exp_list), start)
+
+    def declaration_list(self) -> Routine:
+        start = self.current_terminal.start
+        res = DeclarationList()
+        while self.current_terminal.kind in [K.FUNC] + TYPE_DENOTERS:
+            dec = yield self.single_declaration()
+            res.declarations.append(dec)
+        return self.spanned(res, start)
+
+    def single_declaration(self) -> Routine:
+        start = self.current_terminal.start
+        if self.current_terminal.kind is K.FUNC:
+            self.accept(K.FUNC)
+            idf = self.parse_identifier()
+            self.accept(K.LEFT_PAR)
+            args = yield self.expressions_list()
+            self.accept(K.RIGHT_PAR)
+            self.accept(K.COLON)
+            command_list = yield self.command_list()
+            self.accept(K.END)
+            return self.spanned(FuncDeclaration(
+                identifier=idf,
+                args=args,
+                commands=command_list
+            ), start)
+
+        elif self.current_terminal.kind in [K.STRING_TYPE, K.INTEGER_TYPE, K.BOOLEAN_TYPE]:
+            type_i = self.parse_type_indicator()
+            idf = self.parse_identifier()
+            if self.current_terminal.kind is K.OPERATOR:
+                opr = self.parse_operator()
+                exp_list = yield self.expression()
+                self.accept(K.SEMICOLON)
+                return self.spanned(VarDeclarationWithAssignment(
+                    type_indicator=type_i,
+                    identifier=idf,
+                    operator=opr,
+                    expression=exp_list), start)
+            else:
+                self.accept(K.SEMICOLON)
+                return self.spanned(VarDeclaration(
+                    type_indicator=type_i,
+                    identifier=idf), start)
+
+        else:
+            raise UnsupportedDeclarationTokenException(
+                current_token=self.current_terminal,
+                current_line=self.current_line,
+                current_column=self.current_column
+            )
+
+    def expression(self) -> Routine:
+        precedence_of = BINARY_PRECEDENCE.get
+        start = self.current_terminal.start
+        operand = yield self.single_expression()
+        pending = []
+        while True:
+            precedence = precedence_of(self.current_terminal.spelling, 0)
+            while pending and pending[-1][2] >= precedence:
+                left, operator, _, start = pending.pop()
+                node = BinaryExpression(operator=operator, expression1=left, expression2=operand)
+                operand = self.shared(self.spanned(node, start))
+            if not precedence:
+                return operand
+            pending.append((operand, self.parse_operator(), precedence, start))
+            start = self.current_terminal.start
+            operand = yield self.single_expression()
+
+    def single_expression(self) -> Routine:
+        start = self.current_terminal.start
+        if self.current_terminal.kind is K.INTEGER_LITERAL:
+            int_literal = self.parse_integer_literal()
+            return self.shared(self.spanned(IntLiteralExpression(literal=int_literal), start))
+
+        elif self.current_terminal.kind in [K.TRUE, K.FALSE]:
+            bool_literal = self.parse_boolean()
+            return self.shared(self.spanned(BooleanLiteralExpression(literal=bool_literal), start))
+
+        elif self.current_terminal.kind is K.OPERATOR:
+            # A chain of prefix operators is collected in one frame
+            operators = []
+            while self.current_terminal.kind is K.OPERATOR:
+                operators.append((self.current_terminal.start, self.parse_operator()))
+            exp_list = yield self.single_expression()
+            for opr_start, opr in reversed(operators):
+                exp_list = self.shared(self.spanned(UnaryExpression(operator=opr, expression=exp_list), opr_start))
+            return exp_list
+
+        elif self.current_terminal.kind is K.IDENTIFIER:
+            idf = self.parse_identifier()
+            # identifier()
+            if self.current_terminal.kind is K.LEFT_PAR:
+                self.accept(K.LEFT_PAR)
+                exp_list = yield self.expressions_list()
+                self.accept(K.RIGHT_PAR)
+                return self.spanned(CallExpression(name=idf, args=exp_list), start)
+            # identifier ~ expression
+            elif self.current_terminal.is_assign_operator():
+                var_exp = self.spanned(VarExpression(idf), start)
+                opr = self.parse_operator()
+                exp_list = yield self.expression()
+                return self.spanned(BinaryExpression(
+                    operator=opr,
+                    expression1=var_exp,
+                    expression2=exp_list
+                ), start)
+            else:
+                return self.spanned(VarExpression(idf), start)
+
+        else:
+            raise UnsupportedExpressionTokenException(
+                current_token=self.current_terminal,
+                current_line=self.current_line,
+                current_column=self.current_column
+            )
+
+    def expressions_list(self) -> Routine:
+        if self.current_terminal.kind in [K.IDENTIFIER, K.INTEGER_LITERAL, K.OPERATOR, K.TRUE, K.FALSE]:
+            start = self.current_terminal.start
+            exp_list = ArgumentsList()
+            exp = yield self.expression()
+            exp_list.expressions.append(exp)
+            while self.current_terminal.kind is K.COMMA:
+                self.accept(K.COMMA)
+                exp = yield self.expression()
+                exp_list.expressions.append(exp)
+            return self.spanned(exp_list, start)
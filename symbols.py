@@ -0,0 +1,86 @@
+from array import array
+from typing import Dict, List
+
+from abstract_tree import AbstractDeclaration, FuncDeclaration
+
+# Kinds of symbols
+VARIABLE = 0
+FUNCTION = 1
+
+# Codes of the types of values, and the size of values in words. Functions
+# and variables of an unknown type have NO_TYPE and size 0.
+NO_TYPE = 0
+INT = 1
+BOOL = 2
+TYPES: Dict[str, int] = {'int': INT, 'bool': BOOL}
+SIZES: Dict[str, int] = {'int': 1, 'bool': 1}
+# Spellings of the types, by code
+TYPE_NAMES: List[str] = ['unknown', 'int', 'bool']
+
+# Level of a symbol the Encoder has not allocated yet
+UNALLOCATED = -1
+
+
+class SymbolTable:
+    """
+    The declarations of a program, each known by a dense integer ID, its
+    symbol, in the order the Checker met them. What the Encoder needs about
+    a symbol is kept in a column indexed by it:
+    - kinds: VARIABLE or FUNCTION
+    - types: the code of the type of a variable in TYPES, or of the values
+      a function returns, set by the Typer
+    - sizes: the size of the value of a variable in words
+    - levels, displacements: the address of a variable or of the code of a
+      function, UNALLOCATED until the Encoder allocates it
+
+    The Checker gives every declaration a symbol and stores it in the
+    `symbol` of the declaration and of the expressions using it, and the
+    table in Program.symbols, where the Encoder finds it.
+    """
+
+    def __init__(self):
+        self.declarations: List[AbstractDeclaration] = []
+        self.kinds = array('B')
+        self.types = array('B')
+        self.sizes = array('B')
+        self.levels = array('i')
+        self.displacements = array('i')
+
+    def __len__(self) -> int:
+        return len(self.declarations)
+
+    def add(self, declaration: AbstractDeclaration) -> int:
+        """
+        Returns a new symbol for a declaration, with its kind, type and size.
+        """
+        symbol = len(self.declarations)
+        self.declarations.append(None)
+        self.kinds.append(VARIABLE)
+        self.types.append(NO_TYPE)
+        self.sizes.append(0)
+        self.levels.append(UNALLOCATED)
+        self.displacements.append(0)
+        self.describe(symbol, declaration)
+        return symbol
+
+    def describe(self, symbol: int, declaration: AbstractDeclaration) -> None:
+        """
+        Makes a symbol stand for a declaration, setting its kind, type and
+        size and leaving it unallocated.
+        """
+        self.declarations[symbol] = declaration
+        if isinstance(declaration, FuncDeclaration):
+            self.kinds[symbol] = FUNCTION
+            self.types[symbol] = NO_TYPE
+            self.sizes[symbol] = 0
+        else:
+            spelling = declaration.type_indicator.spelling
+            self.kinds[symbol] = VARIABLE
+            self.types[symbol] = TYPES.get(spelling, NO_TYPE)
+            self.sizes[symbol] = SIZES.get(spelling, 0)
+        self.levels[symbol] = UNALLOCATED
+        self.displacements[symbol] = 0
+
+    def allocate(self, symbol: int, level: int, displacement: int) -> None:
+        self.levels[symbol] = level
+        self.displacements[symbol] = displacement
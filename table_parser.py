@@ -0,0 +1,370 @@
+import hashlib
+import marshal
+import os
+import sys
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+from interning import Interner
+from parser import Parser
+from parser_generator import read_grammar
+from token_stream import TokenCursor
+from tokens import Kind, KINDS, KIND_CODES, ASSIGNOPS, ADDOPS, MULOPS
+from abstract_tree import *
+from exceptions import (UnexpectedTokenException,
+                        UnsupportedExpressionTokenException,
+                        UnsupportedCommandTokenException,
+                        UnsupportedDeclarationTokenException,
+                        UnexpectedEndOfProgramException)
+
+GRAMMAR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grammar.txt')
+# Changes whenever the format of the cached tables changes
+TABLES_VERSION = 1
+
+# Terminals of the grammar: the token kinds, in the order of their codes,
+# and the classes OPERATOR tokens are split into by their spelling
+OPERATOR_CLASSES = ('ASSIGN_OPERATOR', 'ADD_OPERATOR', 'MUL_OPERATOR')
+TERMINALS = tuple(k.name for k in KINDS) + OPERATOR_CLASSES
+_OPERATOR_TERMINALS = {
+    **{op: TERMINALS.index('ASSIGN_OPERATOR') for op in ASSIGNOPS},
+    **{op: TERMINALS.index('ADD_OPERATOR') for op in ADDOPS},
+    **{op: TERMINALS.index('MUL_OPERATOR') for op in MULOPS},
+}
+# Spellings sliced from a mapped file are bytes
+_OPERATOR_TERMINALS.update({op.encode(): t for op, t in _OPERATOR_TERMINALS.items()})
+
+# Terminal node built for the terminals which have a value
+_TERMINAL_NODES = {
+    'IDENTIFIER': Identifier,
+    'INTEGER_LITERAL': IntegerLiteral,
+    'TRUE': BooleanLiteral,
+    'FALSE': BooleanLiteral,
+    'STRING_TYPE': TypeIndicator,
+    'INTEGER_TYPE': TypeIndicator,
+    'BOOLEAN_TYPE': TypeIndicator,
+    'OPERATOR': Operator,
+    **{name: Operator for name in OPERATOR_CLASSES},
+}
+
+
+def _command_list(*commands) -> CommandList:
+    node = CommandList()
+    node.commands = list(commands)
+    return node
+
+
+def _declaration_list(*declarations) -> DeclarationList:
+    node = DeclarationList()
+    node.declarations = list(declarations)
+    return node
+
+
+def _arguments_list(*expressions) -> ArgumentsList:
+    node = ArgumentsList()
+    node.expressions = list(expressions)
+    return node
+
+
+def _binary_expression(left, operator, right) -> BinaryExpression:
+    return BinaryExpression(operator=operator, expression1=left, expression2=right)
+
+
+# Actions named in the grammar: the function building the node from the
+# values of an alternative, and how many values before the alternative it
+# takes as well. A node spans from the first of its values or terminals up
+# to its last terminal; `none` builds no node.
+ACTIONS: Dict[str, Tuple[Callable, int]] = {
+    'program': (lambda command_list: Program(command_list=command_list), 0),
+    'command_list': (_command_list, 0),
+    'declaration_command': (lambda declaration_list: DeclarationCommand(declaration_list=declaration_list), 0),
+    'statement_command': (lambda statement: StatementCommand(statement=statement), 0),
+    'if_statement': (lambda expr, if_com, else_com: IfStatement(expr=expr, if_com=if_com, else_com=else_com), 0),
+    'while_statement': (lambda expr, command: WhileStatement(expr=expr, command=command), 0),
+    'return_statement': (ReturnStatement, 0),
+    'expression_statement': (lambda expressions: ExpressionStatement(expressions=expressions), 0),
+    'declaration_list': (_declaration_list, 0),
+    'func_declaration': (lambda identifier, args, commands: FuncDeclaration(
+        identifier=identifier, args=args, commands=commands), 0),
+    'var_declaration_with_assignment': (lambda type_i, identifier, operator, expression: VarDeclarationWithAssignment(
+        type_indicator=type_i, identifier=identifier, operator=operator, expression=expression), 2),
+    'var_declaration': (lambda type_i, identifier: VarDeclaration(type_indicator=type_i, identifier=identifier), 2),
+    'arguments_list': (_arguments_list, 0),
+    'binary_expression': (_binary_expression, 1),
+    'int_literal_expression': (lambda literal: IntLiteralExpression(literal=literal), 0),
+    'boolean_literal_expression': (lambda literal: BooleanLiteralExpression(literal=literal), 0),
+    'unary_expression': (lambda operator, expression: UnaryExpression(operator=operator, expression=expression), 0),
+    'call_expression': (lambda name, args: CallExpression(name=name, args=args), 1),
+    'var_expression': (VarExpression, 1),
+    'none': (lambda: None, 0),
+}
+
+# Exception raised when a nonterminal can't start at a terminal, if not
+# UnexpectedTokenException
+_ERRORS = {
+    'Single-command': UnsupportedCommandTokenException,
+    'Single-declaration': UnsupportedDeclarationTokenException,
+    'Expression': UnsupportedExpressionTokenException,
+    'Sum': UnsupportedExpressionTokenException,
+    'Term': UnsupportedExpressionTokenException,
+    'Single-expression': UnsupportedExpressionTokenException,
+}
+
+
+def generate_tables(text: str) -> dict:
+    """
+    Generates the parse tables of a grammar description, as a dict of
+    plain values which marshal can store.
+    """
+    grammar = read_grammar(text, TERMINALS, Kind.EOT.name)
+    rows, defaults = grammar.table()
+    return {
+        'nonterminals': grammar.nonterminals,
+        'productions': [(p.lhs, p.rhs, p.action) for p in grammar.productions],
+        'rows': rows,
+        'defaults': defaults,
+    }
+
+
+@lru_cache(maxsize=None)
+def load_tables(path: str = GRAMMAR) -> dict:
+    """
+    Returns the parse tables of the grammar in a file. They are cached in
+    the __pycache__ directory next to it under a hash of the grammar, and
+    only generated when it has changed.
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    key = hashlib.sha256(f'{TABLES_VERSION}\n{TERMINALS}\n{text}'.encode()).hexdigest()[:16]
+    directory, name = os.path.split(path)
+    cache = os.path.join(directory, '__pycache__', f'{os.path.splitext(name)[0]}.{key}.tables')
+    try:
+        with open(cache, 'rb') as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    tables = generate_tables(text)
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        temporary = f'{cache}.{os.getpid()}'
+        with open(temporary, 'wb') as f:
+            marshal.dump(tables, f)
+        os.replace(temporary, cache)
+    except OSError:
+        # A read-only tree only costs generating the tables again
+        pass
+    return tables
+
+
+class _Compiled:
+    """
+    Parse tables in the form TableParser runs them. Stack symbols are ints:
+    terminals are their index in TERMINALS, nonterminals follow them, and
+    the symbols from `reduce_base` on build the node of a production.
+
+    The entry of a nonterminal and a terminal holds the whole chain of
+    leftmost expansions up to that terminal, since the terminal stays the
+    same while it is expanded: the frames of the nodes it starts, as the
+    number of values each takes from before it, the symbols to push, and
+    whether the terminal is consumed right away.
+    """
+
+    def __init__(self, tables: dict):
+        terminals = len(TERMINALS)
+        self.nonterminals = tables['nonterminals']
+        ids = {name: i for i, name in enumerate(TERMINALS)}
+        ids.update({name: terminals + i for i, name in enumerate(self.nonterminals)})
+        self.start = ids[tables['productions'][0][0]]
+        self.reduce_base = terminals + len(self.nonterminals)
+
+        self.actions = []
+        # Right-hand side, reduce symbol or None, and inherited values
+        productions = []
+        for lhs, rhs, action in tables['productions']:
+            reduce = None
+            inherits = 0
+            if action is not None:
+                function, inherits = ACTIONS[action]
+                reduce = self.reduce_base + len(self.actions)
+                self.actions.append(function)
+            productions.append(([ids[s] for s in rhs], reduce, inherits))
+
+        def chosen(symbol: int, terminal: int):
+            row = tables['rows'][symbol - terminals]
+            number = row[terminal] if row[terminal] >= 0 else tables['defaults'][symbol - terminals]
+            return productions[number] if number >= 0 else None
+
+        def entry(symbol: int, terminal: int):
+            production = chosen(symbol, terminal)
+            if production is None:
+                return None
+            frames = []
+            items = []
+            while True:
+                rhs, reduce, inherits = production
+                if reduce is not None:
+                    frames.append(inherits)
+                    items.append(reduce)
+                if not rhs:
+                    return tuple(frames), tuple(items), False
+                items.extend(reversed(rhs[1:]))
+                head = rhs[0]
+                if head < terminals:
+                    return tuple(frames), tuple(items), True
+                production = chosen(head, terminal)
+                # An expansion to ε could build a node from the values
+                # before it, so the chain stops in front of it
+                if production is None or not production[0]:
+                    items.append(head)
+                    return tuple(frames), tuple(items), False
+
+        # The entry of every nonterminal and terminal, None for an error
+        self.rows = [None] * terminals
+        for symbol in range(terminals, self.reduce_base):
+            self.rows.append([entry(symbol, terminal) for terminal in range(terminals)])
+        self.nodes = [_TERMINAL_NODES.get(name) for name in TERMINALS]
+
+
+@lru_cache(maxsize=None)
+def compiled_tables(path: str = GRAMMAR) -> _Compiled:
+    return _Compiled(load_tables(path))
+
+
+class TableParser(Parser):
+    """
+    A Parser driven by the LL(1) tables generated from grammar.txt instead
+    of one method per production. It builds the same Program as Parser.
+
+    The driver reads the token kinds of a TokenStream directly, so the
+    tables are only used with a TokenCursor; with the other scanners the
+    program is parsed by Parser. Like Parser, it shares nodes through an
+    interner when given one.
+    """
+
+    def __init__(self, scanner, interner: Optional[Interner] = None, grammar: str = GRAMMAR):
+        super().__init__(scanner, interner)
+        self.tables = compiled_tables(grammar)
+
+    def parse_program(self) -> Program:
+        if not isinstance(self.scanner, TokenCursor):
+            return super().parse_program()
+
+        tables = self.tables
+        rows, actions, nodes = tables.rows, tables.actions, tables.nodes
+        reduce_base = tables.reduce_base
+        first_nonterminal = len(TERMINALS)
+        stream = self.scanner.stream
+        buffer, kinds, starts, ends = stream.buffer, stream.kinds, stream.starts, stream.ends
+        text = isinstance(buffer, str)
+        operator_code = KIND_CODES[Kind.OPERATOR]
+        identifier_code = KIND_CODES[Kind.IDENTIFIER]
+        operator_terminals = _OPERATOR_TERMINALS
+        intern = sys.intern
+        interner = self.interner
+
+        index = self.scanner.index - 1
+        previous_end = self.previous_end
+        terminal = kinds[index]
+        if terminal == operator_code:
+            terminal = operator_terminals.get(buffer[starts[index]:ends[index]], operator_code)
+
+        stack = [tables.start]
+        values = []
+        # Start of each value, which shared values don't hold themselves
+        value_starts = []
+        frames = []
+        pop, push, add, frame = stack.pop, stack.extend, values.append, frames.append
+        add_start = value_starts.append
+        while stack:
+            symbol = pop()
+            if symbol >= first_nonterminal:
+                if symbol >= reduce_base:
+                    mark, start = frames.pop()
+                    node = actions[symbol - reduce_base](*values[mark:])
+                    del values[mark:]
+                    del value_starts[mark:]
+                    if node is not None:
+                        node.start = start
+                        node.end = previous_end if previous_end > start else start
+                        if interner is not None:
+                            node = interner.expression(node)
+                    add(node)
+                    add_start(start)
+                    continue
+                entry = rows[symbol][terminal]
+                if entry is None:
+                    self.__sync(index, previous_end)
+                    raise self.__unsupported(symbol)
+                inherited, symbols, consumes = entry
+                if inherited:
+                    count = len(values)
+                    for inherits in inherited:
+                        if inherits:
+                            frame((count - inherits, value_starts[count - inherits]))
+                        else:
+                            frame((count, starts[index]))
+                push(symbols)
+                if not consumes:
+                    continue
+            elif symbol != terminal:
+                self.__sync(index, previous_end)
+                raise UnexpectedTokenException(
+                    expected_kind=KINDS[symbol] if symbol < len(KINDS) else Kind.OPERATOR,
+                    current_token=self.current_terminal,
+                    current_line=self.current_line,
+                    current_column=self.current_column
+                )
+
+            # Consume the terminal
+            node_class = nodes[terminal]
+            previous_end = ends[index]
+            if node_class is not None:
+                start = starts[index]
+                spelling = buffer[start:previous_end]
+                if not text:
+                    spelling = spelling.decode('ascii')
+                if terminal == identifier_code:
+                    spelling = intern(spelling)
+                if interner is not None:
+                    node = interner.terminal(node_class, spelling)
+                else:
+                    node = node_class(spelling)
+                    node.start = start
+                    node.end = previous_end
+                add(node)
+                add_start(start)
+            index += 1
+            terminal = kinds[index]
+            if terminal == operator_code:
+                terminal = operator_terminals.get(buffer[starts[index]:ends[index]], operator_code)
+
+        self.__sync(index, previous_end)
+        if self.current_terminal.kind is not Kind.EOT:
+            raise UnexpectedEndOfProgramException(self.current_terminal)
+        self.report_success()
+        return values[0]
+
+    def __sync(self, index: int, previous_end: int) -> None:
+        """
+        Moves the parser to the terminal at `index` of the stream.
+        """
+        self.scanner.index = index + 1
+        self.current_terminal = self.scanner.stream.token(index)
+        self.previous_end = previous_end
+
+    def __unsupported(self, symbol: int) -> Exception:
+        name = self.tables.nonterminals[symbol - len(TERMINALS)]
+        error = _ERRORS.get(name)
+        if error is not None:
+            return error(
+                current_token=self.current_terminal,
+                current_line=self.current_line,
+                current_column=self.current_column
+            )
+        expected = next(k for k in KINDS if self.tables.rows[symbol][KIND_CODES[k]] is not None)
+        return UnexpectedTokenException(
+            expected_kind=expected,
+            current_token=self.current_terminal,
+            current_line=self.current_line,
+            current_column=self.current_column
+        )
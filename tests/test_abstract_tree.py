@@ -0,0 +1,50 @@
+import inspect
+import unittest
+
+import abstract_tree
+from abstract_tree import AbstractSyntaxTree, BinaryExpression, CallExpression, Identifier, LazyFuncDeclaration, \
+    Operator, VarDeclaration, VarExpression, TypeIndicator
+from abstract_tree.abstract_syntax_tree import attribute_names
+
+
+def node_classes():
+    return [cls for cls in vars(abstract_tree).values()
+            if inspect.isclass(cls) and issubclass(cls, AbstractSyntaxTree) and not inspect.isabstract(cls)]
+
+
+class TestAbstractTree(unittest.TestCase):
+    def test_nodes_have_no_dict(self):
+        for cls in node_classes():
+            with self.subTest(cls.__name__):
+                self.assertNotIn('__dict__', dir(cls))
+                self.assertTrue(all('__slots__' in vars(base) for base in cls.__mro__[:-1]))
+
+    def test_children_and_annotations_are_slots(self):
+        for cls in node_classes():
+            with self.subTest(cls.__name__):
+                self.assertLessEqual(set(cls.children), set(attribute_names(cls)))
+
+        self.assertEqual(attribute_names(VarExpression), ('start', 'end', 'type', 'name', 'symbol'))
+        self.assertIn('symbol', attribute_names(CallExpression))
+        self.assertIn('address', attribute_names(VarDeclaration))
+
+    def test_nodes_built_in_code(self):
+        declaration = VarDeclaration(TypeIndicator('int'), Identifier('a'))
+        expression = BinaryExpression(Operator('+'), VarExpression(Identifier('a')), VarExpression(Identifier('a')))
+
+        self.assertEqual((declaration.start, declaration.end, declaration.address), (None, None, None))
+        self.assertIsNone(expression.expression1.symbol)
+        self.assertIsNone(expression.type)
+        with self.assertRaises(AttributeError):
+            expression.value = 1
+
+    def test_lazy_declaration(self):
+        declaration = LazyFuncDeclaration(Identifier('f'), None, lambda: 'body')
+
+        self.assertFalse(declaration.is_parsed)
+        self.assertEqual(declaration.commands, 'body')
+        self.assertTrue(declaration.is_parsed)
+
+
+if __name__ == '__main__':
+    unittest.main()
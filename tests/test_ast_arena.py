@@ -0,0 +1,145 @@
+import contextlib
+import io
+import os
+import unittest
+
+from abstract_tree import AbstractDeclaration, AbstractSyntaxTree, FuncDeclaration, IfStatement, Program, \
+    VarExpression
+from ast_arena import LIST, NONE, AstArena
+from benchmarks.programs import generate_program
+from checker import Checker
+from encoder import Encoder
+from lazy_parser import LazyParser
+from parser import Parser
+from tests.test_regex_scanner import EXAMPLES
+from tests.test_stack_parser import differences
+
+PROGRAM = os.path.join(EXAMPLES, 'prog1.txt')
+
+
+def parse(text, parser_class=Parser, scanner='regex'):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_class.from_string(text, scanner).parse_program()
+
+
+def encode(program):
+    Checker().check(program)
+    encoder = Encoder()
+    with contextlib.redirect_stdout(io.StringIO()):
+        encoder.encode(program)
+    return encoder.target_program()
+
+
+class TestAstArena(unittest.TestCase):
+    def setUp(self):
+        with open(PROGRAM) as f:
+            self.text = f.read()
+
+    def test_round_trip(self):
+        for text in (self.text, generate_program(20000), 'int a;\nif (a):\n    a ~ 1;\nend\n'):
+            program = parse(text)
+            arena = AstArena()
+            root = arena.add(program)
+
+            self.assertEqual(list(differences(arena.to_tree(root), program)), [])
+
+    def test_many_trees(self):
+        arena = AstArena()
+        texts = [generate_program(size) for size in (500, 1000, 3000)]
+        roots = [arena.add(parse(text)) for text in texts]
+
+        for root, text in zip(roots, texts):
+            self.assertEqual(list(differences(arena.to_tree(root), parse(text))), [])
+        self.assertEqual(roots[0], 0)
+        self.assertEqual(len(set(arena.strings)), len(arena.strings))
+
+    def test_columns(self):
+        arena = AstArena()
+        root = arena.add(parse('int a;\nif (a):\n    a ~ 1;\nend\n'))
+
+        self.assertIs(arena.node_class(root), Program)
+        command_list = arena.child(root, 0)
+        commands = arena.child(command_list, 0)
+        self.assertIs(arena.node_class(commands), list)
+        self.assertEqual(arena.kinds[commands], LIST)
+        if_statement = arena.child(arena.children(commands)[1], 0)
+        self.assertIs(arena.node_class(if_statement), IfStatement)
+        self.assertEqual(arena.child(if_statement, 2), NONE)
+        self.assertEqual(arena.span(if_statement), (7, 29))
+        variable = arena.child(arena.child(if_statement, 0), 0)
+        self.assertEqual(arena.spelling(variable), 'a')
+        self.assertTrue(all(child > index for index in range(len(arena)) for child in arena.children(index)
+                            if child != NONE))
+
+    def test_views(self):
+        arena = AstArena()
+        root = arena.add(parse('int a;\nif (a):\n    a ~ 1;\nend\n'))
+        program = arena.view(root)
+
+        statement = program.command_list.commands[1].statement
+        self.assertIsInstance(statement, IfStatement)
+        self.assertIsInstance(statement, AbstractSyntaxTree)
+        self.assertIsNone(statement.else_com)
+        self.assertEqual((statement.start, statement.end), (7, 29))
+        self.assertIsInstance(statement.expr, VarExpression)
+        self.assertEqual(statement.expr.name.spelling, 'a')
+        self.assertEqual(statement.expr, program.command_list.commands[1].statement.expr)
+        self.assertIsNone(statement.expr.symbol)
+
+        declaration = program.command_list.commands[0].declaration_list.declarations[0]
+        self.assertIsInstance(declaration, AbstractDeclaration)
+        statement.expr.symbol = 3
+        self.assertEqual(statement.expr.symbol, 3)
+
+    def test_checker_and_encoder_walk_views(self):
+        arena = AstArena()
+        root = arena.add(parse(self.text))
+
+        self.assertEqual(encode(arena.view(root)), encode(parse(self.text)))
+        self.assertIsInstance(arena.view(root).command_list.commands[0], AbstractSyntaxTree)
+        self.assertTrue(arena.annotations['symbol'])
+
+    def test_checker_errors_on_views(self):
+        arena = AstArena()
+        root = arena.add(parse('a ~ 1;\n'))
+
+        with self.assertRaises(Exception) as error:
+            Checker().check(arena.view(root))
+        self.assertIn('a', str(error.exception))
+
+    def test_lazy_declarations_are_added_parsed(self):
+        text = 'int a;\nfunc f(a):\n    return a\nend\n'
+        arena = AstArena()
+        root = arena.add(parse(text, LazyParser, 'stream'))
+
+        self.assertIs(type(arena.to_tree(root).command_list.commands[0].declaration_list.declarations[1]),
+                      FuncDeclaration)
+        self.assertEqual(list(differences(arena.to_tree(root), parse(text))), [])
+
+    def test_buffer(self):
+        arena = AstArena()
+        roots = [arena.add(parse(self.text)), arena.add(parse(generate_program(5000)))]
+        data = bytearray(arena.tobytes())
+
+        loaded = AstArena.from_buffer(data)
+        self.assertIsInstance(loaded.edges, memoryview)
+        self.assertEqual(len(loaded), len(arena))
+        for root in roots:
+            self.assertEqual(list(differences(loaded.to_tree(root), arena.to_tree(root))), [])
+        self.assertEqual(encode(loaded.view(roots[0])), encode(parse(self.text)))
+
+        # The columns are views of the buffer, not copies
+        data[len(data) - len('\0'.join(arena.strings).encode()) - len(arena) + roots[0]] = 0
+        self.assertNotEqual(loaded.kinds[roots[0]], arena.kinds[roots[0]])
+
+    def test_buffer_errors(self):
+        data = AstArena().tobytes()
+
+        for bad in (b'', b'TARN', b'XXXX' + data[4:], data + b'\0'):
+            with self.subTest(bad=bad[:8]), self.assertRaises(ValueError):
+                AstArena.from_buffer(bad)
+        self.assertEqual(len(AstArena.from_buffer(data)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
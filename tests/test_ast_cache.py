@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import ast_cache
+import serialization
+from ast_cache import AstCache
+from benchmarks.programs import generate_program
+from lazy_parser import LazyParser
+from parser import Parser
+from tests.test_stack_parser import differences
+
+TEXT = 'int a ~ 1;\nwhile (a):\n    a ~ a - 1;\nend\n'
+
+
+class TestAstCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def cache(self, max_bytes=ast_cache.DEFAULT_MAX_BYTES):
+        return AstCache(self.directory.name, max_bytes)
+
+    def entries(self):
+        return sorted(name for name in os.listdir(self.directory.name) if name.endswith('.ast'))
+
+    def test_hit_skips_parsing(self):
+        self.cache().parse(TEXT)
+        cache = self.cache()
+
+        with patch.object(Parser, 'from_string', side_effect=AssertionError('scanned')):
+            program = cache.parse(TEXT)
+
+        self.assertEqual(list(differences(program, Parser.from_string(TEXT, 'regex').parse_program())), [])
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_miss_parses_and_stores(self):
+        cache = self.cache()
+
+        self.assertIsNone(cache.get(TEXT))
+        cache.parse(TEXT)
+
+        self.assertEqual(self.entries(), [cache.key(TEXT) + '.ast'])
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+    def test_key_depends_on_source_and_version(self):
+        key = AstCache.key(TEXT)
+
+        self.assertNotEqual(AstCache.key(TEXT + ' '), key)
+        self.assertNotEqual(AstCache.key(TEXT.encode()), key)
+        self.assertEqual(AstCache.key(memoryview(TEXT.encode())), AstCache.key(TEXT.encode()))
+        self.assertNotEqual(AstCache.key(TEXT, LazyParser), key)
+        with patch.object(ast_cache, 'COMPILER_VERSION', ast_cache.COMPILER_VERSION + '+'):
+            self.assertNotEqual(AstCache.key(TEXT), key)
+        with patch.object(serialization, 'FORMAT_VERSION', serialization.FORMAT_VERSION + 1):
+            self.assertNotEqual(AstCache.key(TEXT), key)
+
+    def test_trees_of_other_parsers_are_not_read(self):
+        cache = self.cache()
+        cache.parse(TEXT)
+
+        self.assertIsNone(cache.get(TEXT, LazyParser))
+        self.assertIsNotNone(cache.get(TEXT, Parser))
+
+    def test_bytes_sources(self):
+        cache = self.cache()
+        cache.parse(TEXT.encode())
+
+        self.assertIsNotNone(cache.get(bytearray(TEXT.encode())))
+        self.assertIsNone(cache.get(TEXT))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        sources = [generate_program(2000 * n) for n in range(1, 4)]
+        cache = self.cache()
+        for source in sources:
+            cache.parse(source)
+        sizes = {name: os.path.getsize(os.path.join(self.directory.name, name)) for name in self.entries()}
+        for age, source in enumerate([sources[1], sources[0], sources[2]]):
+            os.utime(cache.path(cache.key(source)), ns=(age * 10 ** 9, age * 10 ** 9))
+
+        cache = self.cache(max_bytes=sum(sizes.values()) - 1)
+        cache.get(sources[1])
+        cache.parse(generate_program(100))
+
+        self.assertIsNotNone(cache.get(sources[1]))
+        self.assertIsNone(cache.get(sources[0]))
+        self.assertIsNotNone(cache.get(sources[2]))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_new_entry_is_kept_over_the_limit(self):
+        cache = self.cache(max_bytes=1)
+        cache.parse(TEXT)
+        cache.parse(TEXT + TEXT)
+
+        self.assertEqual(self.entries(), [cache.key(TEXT + TEXT) + '.ast'])
+        self.assertEqual(cache.evictions, 1)
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = self.cache()
+        cache.parse(TEXT)
+        with open(cache.path(cache.key(TEXT)), 'wb') as f:
+            f.write(b'TAST\x01garbage')
+
+        self.assertIsNone(cache.get(TEXT))
+        self.assertEqual(self.entries(), [])
+
+    def test_statistics_add_up_over_instances(self):
+        self.cache().parse(TEXT)
+        self.cache().parse(TEXT)
+        self.cache().get(TEXT + ' ')
+
+        statistics = self.cache().statistics()
+        self.assertEqual((statistics['hits'], statistics['misses'], statistics['evictions']), (1, 2, 0))
+        self.assertEqual(statistics['entries'], 1)
+        self.assertEqual(statistics['bytes'], os.path.getsize(self.cache().path(AstCache.key(TEXT))))
+
+    def test_statistics_are_written_on_flush(self):
+        path = os.path.join(self.directory.name, 'statistics.json')
+        cache = self.cache()
+        cache.parse(TEXT)
+        cache.parse(TEXT)
+
+        self.assertFalse(os.path.exists(path))
+        cache.flush()
+        cache.flush()
+        self.assertEqual(self.cache().statistics()['hits'], 1)
+        self.assertEqual(self.cache().statistics()['misses'], 1)
+
+    def test_clear(self):
+        cache = self.cache()
+        cache.parse(TEXT)
+        cache.clear()
+
+        self.assertEqual(self.entries(), [])
+        self.assertEqual(cache.statistics()['misses'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
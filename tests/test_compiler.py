@@ -0,0 +1,111 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ast_cache import AstCache
+from compiler import compile_source
+from exceptions import InvalidTypeException, NonAsciiSourceException, UndeclaredVariableException, \
+    UnexpectedTokenException
+from parser import SCANNERS, Parser
+from checker import Checker
+from encoder import Encoder
+
+PROGRAM = os.path.join(os.path.dirname(__file__), '..', 'example_files', 'prog1.txt')
+
+
+class TestCompileSource(unittest.TestCase):
+    def setUp(self):
+        with open(PROGRAM) as f:
+            self.text = f.read()
+
+    def compile_file(self):
+        program = Parser.from_file(PROGRAM).parse_program()
+        Checker().check(program)
+        encoder = Encoder()
+        encoder.encode(program)
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            encoder.save_target_program(path)
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    def test_matches_compiled_file(self):
+        expected = self.compile_file()
+
+        self.assertEqual(compile_source(self.text), expected)
+        self.assertEqual(compile_source(self.text, scanner='char'), expected)
+
+    def test_bytes_and_memoryview(self):
+        expected = compile_source(self.text)
+        data = self.text.encode()
+
+        self.assertEqual(compile_source(data), expected)
+        self.assertEqual(compile_source(memoryview(data), scanner='stream'), expected)
+
+    def test_bytes_outside_of_ascii_only_in_comments(self):
+        text = '# naïve\nint a ~ 1;\n'
+        for scanner in SCANNERS:
+            self.assertEqual(compile_source(text.encode(), scanner), compile_source(text, scanner), scanner)
+            with self.assertRaises(NonAsciiSourceException) as error:
+                compile_source('int a ~ 1;\nint café ~ 1;'.encode(), scanner)
+
+            self.assertEqual((error.exception.line, error.exception.column), (2, 8), scanner)
+
+    def test_does_not_open_files(self):
+        with patch('builtins.open', side_effect=AssertionError('file opened')):
+            compile_source(self.text)
+
+    def test_cached_tree_compiles_the_same(self):
+        expected = compile_source(self.text)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = AstCache(directory)
+
+            self.assertEqual(compile_source(self.text, cache=cache), expected)
+            with patch.object(Parser, 'parse_program', side_effect=AssertionError('parsed')):
+                self.assertEqual(compile_source(self.text, cache=cache), expected)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_errors_are_raised(self):
+        with self.assertRaises(UnexpectedTokenException) as error:
+            compile_source('int a ~ 1\nint b;')
+
+        self.assertEqual((error.exception.line, error.exception.column), (2, 1))
+        with self.assertRaises(InvalidTypeException):
+            compile_source('int a;\na ~ true;')
+
+    def test_if_without_else_and_functions_without_arguments(self):
+        for text in ('int a ~ 1;\nif (a):\n  a ~ 2;\nend\n', 'func f():\n  int x ~ 1;\nend\n',
+                     'func f():\n  return 1\nend\nint a ~ f();\nif (a):\n  a ~ f();\nend\n'):
+            with self.subTest(text):
+                self.assertEqual(compile_source(text), compile_source(text, scanner='char'))
+
+        with self.assertRaisesRegex(Exception, 'expects 0'):
+            compile_source('func f():\n  return 1\nend\nint a ~ f(1);\n')
+
+    def test_prints_nothing(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            compile_source(self.text)
+            with tempfile.TemporaryDirectory() as directory:
+                compile_source(self.text, cache=AstCache(directory))
+
+        self.assertEqual(output.getvalue(), '')
+
+    def test_initial_values_using_variables(self):
+        target = compile_source('int a ~ 1;\nint b ~ a;\nint c ~ a * b + 2;\n')
+
+        self.assertEqual(target, compile_source('int a ~ 1;\nint b ~ a;\nint c ~ a * b + 2;\n', scanner='char'))
+        with self.assertRaises(InvalidTypeException):
+            compile_source('int a ~ 1;\nbool b ~ a;\n')
+        with self.assertRaises(UndeclaredVariableException):
+            compile_source('int a ~ a;\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,6 +15,14 @@ class MyTestCase(unittest.TestCase):
         self.encoder = Encoder()
         Machine.code = [None for _ in range(Machine.PB)]
 
+    def declare(self, declaration, address: Address) -> int:
+        """
+        Adds a symbol for a declaration to the encoder, allocated at an address.
+        """
+        declaration.symbol = self.encoder.symbols.add(declaration)
+        self.encoder.symbols.allocate(declaration.symbol, address.level, address.displacement)
+        return declaration.symbol
+
     def test_visit_operator_returns_spelling(self):
         operator = Operator('~')
 
@@ -72,36 +80,35 @@ class MyTestCase(unittest.TestCase):
 
         self.assertIsNone(instruction)
 
-    def test_visit_var_expression_returns_address_if_value_needed(self):
+    def test_visit_var_expression_returns_symbol_if_value_needed(self):
         i = Identifier('x')
         ve = VarExpression(i)
-        ve.declaration = VarDeclaration(TypeIndicator('int'), i)
         address = Address(level=1, displacement=1)
-        ve.declaration.address = address
+        ve.symbol = self.declare(VarDeclaration(TypeIndicator('int'), i), address)
 
-        returned_address: Address = self.encoder.visit_var_expression(ve, True)
+        symbol: int = self.encoder.visit_var_expression(ve, True)
 
-        self.assertEqual(returned_address.level, address.level)
-        self.assertEqual(returned_address.displacement, address.displacement)
+        self.assertEqual(symbol, ve.symbol)
+        self.assertEqual(self.encoder.symbols.levels[symbol], address.level)
+        self.assertEqual(self.encoder.symbols.displacements[symbol], address.displacement)
 
-    def test_visit_var_expression_returns_address_if_value_not_needed(self):
+    def test_visit_var_expression_returns_symbol_if_value_not_needed(self):
         i = Identifier('x')
         ve = VarExpression(i)
-        ve.declaration = VarDeclaration(TypeIndicator('int'), i)
         address = Address(level=1, displacement=1)
-        ve.declaration.address = address
+        ve.symbol = self.declare(VarDeclaration(TypeIndicator('int'), i), address)
 
-        returned_address: Address = self.encoder.visit_var_expression(ve, False)
+        symbol: int = self.encoder.visit_var_expression(ve, False)
 
-        self.assertEqual(returned_address.level, address.level)
-        self.assertEqual(returned_address.displacement, address.displacement)
+        self.assertEqual(symbol, ve.symbol)
+        self.assertEqual(self.encoder.symbols.levels[symbol], address.level)
+        self.assertEqual(self.encoder.symbols.displacements[symbol], address.displacement)
 
     def test_visit_var_expression_emits_if_value_needed(self):
         i = Identifier('x')
         ve = VarExpression(i)
-        ve.declaration = VarDeclaration(TypeIndicator('int'), i)
         address = Address(level=1, displacement=1)
-        ve.declaration.address = address
+        ve.symbol = self.declare(VarDeclaration(TypeIndicator('int'), i), address)
 
         self.encoder.current_level = 1
         self.encoder.visit_var_expression(ve, True)
@@ -115,8 +122,7 @@ class MyTestCase(unittest.TestCase):
     def test_visit_var_expression_doesnt_emit_if_value_not_needed(self):
         i = Identifier('x')
         ve = VarExpression(i)
-        ve.declaration = VarDeclaration(TypeIndicator('int'), i)
-        ve.declaration.address = Address(level=1, displacement=1)
+        ve.symbol = self.declare(VarDeclaration(TypeIndicator('int'), i), Address(level=1, displacement=1))
 
         self.encoder.visit_var_expression(ve, False)
 
@@ -152,8 +158,7 @@ class MyTestCase(unittest.TestCase):
 
     def test_binary_expression_emits_store_op_if_assign_operator_and_load_op_if_value_needed(self):
         ve = VarExpression(Identifier('x'))
-        ve.declaration = VarDeclaration(TypeIndicator('int'), ve.name)
-        ve.declaration.address = Address()
+        ve.symbol = self.declare(VarDeclaration(TypeIndicator('int'), ve.name), Address())
         il = IntegerLiteral('5')
         be = BinaryExpression(
             operator=Operator('~'),
@@ -176,8 +181,7 @@ class MyTestCase(unittest.TestCase):
 
     def test_binary_expression_emits_store_op_if_assign_operator_and_omits_load_op_if_not_value_needed(self):
         ve = VarExpression(Identifier('x'))
-        ve.declaration = VarDeclaration(TypeIndicator('int'), ve.name)
-        ve.declaration.address = Address()
+        ve.symbol = self.declare(VarDeclaration(TypeIndicator('int'), ve.name), Address())
         il = IntegerLiteral('5')
         be = BinaryExpression(
             operator=Operator('~'),
@@ -194,8 +198,7 @@ class MyTestCase(unittest.TestCase):
 
     def test_binary_expression_emits_call_op_if_arithmetic_operator_and_value_needed(self):
         ve = VarExpression(Identifier('x'))
-        ve.declaration = VarDeclaration(TypeIndicator('int'), ve.name)
-        ve.declaration.address = Address()
+        ve.symbol = self.declare(VarDeclaration(TypeIndicator('int'), ve.name), Address())
         il = IntegerLiteral('5')
         be = BinaryExpression(
             operator=Operator('+'),
@@ -213,8 +216,7 @@ class MyTestCase(unittest.TestCase):
 
     def test_binary_expression_doesnt_emit_if_arithmetic_operator_but_not_value_needed(self):
         ve = VarExpression(Identifier('x'))
-        ve.declaration = VarDeclaration(TypeIndicator('int'), ve.name)
-        ve.declaration.address = Address()
+        ve.symbol = self.declare(VarDeclaration(TypeIndicator('int'), ve.name), Address())
         il = IntegerLiteral('5')
         be = BinaryExpression(
             operator=Operator('+'),
@@ -251,7 +253,7 @@ class MyTestCase(unittest.TestCase):
         fd = FuncDeclaration(i, al, CommandList())
         fd.address = Address()
         ce = CallExpression(i, al)
-        ce.declaration = fd
+        ce.symbol = self.declare(fd, fd.address)
 
         self.encoder.current_level += 1
         self.encoder.visit_call_expression(ce, True)
@@ -270,7 +272,7 @@ class MyTestCase(unittest.TestCase):
         fd = FuncDeclaration(i, al, CommandList())
         fd.address = Address()
         ce = CallExpression(i, al)
-        ce.declaration = fd
+        ce.symbol = self.declare(fd, fd.address)
 
         self.encoder.current_level += 1
         self.encoder.visit_call_expression(ce, False)
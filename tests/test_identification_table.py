@@ -1,10 +1,118 @@
 import unittest
 
+from abstract_tree import Identifier, TypeIndicator, VarDeclaration
+from identification_table import IdentificationTable
+
 
 class MyTestCase(unittest.TestCase):
     def test_something(self):
         pass
 
 
+def declaration(name):
+    return VarDeclaration(TypeIndicator('int'), Identifier(name))
+
+
+class TestIdentificationTable(unittest.TestCase):
+    def setUp(self):
+        self.table = IdentificationTable()
+
+    def assertConsistent(self):
+        """
+        Checks the stacks and scopes against the entries of `table`.
+        """
+        stacks = {}
+        scopes = {}
+        for entry in self.table.table:
+            stacks.setdefault(entry.identifier, []).append(entry)
+            scopes.setdefault(entry.level, []).append(entry.identifier)
+        self.assertEqual(self.table.entries, stacks)
+        self.assertEqual({level: names for level, names in enumerate(self.table.scopes) if names}, scopes)
+        self.assertTrue(all(entry.level <= self.table.level for entry in self.table.table))
+
+    def test_insert_and_get(self):
+        a, b = declaration('a'), declaration('b')
+        self.table.insert('a', a)
+        self.table.insert('b', b)
+        self.assertIs(self.table.get('a'), a)
+        self.assertIs(self.table.get('b'), b)
+        self.assertIsNone(self.table.get('c'))
+        self.assertEqual([entry.attr for entry in self.table.table], [a, b])
+
+    def test_identified_twice(self):
+        self.table.insert('a', declaration('a'))
+        with self.assertRaises(Exception):
+            self.table.insert('a', declaration('a'))
+        self.table.openScope()
+        self.table.insert('a', declaration('a'))
+        with self.assertRaises(Exception):
+            self.table.insert('a', declaration('a'))
+
+    def test_scopes(self):
+        outer, inner, other = declaration('a'), declaration('a'), declaration('b')
+        self.table.insert('a', outer)
+        self.table.openScope()
+        self.table.insert('a', inner)
+        self.table.insert('b', other)
+        self.assertIs(self.table.get('a'), inner)
+        self.table.openScope()
+        self.table.closeScope()
+        self.assertIs(self.table.get('a'), inner)
+        self.table.closeScope()
+        self.assertIs(self.table.get('a'), outer)
+        self.assertIsNone(self.table.get('b'))
+        self.assertEqual(self.table.level, 0)
+        self.assertConsistent()
+
+        # Closed scopes can be opened again
+        self.table.openScope()
+        self.table.insert('b', other)
+        self.assertIs(self.table.get('b'), other)
+        self.assertConsistent()
+
+    def test_snapshot_and_restore(self):
+        f, a, b, c = declaration('f'), declaration('a'), declaration('b'), declaration('c')
+        self.table.openScope()
+        self.table.insert('f', f)
+        state = self.table.snapshot()
+        self.table.insert('a', a)
+        self.table.openScope()
+        self.table.insert('b', b)
+
+        saved = self.table.restore(state)
+        self.assertEqual(self.table.level, 1)
+        self.assertIs(self.table.get('f'), f)
+        self.assertIsNone(self.table.get('a'))
+        self.assertIsNone(self.table.get('b'))
+        self.assertConsistent()
+        self.table.openScope()
+        self.table.insert('c', c)
+        self.table.insert('a', declaration('a'))
+        self.table.closeScope()
+
+        self.table.restore(saved)
+        self.assertEqual(self.table.level, 2)
+        self.assertEqual([self.table.get(name) for name in 'fabc'], [f, a, b, None])
+        self.assertConsistent()
+        self.table.closeScope()
+        self.table.closeScope()
+        self.assertEqual(self.table.table, [])
+        self.assertConsistent()
+
+    def test_many_identifiers(self):
+        names = [f'v{i}' for i in range(10000)]
+        for name in names:
+            self.table.insert(name, declaration(name))
+        for depth in range(1000):
+            self.table.openScope()
+            self.table.insert(names[depth], declaration(names[depth]))
+        self.assertEqual(self.table.get('v0').identifier.spelling, 'v0')
+        self.assertIs(self.table.get('v999'), self.table.table[-1].attr)
+        for _ in range(1000):
+            self.table.closeScope()
+        self.assertIs(self.table.get('v999'), self.table.table[999].attr)
+        self.assertConsistent()
+
+
 if __name__ == '__main__':
     unittest.main()
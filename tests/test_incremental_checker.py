@@ -0,0 +1,113 @@
+import unittest
+
+from abstract_tree import CallExpression, FuncDeclaration, VarDeclaration, VarExpression
+from abstract_tree.walker import walk
+from benchmarks.programs import generate_functions
+from checker import Checker
+from incremental_checker import IncrementalChecker
+from tests.test_incremental_parser import edit, parse
+
+TEXT = 'int g ~ 1;\n' + generate_functions(5) + 'g ~ f4(g);\n'
+
+
+def resolved(program):
+    """
+    Returns the spelling and start of the declaration every node which may
+    be given a symbol stands for, in preorder, or None for those not given
+    one.
+    """
+    declarations = [None if declaration is None else (declaration.identifier.spelling, declaration.start)
+                    for declaration in program.symbols.declarations]
+    return [None if node.symbol is None else declarations[node.symbol]
+            for node in walk(program) if isinstance(node, (VarDeclaration, FuncDeclaration, VarExpression,
+                                                           CallExpression))]
+
+
+def names(functions):
+    return [fd.identifier.spelling for fd in functions]
+
+
+class TestIncrementalChecker(unittest.TestCase):
+    def setUp(self):
+        self.program, self.stream = parse(TEXT)
+        self.text = TEXT
+        self.checker = IncrementalChecker()
+        self.checker.check(self.program, self.text)
+
+    def edit(self, old, new):
+        self.program, self.stream, self.text = edit(self.program, self.stream, self.text, old, new)
+        self.checker.check(self.program, self.text)
+
+    def assertSameAsChecker(self):
+        expected, _ = parse(self.text)
+        Checker().check(expected)
+        self.assertEqual(resolved(self.program), resolved(expected))
+
+    def test_first_check_checks_every_body(self):
+        self.assertEqual(names(self.checker.rechecked), ['f0', 'f1', 'f2', 'f3', 'f4'])
+        self.assertEqual(self.checker.dependencies['f2'], frozenset({'f1', 'g'}))
+        self.assertEqual(self.checker.dependents('f1'), ['f2'])
+        self.assertSameAsChecker()
+
+    def test_unchanged_program_checks_no_body(self):
+        symbols = resolved(self.program)
+        self.checker.check(self.program, self.text)
+
+        self.assertEqual(self.checker.rechecked, [])
+        self.assertEqual(len(self.checker.records), 5)
+        self.assertEqual(resolved(self.program), symbols)
+
+    def test_edited_body_is_checked_alone(self):
+        self.edit('x0 ~ f1(1);', 'x0 ~ f1(2);\n    x1 ~ x0;')
+
+        self.assertEqual(names(self.checker.rechecked), ['f2'])
+        self.assertSameAsChecker()
+
+    def test_body_parsed_again_is_checked(self):
+        # The same text, but new nodes without symbols
+        self.edit('x0 ~ f1(1);', 'x0 ~ f1(1);')
+
+        self.assertEqual(names(self.checker.rechecked), ['f2'])
+        self.assertSameAsChecker()
+
+    def test_edited_header_checks_callers(self):
+        self.edit('f1(1):', 'f1(2):')
+
+        self.assertEqual(names(self.checker.rechecked), ['f1', 'f2'])
+        self.assertSameAsChecker()
+
+    def test_edited_global_checks_dependents(self):
+        self.edit('int g ~ 1;', 'int g ~ 2;')
+
+        # The top-level command declaring g declares every function too
+        self.assertEqual(names(self.checker.rechecked), ['f0', 'f1', 'f2', 'f3', 'f4'])
+        self.assertSameAsChecker()
+
+    def test_symbols_of_removed_declarations_are_dropped(self):
+        size = len(self.checker.symbols)
+        for value in range(1, 11):
+            # Declares every global again
+            self.edit(f'int g ~ {value};', f'int g ~ {value + 1};')
+
+        declarations = self.checker.symbols.declarations
+        self.assertEqual(sum(declaration is not None for declaration in declarations), size)
+        self.assertLessEqual(len(declarations), 2 * size)
+        self.assertSameAsChecker()
+
+    def test_errors_are_raised_until_fixed(self):
+        with self.assertRaisesRegex(Exception, 'h is not declared'):
+            self.edit('x0 ~ f0(1);', 'x0 ~ h(1);')
+        with self.assertRaisesRegex(Exception, 'h is not declared'):
+            self.checker.check(self.program, self.text)
+
+        self.edit('x0 ~ h(1);', 'x0 ~ f0(1);')
+        self.assertEqual(names(self.checker.rechecked), ['f1'])
+        self.assertSameAsChecker()
+
+    def test_without_source_every_body_is_checked(self):
+        self.checker.check(self.program)
+        self.assertEqual(len(self.checker.rechecked), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import contextlib
+import io
+import random
+import unittest
+
+from abstract_tree import FuncDeclaration
+from benchmarks.programs import generate_program
+from incremental_parser import reparse, settle
+from interning import Interner
+from parser import Parser
+from stack_parser import StackParser
+from tests import test_interning
+from tests.test_stack_parser import differences
+from token_stream import TokenStream
+
+TEXT = '''int a ~ 1;
+func f(x):
+    int y ~ x * 2;
+    while (y):
+        y ~ y - 1;
+    end
+    return y
+end
+if (a):
+    a ~ f(a);
+end
+a ~ a + 1;
+'''
+
+
+def parse(text, interner=None, parser_class=Parser):
+    stream = TokenStream.from_buffer(text)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_class(stream.cursor(), interner).parse_program(), stream
+
+
+def edit(program, stream, text, old, new, count=1, interner=None, parser_class=Parser):
+    offset = text.index(old)
+    for _ in range(count - 1):
+        offset = text.index(old, offset + 1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        program, stream = reparse(program, stream, offset, len(old), new, interner, parser_class)
+    settle(program)
+    return program, stream, text[:offset] + new + text[offset + len(old):]
+
+
+class TestReparse(unittest.TestCase):
+    def assertSameAsParse(self, program, text):
+        self.assertEqual(list(differences(program, parse(text)[0])), [])
+
+    def test_edit_in_a_loop_reparses_its_body(self):
+        program, stream = parse(TEXT)
+        commands = list(program.command_list.commands)
+        func = commands[0].declaration_list.declarations[1]
+        loop = func.commands.commands[1].statement
+        old_body = loop.command
+
+        program, stream, text = edit(program, stream, TEXT, 'y - 1', 'y - 2 * x')
+
+        self.assertSameAsParse(program, text)
+        self.assertIsNot(loop.command, old_body)
+        self.assertIs(func.commands.commands[1].statement, loop)
+        self.assertEqual(program.command_list.commands, commands)
+        for old, new in zip(commands, program.command_list.commands):
+            self.assertIs(old, new)
+
+    def test_edit_in_a_function_header_reparses_the_function(self):
+        program, stream = parse(TEXT)
+        declarations = program.command_list.commands[0].declaration_list.declarations
+        old = declarations[1]
+
+        program, stream, text = edit(program, stream, TEXT, 'f(x)', 'f(x, z)')
+
+        self.assertSameAsParse(program, text)
+        self.assertTrue(isinstance(declarations[1], FuncDeclaration))
+        self.assertIsNot(declarations[1], old)
+
+    def test_edit_changing_the_structure_reparses_a_larger_node(self):
+        program, stream = parse(TEXT)
+
+        program, stream, text = edit(program, stream, TEXT, 'a ~ f(a);', 'a ~ f(a);\nelse:\n    a ~ 0;')
+        self.assertSameAsParse(program, text)
+        self.assertIsNotNone(program.command_list.commands[1].statement.else_com)
+
+        program, stream, text = edit(program, stream, text, '    while (y):\n        y ~ y - 1;\n    end\n', '')
+        self.assertSameAsParse(program, text)
+
+    def test_spans_after_the_edit_are_shifted(self):
+        program, stream = parse(TEXT)
+        last = program.command_list.commands[-1]
+        start = last.start
+
+        program, stream, text = edit(program, stream, TEXT, 'x * 2', 'x * 20000')
+
+        self.assertIs(program.command_list.commands[-1], last)
+        self.assertEqual(last.start, start + 4)
+        self.assertEqual(text[last.start:last.end], 'a ~ a + 1;')
+
+    def test_spans_after_the_edit_are_shifted_when_settled(self):
+        program, stream = parse(TEXT)
+        last = program.command_list.commands[-1]
+        start = last.start
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            program, stream = reparse(program, stream, TEXT.index('x * 2'), 0, '1 + ')
+        self.assertEqual(last.start, start)
+
+        settle(program)
+        self.assertEqual(last.start, start + 4)
+        self.assertIsNone(program.shifts)
+
+    def test_edit_between_commands_parses_everything(self):
+        program, stream = parse(TEXT)
+
+        program, stream, text = edit(program, stream, TEXT, '\nif', '\nint b;\nif')
+
+        self.assertSameAsParse(program, text)
+
+    def test_full_parse_prints_nothing(self):
+        program, stream = parse(TEXT)
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            program, stream = reparse(program, stream, TEXT.index('\nif'), 1, '\nint b;\n')
+        self.assertEqual(output.getvalue(), '')
+        self.assertSameAsParse(program, TEXT.replace('\nif', '\nint b;\nif'))
+
+    def test_deep_programs_are_parsed_again_by_their_parser(self):
+        depth = 3000
+        text = 'int a ~ 1;\n' + 'while (a):\n' * depth + 'a ~ a - 1;\n' + 'end\n' * depth
+        program, stream = parse(text, parser_class=StackParser)
+
+        # The outermost condition, then the innermost body
+        for old, new, count in (('while (a)', 'while (a + 1)', 1), ('a - 1', 'a - 2', 1)):
+            program, stream, text = edit(program, stream, text, old, new, count, parser_class=StackParser)
+            self.assertEqual(list(differences(program, parse(text, parser_class=StackParser)[0])), [])
+
+    def test_random_edits_match_parse(self):
+        rng = random.Random(12)
+        text = generate_program(2000)
+        program, stream = parse(text)
+        for _ in range(100):
+            offset = rng.randrange(len(text))
+            deleted = rng.randint(0, 2)
+            inserted = rng.choice(['', 'x', '1', ' ', '\n', ' - 1', 'b ~ 2;'])
+            new_text = text[:offset] + inserted + text[offset + deleted:]
+            try:
+                parse(new_text)
+            except Exception:
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):
+                program, stream = reparse(program, stream, offset, deleted, inserted)
+            text = new_text
+            settle(program)
+            self.assertSameAsParse(program, text)
+
+    def test_edits_over_pending_shifts_match_parse(self):
+        rng = random.Random(5)
+        text = generate_program(2000)
+        program, stream = parse(text)
+        for _ in range(100):
+            offset = rng.randrange(len(text))
+            deleted = rng.randint(0, 2)
+            inserted = rng.choice(['', 'x', '1', ' ', '\n', ' - 1', 'b ~ 2;'])
+            new_text = text[:offset] + inserted + text[offset + deleted:]
+            try:
+                parse(new_text)
+            except Exception:
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):
+                program, stream = reparse(program, stream, offset, deleted, inserted)
+            text = new_text
+
+        expected = parse(text)[1]
+        self.assertEqual([(stream.kind(i), stream.start(i), stream.end(i)) for i in range(len(stream))],
+                         [(expected.kind(i), expected.start(i), expected.end(i)) for i in range(len(expected))])
+        settle(program)
+        self.assertSameAsParse(program, text)
+
+    def test_edits_of_an_interned_tree_match_parse(self):
+        interner = Interner(expressions=True)
+        program, stream = parse(TEXT, interner)
+        shared = program.command_list.commands[0].declaration_list.declarations[0].expression
+        last = program.command_list.commands[-1]
+
+        # Inside a shared expression, then inside unshared ones
+        text = TEXT
+        for old, new in (('1;', '20;'), ('x * 2', 'x * 2 + 3'), ('f(a)', 'f(a) - 1')):
+            program, stream, text = edit(program, stream, text, old, new, interner=interner)
+            self.assertEqual(list(test_interning.differences(program, parse(text)[0], interner)), [])
+
+        self.assertIsNone(shared.start)
+        self.assertEqual(shared.literal.spelling, '1')
+        self.assertIs(program.command_list.commands[-1], last)
+        self.assertEqual(text[last.start:last.end], 'a ~ a + 1;')
+
+
+if __name__ == '__main__':
+    unittest.main()
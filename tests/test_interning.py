@@ -0,0 +1,140 @@
+import contextlib
+import io
+import os
+import unittest
+
+from abstract_tree import AbstractSyntaxTree, BinaryExpression, Identifier, IntLiteralExpression, Terminal
+from benchmarks.programs import generate_program
+from checker import Checker
+from encoder import Encoder
+from interning import Interner
+from lazy_parser import LazyParser
+from parser import Parser, SCANNERS
+from recovering_parser import RecoveringParser
+from stack_parser import StackParser
+from table_parser import TableParser
+from tests.test_regex_scanner import EXAMPLES
+
+
+def parse(text, interner=None, parser_class=Parser, scanner='regex'):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_class(SCANNERS[scanner].from_string(text), interner).parse_program()
+
+
+def encode(program):
+    Checker().check(program)
+    encoder = Encoder()
+    with contextlib.redirect_stdout(io.StringIO()):
+        encoder.encode(program)
+    return encoder.target_program()
+
+
+def nodes(tree):
+    pending = [tree]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+        elif node is not None:
+            yield node
+            pending.extend(getattr(node, name) for name in node.children)
+
+
+def differences(tree, other, interner):
+    """
+    Yields the path of every difference between an interned tree and a
+    plain one. Shared nodes have no span.
+    """
+    pending = [(tree, other, 'tree')]
+    while pending:
+        a, b, path = pending.pop()
+        if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+            pending.extend((x, y, f'{path}[{i}]') for i, (x, y) in enumerate(zip(a, b)))
+        elif isinstance(a, AbstractSyntaxTree) and isinstance(a, type(b)):
+            span = (None, None) if interner.is_shared(a) else (b.start, b.end)
+            if (a.start, a.end) != span or getattr(a, 'spelling', None) != getattr(b, 'spelling', None):
+                yield path
+            pending.extend((getattr(a, name), getattr(b, name), f'{path}.{name}') for name in a.children)
+        elif a is not None or b is not None:
+            yield path
+
+
+class TestInterning(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(EXAMPLES, 'prog1.txt')) as f:
+            self.text = f.read()
+
+    def test_terminals_are_shared(self):
+        interner = Interner()
+        program = parse('int a ~ 1;\na ~ a + 1;\n', interner)
+
+        identifiers = [node for node in nodes(program) if isinstance(node, Identifier)]
+        self.assertEqual(len(identifiers), 3)
+        self.assertTrue(all(node is identifiers[0] for node in identifiers))
+        self.assertIsNone(identifiers[0].start)
+        self.assertEqual(len({id(node) for node in nodes(program) if isinstance(node, Terminal)}), 5)
+
+    def test_expressions_are_not_shared_by_default(self):
+        program = parse('int a ~ 1 + 2;\nint b ~ 1 + 2;\n', Interner())
+
+        first, second = program.command_list.commands[0].declaration_list.declarations
+        self.assertIsNot(first.expression, second.expression)
+        self.assertIs(first.expression.expression1.literal, second.expression.expression1.literal)
+        self.assertEqual(first.expression.start, 8)
+
+    def test_pure_expressions_are_shared(self):
+        interner = Interner(expressions=True)
+        program = parse('int a ~ 1 + -2 * 3;\nint b ~ 1 + -2 * 3;\nint c ~ 1;\n', interner)
+
+        first, second, third = program.command_list.commands[0].declaration_list.declarations
+        self.assertIsInstance(first.expression, BinaryExpression)
+        self.assertIs(first.expression, second.expression)
+        self.assertIs(third.expression, first.expression.expression1)
+        self.assertIsInstance(third.expression, IntLiteralExpression)
+        self.assertIsNone(first.expression.start)
+        self.assertEqual((first.start, second.start), (0, 20))
+
+    def test_variables_calls_and_assignments_are_not_shared(self):
+        interner = Interner(expressions=True)
+        text = ('int a ~ 2;\nfunc f(a):\n    int a ~ 1;\n    a ~ a + 1;\n    return a\nend\n'
+                'a ~ a + 1;\na ~ f(a) + 1;\na ~ f(a) + 1;\n')
+        program = parse(text, interner)
+
+        expressions = [node for node in nodes(program) if isinstance(node, BinaryExpression)]
+        self.assertEqual(len({id(node) for node in expressions}), len(expressions))
+        self.assertFalse(any(interner.is_shared(node) for node in expressions))
+
+        Checker().check(program)
+        variables = [node.expression1 for node in expressions
+                     if node.operator.spelling == '+' and type(node.expression1).__name__ == 'VarExpression']
+        self.assertEqual(len(variables), 2)
+        self.assertIs(variables[0].name, variables[1].name)
+        self.assertNotEqual(variables[0].symbol, variables[1].symbol)
+
+    def test_same_tree_apart_from_shared_spans(self):
+        for text in (self.text, generate_program(20000)):
+            for interner in (Interner(), Interner(expressions=True)):
+                for parser_class in (Parser, StackParser, LazyParser, RecoveringParser, TableParser):
+                    with self.subTest(parser=parser_class.__name__, expressions=interner.expressions):
+                        program = parse(text, interner, parser_class, 'stream')
+                        self.assertEqual(list(differences(program, parse(text), interner)), [])
+
+    def test_encodes_the_same(self):
+        for text in (self.text, 'int a ~ 1 + 2;\nint b ~ 1 + 2;\nif (a):\n    b ~ -1 * a;\nelse:\n    b ~ 1 + 2;\nend\n'):
+            expected = encode(parse(text))
+
+            self.assertEqual(encode(parse(text, Interner())), expected)
+            self.assertEqual(encode(parse(text, Interner(expressions=True))), expected)
+
+    def test_shared_across_programs(self):
+        interner = Interner(expressions=True)
+        first = parse('int a ~ 1 + 2;\n', interner)
+        second = parse('int b ~ 1 + 2;\n', interner)
+
+        self.assertIs(first.command_list.commands[0].declaration_list.declarations[0].expression,
+                      second.command_list.commands[0].declaration_list.declarations[0].expression)
+        self.assertGreater(interner.reused, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
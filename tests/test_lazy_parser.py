@@ -0,0 +1,179 @@
+import contextlib
+import io
+import os
+import unittest
+
+from abstract_tree import AbstractSyntaxTree, FuncDeclaration, LazyFuncDeclaration
+from abstract_tree.abstract_syntax_tree import attribute_names
+from benchmarks.programs import generate_program
+from checker import Checker
+from encoder import Encoder
+from exceptions import UndeclaredVariableException, UnexpectedTokenException, UnsupportedExpressionTokenException
+from lazy_parser import LazyParser
+from parser import Parser
+from tests.test_regex_scanner import EXAMPLES
+
+LIBRARY = """\
+int a ~ 1;
+func used(a):
+    if (a):
+        a ~ a - 1;
+    else:
+        a ~ 0;
+    end
+    return a
+end
+func unused(a):
+    while (a):
+        func inner(a):
+            return a
+        end
+        a ~ a - 1;
+    end
+    return a
+end
+a ~ used(a);
+"""
+
+
+def parse(parser_class, text):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_class.from_string(text, 'stream').parse_program()
+
+
+def encode(program, checker=None):
+    (checker or Checker()).check(program)
+    encoder = Encoder()
+    with contextlib.redirect_stdout(io.StringIO()):
+        encoder.encode(program)
+    return encoder.target_program()
+
+
+def differences(tree, other):
+    """
+    Yields the path of every difference between two trees, parsing the
+    bodies of lazy function declarations in the first one.
+    """
+    pending = [(tree, other, 'tree')]
+    while pending:
+        a, b, path = pending.pop()
+        if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+            pending.extend((x, y, f'{path}[{i}]') for i, (x, y) in enumerate(zip(a, b)))
+        elif isinstance(a, LazyFuncDeclaration) and type(b) is FuncDeclaration:
+            if (a.start, a.end) != (b.start, b.end):
+                yield path
+            pending.extend((getattr(a, name), getattr(b, name), f'{path}.{name}') for name in b.children)
+        elif isinstance(a, AbstractSyntaxTree) and type(a) is type(b):
+            if (a.start, a.end) != (b.start, b.end):
+                yield path
+            pending.extend((getattr(a, name), getattr(b, name), f'{path}.{name}')
+                           for name in attribute_names(type(a)) if name not in ('start', 'end'))
+        elif a != b:
+            yield path
+
+
+def functions(program):
+    return {d.identifier.spelling: d
+            for command in program.command_list.commands if hasattr(command, 'declaration_list')
+            for d in command.declaration_list.declarations if isinstance(d, FuncDeclaration)}
+
+
+class TestLazyParser(unittest.TestCase):
+    def assertSameTree(self, text):
+        self.assertEqual(list(differences(parse(LazyParser, text), parse(Parser, text))), [])
+
+    def test_example_files_give_same_tree(self):
+        for name in sorted(os.listdir(EXAMPLES)):
+            with open(os.path.join(EXAMPLES, name)) as f:
+                text = f.read()
+            try:
+                self.assertSameTree(text)
+            except UnexpectedTokenException:
+                with self.assertRaises(UnexpectedTokenException):
+                    parse(Parser, text)
+
+    def test_generated_program_gives_same_tree(self):
+        self.assertSameTree(generate_program(20000))
+
+    def test_bodies_are_not_parsed_up_front(self):
+        program = parse(LazyParser, LIBRARY)
+
+        declarations = functions(program)
+        self.assertFalse(declarations['used'].is_parsed)
+        self.assertFalse(declarations['unused'].is_parsed)
+        self.assertEqual(LIBRARY[declarations['unused'].start:declarations['unused'].end].split()[-1], 'end')
+
+    def test_checker_parses_every_body(self):
+        program = parse(LazyParser, LIBRARY)
+        Checker().check(program)
+
+        self.assertTrue(all(declaration.is_parsed for declaration in functions(program).values()))
+
+    def test_uncalled_functions_are_emitted(self):
+        text = 'int a ~ 1;\nfunc unused(a):\n    a ~ a - 1;\n    return a\nend\nfunc used(a):\n    return a\nend\na ~ used(a);\n'
+
+        self.assertEqual(encode(parse(LazyParser, text)), encode(parse(Parser, text)))
+
+    def test_checker_dropping_uncalled_parses_called_bodies_only(self):
+        program = parse(LazyParser, LIBRARY)
+        Checker(drop_uncalled=True).check(program)
+
+        declarations = functions(program)
+        self.assertTrue(declarations['used'].is_parsed)
+        self.assertFalse(declarations['unused'].is_parsed)
+
+    def test_errors_in_uncalled_bodies_are_reported(self):
+        undeclared = 'int c ~ 1;\nfunc f(c):\n    undeclared ~ 10;\n    return c\nend\n'
+        with self.assertRaises(UndeclaredVariableException):
+            Checker().check(parse(Parser, undeclared))
+        with self.assertRaises(UndeclaredVariableException):
+            Checker().check(parse(LazyParser, undeclared))
+
+        nested = 'int c ~ 1;\nfunc f(c):\n    func g(c):\n        c ~ ;\n    end\n    return c\nend\nc ~ f(c);\n'
+        with self.assertRaises(UnsupportedExpressionTokenException):
+            Checker().check(parse(LazyParser, nested))
+
+    def test_called_bodies_are_checked_in_their_scope(self):
+        program = parse(LazyParser, 'func f():\n    return b\nend\nint b ~ 1;\nb ~ f();\n')
+
+        with self.assertRaises(Exception) as error:
+            Checker().check(program)
+        self.assertIn('b', str(error.exception))
+
+    def test_recursive_calls(self):
+        text = 'int n ~ 3;\nfunc f(n):\n    if (n):\n        n ~ f(n - 1);\n    else:\n        n ~ 0;\n    end\n    return n\nend\nn ~ f(n);\n'
+
+        self.assertEqual(encode(parse(LazyParser, text)), encode(parse(Parser, text)))
+
+    def test_encodes_like_eager_parser(self):
+        with open(os.path.join(EXAMPLES, 'prog1.txt')) as f:
+            text = f.read()
+
+        self.assertEqual(encode(parse(LazyParser, text)), encode(parse(Parser, text)))
+
+    def test_uncalled_functions_are_not_emitted(self):
+        without = LIBRARY.split('func unused')[0] + 'a ~ used(a);\n'
+
+        self.assertEqual(encode(parse(LazyParser, LIBRARY), Checker(drop_uncalled=True)),
+                         encode(parse(Parser, without)))
+
+    def test_body_errors_are_raised_on_demand(self):
+        program = parse(LazyParser, 'func f(a):\n    a ~ ;\nend\nint b ~ 1;\n')
+
+        with self.assertRaises(UnsupportedExpressionTokenException):
+            functions(program)['f'].commands
+
+    def test_unclosed_body(self):
+        with self.assertRaises(UnexpectedTokenException):
+            parse(LazyParser, 'func f(a):\n    if (a):\n        a ~ 1;\nend\n')
+
+    def test_other_scanners_parse_eagerly(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            program = LazyParser.from_string(LIBRARY, 'regex').parse_program()
+
+        self.assertEqual(list(differences(program, parse(Parser, LIBRARY))), [])
+        self.assertTrue(functions(program)['unused'].is_parsed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch, mock_open
+
+from exceptions import UnexpectedTokenException
+from line_index import LineIndex
+from parser import Parser, SCANNERS
+from tokens import Kind
+
+
+class TestLineIndex(unittest.TestCase):
+    def test_position_on_first_line(self):
+        index = LineIndex('int a;\nint b;')
+
+        self.assertEqual(index.position(0), (1, 1))
+        self.assertEqual(index.position(4), (1, 5))
+
+    def test_position_on_later_lines(self):
+        index = LineIndex('int a;\n\nint b;\n')
+
+        self.assertEqual(index.position(6), (1, 7))
+        self.assertEqual(index.position(7), (2, 1))
+        self.assertEqual(index.position(12), (3, 5))
+        self.assertEqual(index.position(15), (4, 1))
+
+    def test_position_in_bytes(self):
+        index = LineIndex(b'a\nbc')
+
+        self.assertEqual(index.position(3), (2, 2))
+
+    def test_index_is_built_on_first_lookup(self):
+        index = LineIndex('a\nb')
+
+        self.assertIsNone(index.line_starts)
+        index.position(2)
+        self.assertEqual(list(index.line_starts), [0, 2])
+
+
+
+class TestSpans(unittest.TestCase):
+    TEXT = 'int ten ~ 10;\n# note\nten ~ ten + 1;\n'
+
+    def scan_spans(self, backend):
+        with patch('builtins.open', mock_open(read_data=self.TEXT)):
+            scanner = SCANNERS[backend].from_file('file')
+        spans = []
+        while True:
+            token = scanner.scan()
+            spans.append((token.spelling, token.start, token.end))
+            if token.kind is Kind.EOT:
+                return spans
+
+    def parse(self, text):
+        with patch('builtins.open', mock_open(read_data=text)):
+            return Parser.from_file('file').parse_program()
+
+    def test_token_spans_match_across_scanners(self):
+        expected = self.scan_spans('char')
+
+        self.assertEqual(expected[:2], [('int', 0, 3), ('ten', 4, 7)])
+        self.assertEqual(expected[-1], ('', len(self.TEXT), len(self.TEXT)))
+        for backend in ('regex', 'stream'):
+            self.assertEqual(self.scan_spans(backend), expected, backend)
+
+    def test_node_spans_cover_their_source(self):
+        program = self.parse(self.TEXT)
+        declaration = program.command_list.commands[0].declaration_list.declarations[0]
+        statement = program.command_list.commands[1].statement
+        addition = statement.expressions.expression2
+
+        self.assertEqual((program.start, program.end), (0, len(self.TEXT) - 1))
+        self.assertEqual(self.TEXT[declaration.start:declaration.end], 'int ten ~ 10;')
+        self.assertEqual(self.TEXT[statement.start:statement.end], 'ten ~ ten + 1')
+        self.assertEqual(self.TEXT[addition.start:addition.end], 'ten + 1')
+        self.assertEqual((addition.operator.start, addition.operator.end), (31, 32))
+
+    def test_error_reports_position_of_unexpected_token(self):
+        with self.assertRaises(UnexpectedTokenException) as error:
+            self.parse('int a ~ 1;\nwhile (a:\nend')
+
+        self.assertEqual((error.exception.line, error.exception.column), (2, 9))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch, mock_open
+
+from parser import Parser
+from scanner import Scanner, SourceFile
+from tests.test_regex_scanner import CORPUS, EXAMPLES, scan_all, scan_text
+from tokens import Kind
+
+try:
+    from numpy_scanner import NumpyCursor, scan_arrays, token_stream
+except ImportError:
+    NumpyCursor = None
+
+
+def stream_tokens(stream):
+    return [(stream.kind(i), stream.spelling(i)) for i in range(len(stream))]
+
+
+@unittest.skipIf(NumpyCursor is None, 'NumPy is not installed')
+class TestNumpyScanner(unittest.TestCase):
+    def assertSameTokens(self, text):
+        self.assertEqual(stream_tokens(token_stream(text)), scan_text(Scanner, text), repr(text))
+
+    def test_corpus_matches_scanner(self):
+        for text in CORPUS:
+            self.assertSameTokens(text)
+
+    def test_example_files_match_scanner(self):
+        for name in sorted(os.listdir(EXAMPLES)):
+            with open(os.path.join(EXAMPLES, name)) as f:
+                self.assertSameTokens(f.read())
+
+    def test_random_input_matches_scanner(self):
+        alphabet = 'ab1 2\n\t#=~+-*/;():",_é²½\x0bЖ٣'
+        rng = random.Random(6)
+        for _ in range(500):
+            self.assertSameTokens(''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))))
+
+    def test_bytes_match_scanner(self):
+        for text in CORPUS[:-1] + ['# a\rb\r\n#c==\nd', 'x#\r#y\nz']:
+            data = text.encode('latin-1')
+
+            self.assertEqual(stream_tokens(token_stream(data)), scan_all(Scanner.from_bytes(data)), repr(text))
+
+    def test_mapped_file_matches_scanner(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(CORPUS[:-1]))
+        try:
+            expected = scan_all(Scanner(path))
+            with patch.object(SourceFile, 'MMAP_THRESHOLD', 1):
+                cursor = NumpyCursor.from_file(path)
+
+            self.assertEqual(scan_all(cursor), expected)
+        finally:
+            os.remove(path)
+
+    def test_offsets(self):
+        kinds, starts, ends = scan_arrays('ab ~ 12; # c\nx')
+
+        self.assertEqual(list(starts), [0, 3, 5, 7, 13, 14])
+        self.assertEqual(list(ends), [2, 4, 7, 8, 14, 14])
+
+    def test_keywords_get_their_kind(self):
+        stream = token_stream('func end else while if return echo read true false str int bool ifs retur')
+
+        self.assertEqual([stream.kind(i) for i in range(len(stream))], [
+            Kind.FUNC, Kind.END, Kind.ELSE, Kind.WHILE, Kind.IF, Kind.RETURN, Kind.ECHO, Kind.READ,
+            Kind.TRUE, Kind.FALSE, Kind.STRING_TYPE, Kind.INTEGER_TYPE, Kind.BOOLEAN_TYPE,
+            Kind.IDENTIFIER, Kind.IDENTIFIER, Kind.EOT
+        ])
+
+    def test_parser_from_file_with_numpy_scanner(self):
+        with patch('builtins.open', mock_open(read_data='int a ~ 1; a ~ a + 1;')):
+            p = Parser.from_file('file', scanner='numpy')
+
+            self.assertTrue(isinstance(p.scanner, NumpyCursor))
+            program = p.parse_program()
+            self.assertEqual(len(program.command_list.commands), 2)
+            self.assertEqual(p.current_terminal.kind, Kind.EOT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import random
+import unittest
+from unittest.mock import patch, mock_open
+
+from exceptions import NonAsciiSourceException
+from parallel_scanner import ParallelCursor, scan_chunk, scan_parallel, split_lines
+from parser import Parser
+from tests.test_regex_scanner import CORPUS, EXAMPLES
+from token_stream import TokenStream
+from tokens import Kind
+
+
+def stream_tokens(stream):
+    return [(stream.kind(i), stream.spelling(i), stream.starts[i], stream.ends[i]) for i in range(len(stream))]
+
+
+class TestParallelScanner(unittest.TestCase):
+    def assertSameTokens(self, buffer, workers=3):
+        self.assertEqual(stream_tokens(scan_parallel(buffer, workers, threshold=0)),
+                         stream_tokens(TokenStream.from_buffer(buffer)), repr(buffer))
+
+    def test_split_lines_ends_ranges_after_line_breaks(self):
+        text = 'ab\ncd # x\nef\n\ngh'
+        ranges = split_lines(text, 3)
+
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(text))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(text[end - 1], '\n')
+
+    def test_split_lines_without_line_breaks(self):
+        self.assertEqual(split_lines('abc', 4), [(0, 3)])
+        self.assertEqual(split_lines('', 4), [])
+
+    def test_scan_chunk_shifts_offsets(self):
+        kinds, starts, ends = scan_chunk('a ~ 1;', 10)
+
+        self.assertEqual(list(starts), [10, 12, 14, 15])
+        self.assertEqual(list(ends), [11, 13, 15, 16])
+
+    def test_corpus_matches_token_stream(self):
+        self.assertSameTokens('\n'.join(CORPUS))
+        self.assertSameTokens(''.join(CORPUS))
+
+    def test_example_files_match_token_stream(self):
+        for name in sorted(os.listdir(EXAMPLES)):
+            with open(os.path.join(EXAMPLES, name)) as f:
+                self.assertSameTokens(f.read())
+
+    def test_random_lines_match_token_stream(self):
+        alphabet = 'ab1 2\n\t#=~+-*/;():",_é²½'
+        rng = random.Random(7)
+        text = ''.join(rng.choice(alphabet) for _ in range(2000))
+
+        self.assertSameTokens(text, workers=5)
+        self.assertSameTokens(text.encode('ascii', 'ignore'), workers=5)
+
+    def test_non_ascii_bytes_are_reported_in_whole_source(self):
+        data = ('a ~ 1;\n' * 50 + 'b ~ é;\n' + 'c ~ 2;\n' * 50).encode()
+        with self.assertRaises(NonAsciiSourceException) as expected:
+            TokenStream.from_buffer(data)
+        with self.assertRaises(NonAsciiSourceException) as actual:
+            scan_parallel(data, workers=3, threshold=0)
+
+        self.assertEqual((actual.exception.line, actual.exception.column), (51, 5))
+        self.assertEqual(actual.exception.message, expected.exception.message)
+
+    def test_small_sources_are_scanned_in_process(self):
+        with patch('parallel_scanner.ProcessPoolExecutor', side_effect=AssertionError('pool started')):
+            stream = scan_parallel('int a ~ 1;', workers=4)
+
+        self.assertEqual(stream.kind(len(stream) - 1), Kind.EOT)
+
+    def test_sources_without_ranges_to_split_are_scanned_in_process(self):
+        for buffer in ('', b'', 'int a ~ 1;'):
+            with patch('parallel_scanner.ProcessPoolExecutor', side_effect=AssertionError('pool started')):
+                stream = scan_parallel(buffer, workers=4, threshold=0)
+
+            self.assertEqual(stream_tokens(stream), stream_tokens(TokenStream.from_buffer(buffer)))
+
+    def test_parser_from_file_with_parallel_scanner(self):
+        with patch('builtins.open', mock_open(read_data='int a ~ 1; a ~ a + 1;')):
+            p = Parser.from_file('file', scanner='parallel')
+
+            self.assertTrue(isinstance(p.scanner, ParallelCursor))
+            program = p.parse_program()
+            self.assertEqual(len(program.command_list.commands), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
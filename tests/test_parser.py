@@ -170,6 +170,47 @@ class TestParser(unittest.TestCase):
             self.assertEqual(p.current_terminal.kind,
                              Kind.EOT)
 
+    def test_parse_expression_mul_binds_tighter_than_add(self):
+        p = Parser.from_string('1 + 2 * 3 - 4')
+
+        expression = p.parse_expression_list_assign_operator()
+
+        self.assertEqual(expression.operator.spelling, '-')
+        addition = expression.expression1
+        self.assertEqual(addition.operator.spelling, '+')
+        self.assertEqual(addition.expression2.operator.spelling, '*')
+        self.assertEqual((addition.expression2.start, addition.expression2.end), (4, 9))
+        self.assertEqual((expression.start, expression.end), (0, 13))
+
+    def test_parse_expression_assignment_binds_loosest(self):
+        p = Parser.from_string('1 * 2 ~ 3 + 4')
+
+        expression = p.parse_expression_list_assign_operator()
+
+        self.assertEqual(expression.operator.spelling, '~')
+        self.assertEqual(expression.expression1.operator.spelling, '*')
+        self.assertEqual(expression.expression2.operator.spelling, '+')
+
+    def test_parse_expression_stops_at_unknown_operator(self):
+        p = Parser.from_string('a + b == c')
+
+        expression = p.parse_expression_list_assign_operator()
+
+        self.assertEqual(expression.operator.spelling, '+')
+        self.assertEqual(p.current_terminal.spelling, '==')
+
+    def test_parse_expression_long_chain_is_left_associative(self):
+        p = Parser.from_string(' + '.join(['a'] * 5000))
+
+        expression = p.parse_expression_list_assign_operator()
+
+        depth = 0
+        while isinstance(expression, BinaryExpression):
+            self.assertTrue(isinstance(expression.expression2, VarExpression))
+            expression = expression.expression1
+            depth += 1
+        self.assertEqual(depth, 4999)
+
     #######################
     # Signle declarations #
     #######################
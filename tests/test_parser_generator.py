@@ -0,0 +1,91 @@
+import unittest
+
+from parser_generator import GrammarError, read_grammar
+
+TERMINALS = ['NUMBER', 'PLUS', 'TIMES', 'LEFT', 'RIGHT', 'END']
+
+EXPRESSIONS = """\
+# Sums of products
+Sum         ::= Product (PLUS Product)*         => sum
+Product     ::= Factor (TIMES Factor)*
+Factor      ::= NUMBER
+              | LEFT Sum RIGHT                  => group
+"""
+
+
+def names(grammar, bits):
+    return {t for i, t in enumerate(grammar.terminals) if bits >> i & 1}
+
+
+class TestReadGrammar(unittest.TestCase):
+    def test_productions(self):
+        grammar = read_grammar(EXPRESSIONS, TERMINALS, 'END')
+
+        self.assertEqual(grammar.start, 'Sum')
+        self.assertEqual([repr(p) for p in grammar.productions], [
+            'Sum ::= Product (PLUS Product)* => sum',
+            'Product ::= Factor (TIMES Factor)*',
+            'Factor ::= NUMBER',
+            'Factor ::= LEFT Sum RIGHT => group',
+            '(PLUS Product) ::= PLUS Product',
+            '(PLUS Product)* ::= (PLUS Product) (PLUS Product)*',
+            '(PLUS Product)* ::= ε',
+            '(TIMES Factor) ::= TIMES Factor',
+            '(TIMES Factor)* ::= (TIMES Factor) (TIMES Factor)*',
+            '(TIMES Factor)* ::= ε',
+        ])
+
+    def test_actions_on_their_own_line(self):
+        grammar = read_grammar('A ::= NUMBER PLUS\n    => pair\n  | ε => none\n', TERMINALS, 'END')
+
+        self.assertEqual([p.action for p in grammar.productions], ['pair', 'none'])
+
+    def test_unknown_symbol(self):
+        with self.assertRaises(GrammarError):
+            read_grammar('A ::= NUMBER B\n', TERMINALS, 'END')
+
+    def test_not_a_rule(self):
+        with self.assertRaises(GrammarError):
+            read_grammar('A NUMBER\n', TERMINALS, 'END')
+
+
+class TestGrammar(unittest.TestCase):
+    def setUp(self):
+        self.grammar = read_grammar(EXPRESSIONS, TERMINALS, 'END')
+
+    def test_first(self):
+        self.assertEqual(names(self.grammar, self.grammar.first['Sum']), {'NUMBER', 'LEFT'})
+        self.assertEqual(names(self.grammar, self.grammar.first['(TIMES Factor)*']), {'TIMES'})
+        self.assertEqual(self.grammar.nullable, {'(PLUS Product)*', '(TIMES Factor)*'})
+
+    def test_follow(self):
+        self.assertEqual(names(self.grammar, self.grammar.follow['Sum']), {'RIGHT', 'END'})
+        self.assertEqual(names(self.grammar, self.grammar.follow['Factor']), {'TIMES', 'PLUS', 'RIGHT', 'END'})
+
+    def test_table(self):
+        rows, defaults = self.grammar.table()
+        row = rows[self.grammar.nonterminals.index('Factor')]
+        productions = self.grammar.productions
+
+        self.assertEqual(repr(productions[row[TERMINALS.index('LEFT')]]), 'Factor ::= LEFT Sum RIGHT => group')
+        self.assertEqual(row[TERMINALS.index('PLUS')], -1)
+        self.assertEqual(defaults[self.grammar.nonterminals.index('Factor')], -1)
+        repeat = self.grammar.nonterminals.index('(PLUS Product)*')
+        self.assertEqual(repr(productions[defaults[repeat]]), '(PLUS Product)* ::= ε')
+
+    def test_repetition_takes_what_it_can(self):
+        grammar = read_grammar('A ::= B* PLUS*\nB ::= PLUS NUMBER\n', TERMINALS, 'END')
+        rows, _ = grammar.table()
+        chosen = rows[grammar.nonterminals.index('B*')][TERMINALS.index('PLUS')]
+
+        self.assertEqual(repr(grammar.productions[chosen]), 'B* ::= B B*')
+
+    def test_conflict(self):
+        grammar = read_grammar('A ::= NUMBER PLUS | NUMBER TIMES\n', TERMINALS, 'END')
+
+        with self.assertRaises(GrammarError):
+            grammar.table()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import unittest
+
+from abstract_tree import DeclarationCommand, StatementCommand, WhileStatement
+from benchmarks.programs import generate_program
+from exceptions import (UnexpectedTokenException,
+                        UnsupportedCommandTokenException,
+                        UnsupportedExpressionTokenException)
+from parser import Parser
+from recovering_parser import RecoveringParser
+from tests.test_stack_parser import differences
+
+
+def parse(text):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return RecoveringParser.from_string(text, 'stream').parse()
+
+
+class TestRecoveringParser(unittest.TestCase):
+    def test_valid_program_gives_same_tree(self):
+        text = generate_program(5000)
+        program, errors = parse(text)
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = Parser.from_string(text, 'stream').parse_program()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(list(differences(program, expected)), [])
+
+    def test_reports_every_error(self):
+        program, errors = parse(
+            'int a ~ 1;\n'
+            'a ~ ;\n'
+            'while (a):\n'
+            '    a ~ a - 1\n'
+            '    int c ~ 4;\n'
+            'end\n'
+            ') b ~ 1;\n'
+            'a ~ 2;\n'
+        )
+
+        self.assertEqual([(type(e), e.line, e.column) for e in errors], [
+            (UnsupportedExpressionTokenException, 2, 5),
+            (UnexpectedTokenException, 5, 5),
+            (UnsupportedCommandTokenException, 7, 1),
+        ])
+        commands = program.command_list.commands
+        self.assertEqual([type(c) for c in commands], [DeclarationCommand, StatementCommand, StatementCommand])
+        loop = commands[1].statement
+        self.assertTrue(isinstance(loop, WhileStatement))
+        self.assertTrue(isinstance(loop.command.commands[0], DeclarationCommand))
+
+    def test_block_with_broken_header_keeps_its_body(self):
+        program, errors = parse('if (a b):\n    a ~ 2;\nelse:\n    a ~ 3;\nend\nx ~ 1;')
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].expected_kind.name, 'RIGHT_PAR')
+        spellings = [c.statement.expressions.expression1.name.spelling for c in program.command_list.commands]
+        self.assertEqual(spellings, ['a', 'x'])
+
+    def test_missing_end(self):
+        program, errors = parse('while (a):\n    a ~ 1;\n')
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].expected_kind.name, 'END')
+        self.assertEqual(program.command_list.commands, [])
+
+    def test_stray_end_at_top_level(self):
+        program, errors = parse('a ~ 1;\nend\nb ~ 2;\nelse\n')
+
+        self.assertEqual([(e.line, e.column) for e in errors], [(2, 1), (4, 1)])
+        self.assertEqual(len(program.command_list.commands), 2)
+
+    def test_errors_in_large_program(self):
+        lines = generate_program(200000).split('\n')
+        broken = set(range(100, len(lines), 500))
+        for i in broken:
+            lines[i] = ') ' + lines[i]
+
+        program, errors = parse('\n'.join(lines))
+
+        self.assertEqual(sorted(e.line for e in errors), sorted(i + 1 for i in broken))
+        self.assertGreater(len(program.command_list.commands), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
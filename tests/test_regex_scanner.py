@@ -0,0 +1,114 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch, mock_open
+
+from parser import Parser
+from regex_scanner import RegexScanner, tokenize
+from scanner import Scanner, SourceFile
+from tokens import Kind
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), '..', 'example_files')
+
+CORPUS = [
+    '',
+    'Hello',
+    'Hello World',
+    'H3ll0',
+    '_Hello',
+    '123',
+    '12ab ab12',
+    '*',
+    'if Hello ==',
+    '= == === ====',
+    'x=y',
+    '# Comment\nHello',
+    '# Comment without a newline',
+    'a#b\nc',
+    'int five ~ 5+five-10;',
+    'func helloworld(arg, org):\n    str org ~ "world";\nend',
+    'if (ten):\n    return true\nelse:\n    return false\nend',
+    'tab\there\r\nand\rthere',
+    'é²½1² abé 1½ x\x0by',
+]
+
+
+def scan_all(scanner):
+    tokens = []
+    while True:
+        token = scanner.scan()
+        tokens.append((token.kind, token.spelling))
+        if token.kind is Kind.EOT:
+            return tokens
+
+
+def scan_text(scanner_class, text):
+    with patch('builtins.open', mock_open(read_data=text)):
+        return scan_all(scanner_class('file'))
+
+
+class TestRegexScanner(unittest.TestCase):
+    def assertSameTokens(self, text):
+        self.assertEqual(scan_text(RegexScanner, text), scan_text(Scanner, text), repr(text))
+
+    def test_corpus_matches_scanner(self):
+        for text in CORPUS:
+            self.assertSameTokens(text)
+
+    def test_example_files_match_scanner(self):
+        for name in sorted(os.listdir(EXAMPLES)):
+            with open(os.path.join(EXAMPLES, name)) as f:
+                self.assertSameTokens(f.read())
+
+    def test_random_input_matches_scanner(self):
+        alphabet = 'ab1 2\n\t#=~+-*/;():",_é²½\x0b'
+        rng = random.Random(4)
+        for _ in range(500):
+            self.assertSameTokens(''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))))
+
+    def test_mapped_file_matches_scanner(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(CORPUS[:-1]))
+        try:
+            expected = scan_all(Scanner(path))
+            with patch.object(SourceFile, 'MMAP_THRESHOLD', 1):
+                actual = scan_all(RegexScanner(path))
+
+            self.assertEqual(actual, expected)
+        finally:
+            os.remove(path)
+
+    def test_keywords_get_their_kind(self):
+        kinds = [kind for kind, _, _ in tokenize('func end else while if return echo read true false str int bool')]
+
+        self.assertEqual(kinds, [
+            Kind.FUNC, Kind.END, Kind.ELSE, Kind.WHILE, Kind.IF, Kind.RETURN, Kind.ECHO, Kind.READ,
+            Kind.TRUE, Kind.FALSE, Kind.STRING_TYPE, Kind.INTEGER_TYPE, Kind.BOOLEAN_TYPE, Kind.EOT
+        ])
+
+    def test_tokenize_returns_offsets(self):
+        spans = [(start, end) for _, start, end in tokenize('ab ~ 12; # c\nx')]
+
+        self.assertEqual(spans, [(0, 2), (3, 4), (5, 7), (7, 8), (13, 14), (14, 14)])
+
+    def test_scan_returns_eot_after_the_end(self):
+        with patch('builtins.open', mock_open(read_data='a')):
+            scanner = RegexScanner('file')
+            scanner.scan()
+
+            self.assertEqual(scanner.scan().kind, Kind.EOT)
+            self.assertEqual(scanner.scan().kind, Kind.EOT)
+
+    def test_parser_from_file_with_regex_scanner(self):
+        with patch('builtins.open', mock_open(read_data='int a ~ 1;')):
+            p = Parser.from_file('file', scanner='regex')
+
+            self.assertTrue(isinstance(p.scanner, RegexScanner))
+            p.parse_program()
+            self.assertEqual(p.current_terminal.kind, Kind.EOT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, mock_open
 from scanner import Scanner, SourceFile
+from regex_scanner import RegexScanner
 from tokens import Kind
 
 
@@ -152,3 +155,91 @@ class TestSourceFile(unittest.TestCase):
             self.assertEqual(char_h, 'H')
             self.assertEqual(char_e, 'e')
             self.assertEqual(char_l, 'l')
+
+    def test_init_closes_file(self):
+        with patch("builtins.open", mock_open(read_data="Hello")) as opened:
+            SourceFile('')
+
+            opened.return_value.close.assert_called()
+
+    def test_get_next_char_from_mapped_file(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write("int a ~ 1; # Comment\nb")
+        try:
+            with patch.object(SourceFile, 'MMAP_THRESHOLD', 1):
+                file = SourceFile(path)
+                chars = []
+                char = file.get_next_char()
+                while char != file.EOT:
+                    chars.append(char)
+                    char = file.get_next_char()
+                file.close()
+
+            self.assertEqual(''.join(chars), "int a ~ 1; # Comment\nb")
+        finally:
+            os.remove(path)
+
+    def test_scan_mapped_file_gives_same_tokens(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write("int a ~ 1;\n# Comment\nif (a == 10): a ~ a - 1; end")
+        try:
+            expected = []
+            scanner = Scanner(path)
+            while not expected or expected[-1] != ('', Kind.EOT):
+                token = scanner.scan()
+                expected.append((token.spelling, token.kind))
+
+            actual = []
+            with patch.object(SourceFile, 'MMAP_THRESHOLD', 1):
+                scanner = Scanner(path)
+                while not actual or actual[-1] != ('', Kind.EOT):
+                    token = scanner.scan()
+                    actual.append((token.spelling, token.kind))
+
+            self.assertEqual(actual, expected)
+        finally:
+            os.remove(path)
+
+    def test_scanners_release_mapped_file_at_eot(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write("int a ~ 1;\nb")
+        try:
+            with patch.object(SourceFile, 'MMAP_THRESHOLD', 1):
+                for scanner_class in (Scanner, RegexScanner):
+                    scanner = scanner_class(path)
+                    mapped = scanner.source.mapped
+                    while scanner.scan().kind is not Kind.EOT:
+                        self.assertFalse(mapped.closed)
+
+                    self.assertTrue(mapped.closed)
+                    # Positions are still known for diagnostics
+                    self.assertEqual(scanner.line_index.position(11), (2, 1))
+        finally:
+            os.remove(path)
+
+    def test_from_string_and_bytes_read_memory(self):
+        text = "int a ~ 1; # Comment\nb"
+        with patch('builtins.open', side_effect=AssertionError('file opened')):
+            for source in (SourceFile.from_string(text), SourceFile.from_bytes(memoryview(text.encode()))):
+                chars = []
+                while (char := source.get_next_char()) != SourceFile.EOT:
+                    chars.append(char)
+
+                self.assertEqual(''.join(chars), text)
+
+    def test_scanner_from_string_gives_same_tokens(self):
+        def scan_all(scanner):
+            tokens = [scanner.scan()]
+            while tokens[-1].kind is not Kind.EOT:
+                tokens.append(scanner.scan())
+            return [(token.kind, token.spelling, token.start) for token in tokens]
+
+        text = "int a ~ 1;\n# Comment\nif (a == 10): a ~ a - 1; end"
+        with patch('builtins.open', mock_open(read_data=text)):
+            expected = scan_all(Scanner('file'))
+
+        self.assertEqual(scan_all(Scanner.from_string(text)), expected)
+        self.assertEqual(scan_all(Scanner.from_bytes(text.encode())), expected)
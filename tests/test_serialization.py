@@ -0,0 +1,92 @@
+import contextlib
+import io
+import os
+import unittest
+
+from abstract_tree import FuncDeclaration, Program
+from benchmarks.programs import generate_program
+from checker import Checker
+from lazy_parser import LazyParser
+from parser import Parser
+from stack_parser import StackParser
+from serialization import FORMAT_VERSION, MAGIC, dump, load
+from tests.test_regex_scanner import EXAMPLES
+from tests.test_stack_parser import differences
+
+
+def parse(text, parser_class=Parser, scanner='regex'):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_class.from_string(text, scanner).parse_program()
+
+
+class TestSerialization(unittest.TestCase):
+    def assertRoundTrip(self, program):
+        self.assertEqual(list(differences(load(dump(program)), program)), [])
+
+    def test_example_files(self):
+        for name in sorted(os.listdir(EXAMPLES)):
+            with open(os.path.join(EXAMPLES, name)) as f:
+                text = f.read()
+            try:
+                program = parse(text)
+            except Exception:
+                continue
+            with self.subTest(name):
+                self.assertRoundTrip(program)
+
+    def test_generated_program(self):
+        self.assertRoundTrip(parse(generate_program(50000)))
+
+    def test_missing_parts_and_spellings(self):
+        program = parse('int a;\nint b ~ -a;\nfunc f():\n    return b\nend\n'
+                        'if (a):\n    b ~ f();\nend\nwhile (a):\n    a ~ a - 1;\nend\n')
+
+        self.assertRoundTrip(program)
+        self.assertIsNone(load(dump(program)).command_list.commands[1].statement.else_com)
+
+    def test_nodes_without_span(self):
+        program = Program(None)
+
+        self.assertRoundTrip(program)
+        self.assertIsNone(load(dump(program)).start)
+
+    def test_deep_nesting(self):
+        text = 'int a ~ ' + '-' * 20000 + '1;\n'
+
+        self.assertRoundTrip(parse(text, StackParser, 'stream'))
+
+    def test_non_ascii_spelling(self):
+        program = parse('int a;\n')
+        program.command_list.commands[0].declaration_list.declarations[0].identifier.spelling = 'ä€'
+
+        self.assertRoundTrip(program)
+
+    def test_lazy_declarations_are_stored_parsed(self):
+        text = 'int a;\nfunc f(a):\n    return a\nend\n'
+        program = load(dump(parse(text, LazyParser, 'stream')))
+
+        declaration = program.command_list.commands[0].declaration_list.declarations[1]
+        self.assertIs(type(declaration), FuncDeclaration)
+        self.assertEqual(list(differences(program, parse(text))), [])
+
+    def test_annotations_are_not_stored(self):
+        program = parse('int a ~ 1;\na ~ a + 1;\n')
+        Checker().check(program)
+        loaded = load(dump(program))
+
+        expression = loaded.command_list.commands[1].statement.expressions
+        self.assertIsNone(expression.expression1.symbol)
+        Checker().check(loaded)
+        self.assertIsNotNone(expression.expression1.symbol)
+
+    def test_rejects_other_data(self):
+        data = dump(parse('int a;\n'))
+
+        for bad in (b'', b'not a tree', MAGIC + bytes([FORMAT_VERSION + 1]) + data[5:],
+                    data[:-3], data[:5] + bytes(reversed(data[5:]))):
+            with self.subTest(bad=bad[:8]), self.assertRaises(ValueError):
+                load(bad)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import contextlib
+import io
+import os
+import random
+import sys
+import unittest
+import unittest.mock
+
+from abstract_tree import AbstractSyntaxTree, IfStatement, UnaryExpression, CallExpression
+from abstract_tree.abstract_syntax_tree import attribute_names
+from benchmarks.programs import generate_program
+from exceptions import UnexpectedTokenException, UnsupportedExpressionTokenException
+from parser import Parser
+from stack_parser import StackParser
+from tests.test_regex_scanner import EXAMPLES
+
+
+def parse(parser_class, text, method='parse_program'):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return getattr(parser_class.from_string(text, 'stream'), method)()
+
+
+def differences(tree, other):
+    """
+    Yields a description of every difference between two trees, comparing
+    node classes, spans and attributes without recursion. Paths are kept
+    as links to the path of the parent and only spelled out when yielded,
+    so deep trees take linear memory.
+    """
+    pending = [(tree, other, ('tree', None))]
+    while pending:
+        a, b, path = pending.pop()
+        if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+            pending.extend((x, y, (f'[{i}]', path)) for i, (x, y) in enumerate(zip(a, b)))
+        elif isinstance(a, AbstractSyntaxTree) and type(a) is type(b):
+            if (a.start, a.end) != (b.start, b.end):
+                yield _spelled(path)
+            pending.extend((getattr(a, name), getattr(b, name), (f'.{name}', path))
+                           for name in attribute_names(type(a)) if name not in ('start', 'end'))
+        elif a != b:
+            yield _spelled(path)
+
+
+def _spelled(path):
+    parts = []
+    while path is not None:
+        part, path = path
+        parts.append(part)
+    return ''.join(reversed(parts))
+
+
+def nested_ifs(depth):
+    return 'int a ~ 1;\n' + 'if (a):\n' * depth + 'a ~ a - 1;\n' + 'end\n' * depth
+
+
+class TestStackParser(unittest.TestCase):
+    def assertSameTree(self, text, method='parse_program'):
+        self.assertEqual(list(differences(parse(StackParser, text, method), parse(Parser, text, method))), [])
+
+    def test_example_files_give_same_tree(self):
+        for name in sorted(os.listdir(EXAMPLES)):
+            with open(os.path.join(EXAMPLES, name)) as f:
+                text = f.read()
+            try:
+                self.assertSameTree(text)
+            except UnexpectedTokenException:
+                with self.assertRaises(UnexpectedTokenException):
+                    parse(Parser, text)
+
+    def test_generated_program_gives_same_tree(self):
+        self.assertSameTree(generate_program(20000))
+
+    def test_random_expressions_give_same_tree(self):
+        atoms = ['a', 'b', '1', 'true', '-', '*', 'f(a, 1)', 'g()', '~', '+', '/', 'c ~']
+        rng = random.Random(10)
+        for _ in range(500):
+            text = ' '.join(rng.choice(atoms) for _ in range(rng.randint(1, 9)))
+            try:
+                expected = parse(Parser, text, 'parse_expression_list_assign_operator')
+            except Exception as error:
+                with self.assertRaises(type(error)):
+                    parse(StackParser, text, 'parse_expression_list_assign_operator')
+            else:
+                actual = parse(StackParser, text, 'parse_expression_list_assign_operator')
+                self.assertEqual(list(differences(actual, expected)), [], text)
+
+    def test_deeply_nested_statements(self):
+        depth = sys.getrecursionlimit() * 2
+        program = parse(StackParser, nested_ifs(depth))
+
+        statement = program.command_list.commands[1].statement
+        for _ in range(depth - 1):
+            self.assertTrue(isinstance(statement, IfStatement))
+            statement = statement.if_com.commands[0].statement
+        self.assertEqual(statement.if_com.commands[0].statement.expressions.operator.spelling, '~')
+
+    def test_long_unary_chain(self):
+        depth = sys.getrecursionlimit() * 2
+        expression = parse(StackParser, '- ' * depth + 'x', 'parse_single_expression')
+
+        for i in range(depth):
+            self.assertTrue(isinstance(expression, UnaryExpression))
+            self.assertEqual((expression.start, expression.end), (2 * i, 2 * depth + 1))
+            expression = expression.expression
+        self.assertEqual(expression.name.spelling, 'x')
+
+    def test_deeply_nested_calls(self):
+        depth = sys.getrecursionlimit() * 2
+        expression = parse(StackParser, 'f(' * depth + '1' + ')' * depth, 'parse_single_expression')
+
+        for _ in range(depth):
+            self.assertTrue(isinstance(expression, CallExpression))
+            expression = expression.args.expressions[0]
+
+    def test_errors_are_raised(self):
+        with self.assertRaises(UnsupportedExpressionTokenException):
+            parse(StackParser, 'if (a): a ~ ; end')
+        with self.assertRaises(UnexpectedTokenException):
+            parse(StackParser, 'while (a): a ~ 1;')
+
+
+    def test_reports_success_only_when_verbose(self):
+        for verbose, expected in ((True, 'Successfully parsed the program.\n'), (False, '')):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output), unittest.mock.patch.object(Parser, 'verbose', verbose):
+                StackParser.from_string('int a;\n', 'stream').parse_program()
+            self.assertEqual(output.getvalue(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
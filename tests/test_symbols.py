@@ -0,0 +1,73 @@
+import contextlib
+import io
+import unittest
+
+from abstract_tree import ArgumentsList, CommandList, FuncDeclaration, Identifier, TypeIndicator, VarDeclaration
+from checker import Checker
+from encoder import Encoder
+from parser import Parser
+from symbols import FUNCTION, NO_TYPE, TYPES, UNALLOCATED, VARIABLE, SymbolTable
+
+
+def parse(text):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Parser.from_string(text, 'regex').parse_program()
+
+
+class TestSymbolTable(unittest.TestCase):
+    def test_add_and_allocate(self):
+        symbols = SymbolTable()
+        a = VarDeclaration(TypeIndicator('int'), Identifier('a'))
+        b = VarDeclaration(TypeIndicator('bool'), Identifier('b'))
+        f = FuncDeclaration(Identifier('f'), ArgumentsList(), CommandList())
+
+        self.assertEqual([symbols.add(d) for d in (a, b, f)], [0, 1, 2])
+        self.assertEqual(len(symbols), 3)
+        self.assertEqual(symbols.declarations, [a, b, f])
+        self.assertEqual(list(symbols.kinds), [VARIABLE, VARIABLE, FUNCTION])
+        self.assertEqual(list(symbols.types), [TYPES['int'], TYPES['bool'], NO_TYPE])
+        self.assertEqual(list(symbols.sizes), [1, 1, 0])
+        self.assertEqual(list(symbols.levels), [UNALLOCATED] * 3)
+
+        symbols.allocate(1, 2, 5)
+        self.assertEqual((symbols.levels[1], symbols.displacements[1]), (2, 5))
+        self.assertEqual(symbols.levels[0], UNALLOCATED)
+
+
+class TestSymbols(unittest.TestCase):
+    text = 'int a ~ 1;\nbool b;\nfunc f(1):\n    int a ~ 2;\n    a ~ a - 1;\n    return a\nend\nb ~ f(a);\n'
+
+    def test_checker_gives_symbols(self):
+        program = parse(self.text)
+        checker = Checker()
+        checker.check(program)
+
+        self.assertIs(program.symbols, checker.symbols)
+        self.assertEqual([d.identifier.spelling for d in program.symbols.declarations], ['a', 'b', 'f', 'a'])
+        for i, declaration in enumerate(program.symbols.declarations):
+            self.assertEqual(declaration.symbol, i)
+
+        function = program.command_list.commands[0].declaration_list.declarations[2]
+        inner = function.commands.commands[1].statement.expressions
+        self.assertEqual((inner.expression1.symbol, inner.expression2.expression1.symbol), (3, 3))
+        outer = program.command_list.commands[1].statement.expressions
+        self.assertEqual((outer.expression1.symbol, outer.expression2.symbol), (1, 2))
+        self.assertEqual(outer.expression2.args.expressions[0].symbol, 0)
+        self.assertEqual(program.symbols.kinds[outer.expression2.symbol], FUNCTION)
+
+    def test_encoder_allocates_symbols(self):
+        program = parse(self.text)
+        Checker().check(program)
+        encoder = Encoder()
+        with contextlib.redirect_stdout(io.StringIO()):
+            encoder.encode(program)
+
+        symbols = program.symbols
+        self.assertIs(encoder.symbols, symbols)
+        for declaration in symbols.declarations:
+            self.assertEqual(symbols.levels[declaration.symbol], declaration.address.level)
+            self.assertEqual(symbols.displacements[declaration.symbol], declaration.address.displacement)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.programs import generate_expressions, generate_program
+from exceptions import UnexpectedTokenException, UnsupportedExpressionTokenException, UnexpectedEndOfProgramException
+from parser import Parser
+from table_parser import GRAMMAR, TableParser, load_tables, generate_tables
+from tests.test_regex_scanner import EXAMPLES
+from tests.test_stack_parser import differences
+
+
+def parse(parser_class, text, scanner='stream'):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_class.from_string(text, scanner).parse_program()
+
+
+class TestTableParser(unittest.TestCase):
+    def assertSameTree(self, text):
+        self.assertEqual(list(differences(parse(TableParser, text), parse(Parser, text))), [])
+
+    def test_example_files_give_same_tree(self):
+        for name in sorted(os.listdir(EXAMPLES)):
+            with open(os.path.join(EXAMPLES, name)) as f:
+                text = f.read()
+            try:
+                self.assertSameTree(text)
+            except UnexpectedTokenException:
+                with self.assertRaises(UnexpectedTokenException):
+                    parse(Parser, text)
+
+    def test_generated_programs_give_same_tree(self):
+        self.assertSameTree(generate_program(20000))
+        self.assertSameTree(generate_expressions(5000))
+
+    def test_random_programs_give_same_tree(self):
+        atoms = ['a', 'b', '1', 'true', '-', '*', 'f(a, 1)', 'g()', '~', '+', '/', 'c ~', '==', ';',
+                 'if (a):', 'end', 'else:', 'int a', 'func h(a):', 'return', 'while (b):', '(', ')', ',']
+        rng = random.Random(3)
+        for _ in range(2000):
+            text = ' '.join(rng.choice(atoms) for _ in range(rng.randint(1, 12)))
+            try:
+                expected = parse(Parser, text)
+            except Exception as error:
+                with self.assertRaises(Exception) as raised:
+                    parse(TableParser, text)
+                self.assertEqual(getattr(raised.exception, 'line', None), getattr(error, 'line', None), text)
+                self.assertEqual(getattr(raised.exception, 'column', None), getattr(error, 'column', None), text)
+            else:
+                self.assertEqual(list(differences(parse(TableParser, text), expected)), [], text)
+
+    def test_bytes(self):
+        text = generate_program(2000)
+        with contextlib.redirect_stdout(io.StringIO()):
+            program = TableParser.from_bytes(text.encode()).parse_program()
+
+        self.assertEqual(list(differences(program, parse(Parser, text))), [])
+
+    def test_other_scanners(self):
+        text = generate_program(2000)
+
+        self.assertEqual(list(differences(parse(TableParser, text, 'regex'), parse(Parser, text))), [])
+
+    def test_errors(self):
+        with self.assertRaises(UnsupportedExpressionTokenException) as error:
+            parse(TableParser, 'int a ~ 1;\na ~ ;')
+        self.assertEqual((error.exception.line, error.exception.column), (2, 5))
+
+        with self.assertRaises(UnexpectedTokenException) as error:
+            parse(TableParser, 'if (a:\nend')
+        self.assertEqual((error.exception.line, error.exception.column), (1, 6))
+
+        with self.assertRaises(UnexpectedEndOfProgramException):
+            parse(TableParser, 'int a;\nend')
+
+
+class TestLoadTables(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.grammar = os.path.join(self.directory, 'grammar.txt')
+        shutil.copy(GRAMMAR, self.grammar)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_tables_are_cached(self):
+        tables = load_tables(self.grammar)
+        cached = os.listdir(os.path.join(self.directory, '__pycache__'))
+        load_tables.cache_clear()
+
+        self.assertEqual(len(cached), 1)
+        self.assertEqual(load_tables(self.grammar), tables)
+        with open(GRAMMAR) as f:
+            self.assertEqual(tables, generate_tables(f.read()))
+
+    def test_changed_grammar_is_generated_again(self):
+        load_tables(self.grammar)
+        with open(self.grammar, 'a') as f:
+            f.write('Unused ::= IDENTIFIER\n')
+        load_tables.cache_clear()
+        tables = load_tables(self.grammar)
+
+        self.assertIn('Unused', tables['nonterminals'])
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, '__pycache__'))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
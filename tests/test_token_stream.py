@@ -0,0 +1,157 @@
+import random
+import unittest
+from unittest.mock import patch, mock_open
+
+from exceptions import NonAsciiSourceException
+from parser import Parser
+from scanner import Scanner
+from tests.test_regex_scanner import CORPUS, scan_all, scan_text
+from token_stream import TokenStream, TokenCursor
+from tokens import Kind
+
+
+class TestTokenStream(unittest.TestCase):
+    def test_corpus_matches_scanner(self):
+        for text in CORPUS:
+            stream = TokenStream.from_buffer(text)
+            tokens = [(stream.kind(i), stream.spelling(i)) for i in range(len(stream))]
+
+            self.assertEqual(tokens, scan_text(Scanner, text), repr(text))
+
+    def test_offsets(self):
+        stream = TokenStream.from_buffer('ab ~ 12; # c\nx')
+
+        self.assertEqual(list(stream.starts), [0, 3, 5, 7, 13, 14])
+        self.assertEqual(list(stream.ends), [2, 4, 7, 8, 14, 14])
+
+    def test_identifier_spellings_are_interned(self):
+        stream = TokenStream.from_buffer('counter ~ counter + 1;')
+
+        self.assertIs(stream.spelling(0), stream.spelling(2))
+
+    def test_last_token_is_eot(self):
+        stream = TokenStream.from_buffer('a b')
+
+        self.assertEqual(len(stream), 3)
+        self.assertEqual(stream.kind(2), Kind.EOT)
+
+
+class TestTokenStreamEdit(unittest.TestCase):
+    def assertSameAsRescan(self, text, offset, deleted, inserted):
+        edited = TokenStream.from_buffer(text).edit(offset, deleted, inserted)
+        expected = TokenStream.from_buffer(text[:offset] + inserted + text[offset + deleted:])
+
+        self.assertEqual(edited.buffer, expected.buffer)
+        self.assertEqual(list(edited.kinds), list(expected.kinds), (text, offset, deleted, inserted))
+        self.assertEqual(list(edited.starts), list(expected.starts))
+        self.assertEqual(list(edited.ends), list(expected.ends))
+
+    def test_edit_inside_a_token(self):
+        self.assertSameAsRescan('int abc ~ 1; b ~ abc;', 5, 1, 'xyz')
+
+    def test_edit_extends_the_token_before(self):
+        self.assertSameAsRescan('a = b', 3, 0, '=')
+        self.assertSameAsRescan('ab ~ 1;', 2, 0, 'cd')
+
+    def test_edit_opens_and_closes_comments(self):
+        self.assertSameAsRescan('a ~ 1;\nb ~ 2;\nc ~ 3;', 2, 0, '#')
+        self.assertSameAsRescan('a ~ 1; # b ~ 2;\nc ~ 3;', 9, 0, '\n')
+        self.assertSameAsRescan('a ~ 1; # b ~ 2;\nc ~ 3;', 7, 1, '')
+
+    def test_edit_at_the_ends(self):
+        self.assertSameAsRescan('a ~ 1;', 0, 0, 'int ')
+        self.assertSameAsRescan('a ~ 1;', 6, 0, ' b')
+        self.assertSameAsRescan('a ~ 1;', 0, 6, '')
+        self.assertSameAsRescan('', 0, 0, 'x')
+
+    def test_edit_bytes(self):
+        self.assertSameAsRescan(b'a ~ 1; # c\rd', 12, 1, b'ee')
+
+    def test_random_edits_match_rescan(self):
+        alphabet = 'ab1 2\n\t#=~+-*/;():",_\xe9'
+        rng = random.Random(8)
+        for _ in range(500):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            offset = rng.randint(0, len(text))
+            deleted = rng.randint(0, len(text) - offset)
+            inserted = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 5)))
+            self.assertSameAsRescan(text, offset, deleted, inserted)
+
+    def test_edits_of_edited_streams_match_rescan(self):
+        alphabet = 'ab1 2\n#~+;()'
+        rng = random.Random(4)
+        text = 'int a ~ 1;\nb ~ a + 2; # c\nfunc f(x): return x end\n' * 4
+        stream = TokenStream.from_buffer(text)
+        for _ in range(200):
+            offset = rng.randint(0, len(text))
+            deleted = rng.randint(0, min(3, len(text) - offset))
+            inserted = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 4)))
+            with patch.multiple(TokenStream, MAX_PIECES=8, MAX_RUNS=8, WINDOW=2):
+                stream = stream.edit(offset, deleted, inserted)
+            text = text[:offset] + inserted + text[offset + deleted:]
+            expected = TokenStream.from_buffer(text)
+
+            self.assertEqual([(stream.kind(i), stream.spelling(i), stream.start(i), stream.end(i))
+                              for i in range(len(stream))],
+                             [(expected.kind(i), expected.spelling(i), expected.start(i), expected.end(i))
+                              for i in range(len(expected))])
+            self.assertEqual(stream.text(0, len(text)), text)
+        self.assertEqual(list(stream.starts), list(expected.starts))
+        self.assertEqual(list(stream.ends), list(expected.ends))
+
+    def test_edit_keeps_the_old_stream(self):
+        stream = TokenStream.from_buffer('a ~ 1;')
+        stream.edit(0, 1, 'bb')
+
+        self.assertEqual(stream.spelling(0), 'a')
+        self.assertEqual(list(stream.ends), [1, 3, 5, 6, 6])
+
+    def test_edit_reports_non_ascii_bytes_where_they_are(self):
+        stream = TokenStream.from_bytes(b'a ~ 1;\nb ~ 2;\n' * 40)
+
+        with self.assertRaises(NonAsciiSourceException) as raised:
+            stream.edit(300, 0, b'x\xe9')
+        self.assertEqual((raised.exception.offset, raised.exception.line), (301, 43))
+
+
+class TestTokenCursor(unittest.TestCase):
+    def test_scan_matches_scanner(self):
+        text = 'func f(a):\n    int b ~ a * 2; # twice\nend'
+        cursor = TokenStream.from_buffer(text).cursor()
+
+        self.assertEqual(scan_all(cursor), scan_text(Scanner, text))
+
+    def test_scan_returns_eot_after_the_end(self):
+        cursor = TokenStream.from_buffer('a').cursor()
+        cursor.scan()
+
+        self.assertEqual(cursor.scan().kind, Kind.EOT)
+        self.assertEqual(cursor.scan().kind, Kind.EOT)
+
+    def test_peek_kind(self):
+        cursor = TokenStream.from_buffer('if (a): end').cursor()
+        cursor.scan()
+
+        self.assertEqual(cursor.peek_kind(), Kind.LEFT_PAR)
+        self.assertEqual(cursor.peek_kind(3), Kind.COLON)
+        self.assertEqual(cursor.peek_kind(10), Kind.EOT)
+        self.assertEqual(cursor.scan().kind, Kind.LEFT_PAR)
+
+    def test_cursors_reread_the_same_tokens(self):
+        stream = TokenStream.from_buffer('int a ~ 1;')
+
+        self.assertEqual(scan_all(stream.cursor()), scan_all(stream.cursor()))
+        self.assertEqual(stream.cursor(3).scan().spelling, '1')
+
+    def test_parser_from_file_with_token_stream(self):
+        with patch('builtins.open', mock_open(read_data='int a ~ 1; a ~ a + 1;')):
+            p = Parser.from_file('file', scanner='stream')
+
+            self.assertTrue(isinstance(p.scanner, TokenCursor))
+            program = p.parse_program()
+            self.assertEqual(len(program.command_list.commands), 2)
+            self.assertEqual(p.current_terminal.kind, Kind.EOT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,15 @@
 import unittest
-from tokens import Token, Kind, ASSIGNOPS
+from tokens import Token, Kind, ASSIGNOPS, ADDOPS, MULOPS, BINARY_PRECEDENCE
 
 
 class TestTokens(unittest.TestCase):
+    def test_binary_precedence_levels(self):
+        self.assertEqual(set(BINARY_PRECEDENCE), set(ASSIGNOPS + ADDOPS + MULOPS))
+        self.assertLess(BINARY_PRECEDENCE['~'], BINARY_PRECEDENCE['+'])
+        self.assertEqual(BINARY_PRECEDENCE['+'], BINARY_PRECEDENCE['-'])
+        self.assertLess(BINARY_PRECEDENCE['-'], BINARY_PRECEDENCE['*'])
+        self.assertEqual(BINARY_PRECEDENCE['*'], BINARY_PRECEDENCE['/'])
+
     def test_init(self):
         token = Token(Kind.IDENTIFIER, '')
 
@@ -0,0 +1,122 @@
+import contextlib
+import io
+import sys
+import unittest
+
+from abstract_tree import BinaryExpression, Identifier, IntLiteralExpression, IntegerLiteral, Operator, \
+    UnaryExpression, VarExpression
+from abstract_tree.traversal import Traversal
+from checker import Checker
+from encoder import Encoder
+from exceptions import UndeclaredVariableException
+from parser import Parser
+from stack_parser import StackParser
+
+
+def parse(text, parser_class=Parser):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_class.from_string(text, 'regex').parse_program()
+
+
+def chain(depth):
+    return ' + '.join(['a'] * depth)
+
+
+class Evaluator(Traversal):
+    """
+    Evaluates expressions over integer literals, with the variables given
+    as arguments.
+    """
+
+    def __init__(self):
+        self.finished = []
+
+    def visit_binary_expression(self, be, variables):
+        left = yield be.expression1, variables
+        right = yield be.expression2, variables
+        return {'+': left + right, '-': left - right, '*': left * right}[be.operator.spelling]
+
+    def visit_unary_expression(self, ue, variables):
+        try:
+            value = yield ue.expression, variables
+        finally:
+            self.finished.append(ue)
+        return -value if ue.operator.spelling == '-' else value
+
+    def visit_int_literal_expression(self, ie, variables):
+        return int(ie.literal.spelling)
+
+    def visit_var_expression(self, ve, variables):
+        return variables[ve.name.spelling]
+
+
+class Recovering(Evaluator):
+    """
+    Counts an unknown variable under a unary expression as 0.
+    """
+
+    def visit_unary_expression(self, ue, variables):
+        try:
+            value = yield ue.expression, variables
+        except KeyError:
+            value = 0
+        return -value
+
+
+class TestTraversal(unittest.TestCase):
+    def test_results_and_arguments(self):
+        expression = BinaryExpression(Operator('*'), UnaryExpression(Operator('-'), VarExpression(Identifier('a'))),
+                                      BinaryExpression(Operator('+'), IntLiteralExpression(IntegerLiteral('2')),
+                                                       VarExpression(Identifier('b'))))
+        self.assertEqual(Evaluator().traverse(expression, {'a': 3, 'b': 4}), -18)
+        # Generator visit methods run the traversal from their node
+        self.assertEqual(Evaluator().visit_binary_expression(expression, {'a': 3, 'b': 4}), -18)
+        self.assertEqual(expression.visit(Evaluator(), {'a': 1, 'b': 1}), -3)
+        self.assertEqual(Evaluator().traverse(IntLiteralExpression(IntegerLiteral('7')), {}), 7)
+
+    def test_deep_trees(self):
+        expression = IntLiteralExpression(IntegerLiteral('1'))
+        for _ in range(sys.getrecursionlimit() * 20):
+            expression = UnaryExpression(Operator('-'), expression)
+        self.assertEqual(Evaluator().traverse(expression, {}), 1)
+
+        expression = VarExpression(Identifier('a'))
+        for _ in range(sys.getrecursionlimit() * 20):
+            expression = BinaryExpression(Operator('+'), expression, IntLiteralExpression(IntegerLiteral('1')))
+        self.assertEqual(Evaluator().traverse(expression, {'a': 1}), sys.getrecursionlimit() * 20 + 1)
+
+    def test_exceptions(self):
+        expression = BinaryExpression(Operator('+'), IntLiteralExpression(IntegerLiteral('1')),
+                                      UnaryExpression(Operator('-'), UnaryExpression(Operator('-'),
+                                                                                     VarExpression(Identifier('a')))))
+        evaluator = Evaluator()
+        with self.assertRaises(KeyError):
+            evaluator.traverse(expression, {})
+        # The finally blocks of the waiting visits ran, innermost first
+        self.assertEqual(evaluator.finished, [expression.expression2.expression, expression.expression2])
+
+        recovering = Recovering()
+        self.assertEqual(recovering.traverse(expression, {}), 1)
+        # The traversal goes on after an exception it recovered from
+        self.assertEqual(recovering.traverse(expression, {'a': 2}), 3)
+
+    def test_deep_checker_and_encoder(self):
+        depth = sys.getrecursionlimit() * 10
+        # The value of the chain is not needed, so no code is emitted for it
+        program = parse(f'int a ~ 1;\nif (a):\n    {chain(depth)};\nelse:\n    a ~ 0;\nend\n')
+        Checker().check(program)
+        encoder = Encoder()
+        with contextlib.redirect_stdout(io.StringIO()):
+            encoder.encode(program)
+        self.assertEqual(encoder.next_address, 8)
+
+        program = parse(f'int a ~ 1;\n{chain(depth)} + b;\n')
+        with self.assertRaises(UndeclaredVariableException):
+            Checker().check(program)
+
+        nested = parse('int a ~ 1;\n' + 'while (a):\n' * depth + 'a ~ a - 1;\n' + 'end\n' * depth, StackParser)
+        Checker().check(nested)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import contextlib
+import io
+import unittest
+
+from abstract_tree import AbstractExpression, BooleanLiteral, BooleanLiteralExpression
+from abstract_tree.walker import walk
+from checker import Checker
+from exceptions import InvalidTypeException
+from parser import Parser
+from symbols import BOOL, INT
+from typer import Typer
+
+
+def typed(text):
+    with contextlib.redirect_stdout(io.StringIO()):
+        program = Parser.from_string(text, 'regex').parse_program()
+    Checker().check(program)
+    Typer().infer(program)
+    return program
+
+
+def types(program):
+    return [node.type for node in walk(program) if isinstance(node, AbstractExpression)]
+
+
+class TestTyper(unittest.TestCase):
+    def test_every_expression_is_typed(self):
+        program = typed('int a ~ 1;\nbool b ~ true;\na ~ -a * 2 + a;\nb ~ false;\n')
+        commands = program.command_list.commands
+
+        self.assertEqual(types(commands[0]), [INT, BOOL])
+        # a ~ -a * 2 + a in preorder: the assignment, a, the sum, the
+        # product, the negation, a, 2 and a
+        self.assertEqual(types(commands[1]), [INT] * 8)
+        self.assertEqual(types(commands[2]), [BOOL] * 3)
+
+    def test_functions_have_the_type_of_their_return_values(self):
+        program = typed('bool b;\nint a;\nfunc f(1):\n    return b\nend\nfunc g(1):\n    return f(a)\nend\n'
+                        'b ~ g(1);\n')
+
+        symbols = program.symbols
+        f, g = program.command_list.commands[0].declaration_list.declarations[2:]
+        self.assertEqual((symbols.types[f.symbol], symbols.types[g.symbol]), (BOOL, BOOL))
+        # b ~ g(1)
+        self.assertEqual(types(program.command_list.commands[1]), [BOOL, BOOL, BOOL, INT])
+
+    def test_initial_values_are_typed(self):
+        program = typed('int a ~ 1;\nint b ~ a + 2;\n')
+
+        self.assertEqual(types(program), [INT, INT, INT, INT])
+
+    def test_mismatches_are_raised(self):
+        for text in ('int a ~ true;\n', 'int a;\na ~ false;\n', 'bool b;\nint a;\na ~ 1 + b;\n',
+                     'bool b;\nb ~ -true;\n', 'int a ~ 1;\nbool b ~ a;\n',
+                     'func f(1):\n    return 1\n    return true\nend\n'):
+            with self.subTest(text):
+                with self.assertRaises(InvalidTypeException):
+                    typed(text)
+
+    def test_str_is_not_supported(self):
+        with self.assertRaisesRegex(InvalidTypeException, 'str'):
+            typed('str s;\n')
+
+    def test_return_types_are_inferred_again(self):
+        program = typed('func f(1):\n    return 1\nend\n')
+        f = program.command_list.commands[0].declaration_list.declarations[0]
+        f.commands.commands[0].statement.expression = BooleanLiteralExpression(BooleanLiteral('true'))
+        Typer().infer(program)
+
+        self.assertEqual(program.symbols.types[f.symbol], BOOL)
+
+
+if __name__ == '__main__':
+    unittest.main()
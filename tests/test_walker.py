@@ -0,0 +1,155 @@
+import contextlib
+import io
+import os
+import unittest
+
+from abstract_tree import BinaryExpression, FuncDeclaration, Identifier, IntLiteralExpression, IntegerLiteral, \
+    LazyFuncDeclaration, Operator, Program, UnaryExpression, VarExpression
+from abstract_tree.visitor import Visitor
+from abstract_tree.walker import DispatchTable, Walker, dispatch_table, iter_children, node_classes, visit_name, \
+    walk
+from ast_arena import AstArena
+from checker import Checker
+from lazy_parser import LazyParser
+from parser import Parser
+from tests.test_regex_scanner import EXAMPLES
+
+PROGRAM = os.path.join(EXAMPLES, 'prog1.txt')
+
+
+def parse(text, parser_class=Parser):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_class.from_string(text, 'regex').parse_program()
+
+
+def recursive_walk(node):
+    yield node
+    for name in node.children:
+        child = getattr(node, name)
+        for item in child if isinstance(child, list) else [child]:
+            if item is not None:
+                yield from recursive_walk(item)
+
+
+class NameVisitor(Visitor):
+    """
+    Returns the name of the visitor method called for a node.
+    """
+    pass
+
+
+for _name in Visitor.__abstractmethods__:
+    setattr(NameVisitor, _name, lambda self, node, *args, _name=_name: _name)
+NameVisitor.__abstractmethods__ = frozenset()
+
+
+class Identifiers(Walker):
+    def __init__(self):
+        self.names = []
+
+    def visit_identifier(self, i, *args):
+        self.names.append(i.spelling)
+
+
+class Functions(Walker):
+    """
+    Counts the calls in every function, without looking into the functions.
+    """
+
+    def __init__(self):
+        self.calls = {}
+
+    def visit_func_declaration(self, fd, *args):
+        self.calls[fd.identifier.spelling] = 0
+        self.generic_visit(fd, fd.identifier.spelling)
+
+    def visit_call_expression(self, ce, function=None):
+        if function is not None:
+            self.calls[function] += 1
+        self.generic_visit(ce, function)
+
+
+class TestWalker(unittest.TestCase):
+    def setUp(self):
+        with open(PROGRAM) as f:
+            self.text = f.read()
+
+    def test_visit_names(self):
+        self.assertEqual(visit_name(BinaryExpression), 'visit_binary_expression')
+        self.assertEqual(visit_name(Program), 'visit_program')
+        self.assertEqual({visit_name(cls) for cls in node_classes()} - {'visit_lazy_func_declaration'},
+                         set(Visitor.__abstractmethods__))
+
+    def test_dispatch_table(self):
+        table = dispatch_table(NameVisitor)
+        visitor = NameVisitor()
+        self.assertIs(table, dispatch_table(NameVisitor))
+        self.assertIs(table[BinaryExpression], NameVisitor.visit_binary_expression)
+        self.assertIs(table[LazyFuncDeclaration], NameVisitor.visit_func_declaration)
+        for node in walk(parse(self.text)):
+            self.assertEqual(table[type(node)](visitor, node), node.visit(visitor))
+
+    def test_default(self):
+        class Partial:
+            def visit_identifier(self, i, *args):
+                return 'identifier'
+
+        table = DispatchTable(Partial, default=lambda visitor, node, *args: 'default')
+        self.assertEqual(table[Identifier](Partial(), Identifier('a')), 'identifier')
+        self.assertEqual(table[Operator](Partial(), Operator('+')), 'default')
+
+        class Unknown:
+            pass
+
+        self.assertEqual(DispatchTable(NameVisitor)[Unknown](NameVisitor(), Identifier('a')), 'visit_identifier')
+
+    def test_iter_children(self):
+        expression = BinaryExpression(Operator('+'), IntLiteralExpression(IntegerLiteral('1')),
+                                      UnaryExpression(Operator('-'), VarExpression(Identifier('a'))))
+        self.assertEqual([type(child) for child in iter_children(expression)],
+                         [IntLiteralExpression, Operator, UnaryExpression])
+        self.assertEqual(list(iter_children(Identifier('a'))), [])
+
+    def test_walk(self):
+        program = parse(self.text)
+        self.assertEqual([id(node) for node in walk(program)], [id(node) for node in recursive_walk(program)])
+
+        deep = VarExpression(Identifier('a'))
+        for _ in range(10000):
+            deep = UnaryExpression(Operator('-'), deep)
+        self.assertEqual(sum(1 for _ in walk(deep)), 20002)
+
+    def test_walker(self):
+        identifiers = Identifiers()
+        identifiers.visit(parse('int a ~ 1;\nfunc f(b):\n    b ~ b + a;\n    return b\nend\nf(a);\n'))
+        self.assertEqual(identifiers.names, ['a', 'f', 'b', 'b', 'b', 'a', 'b', 'f', 'a'])
+
+        text = 'func f(a):\n    return g(a)\nend\nfunc g(a):\n    return a\nend\nf(g(1));\n'
+        for parser_class in (Parser, LazyParser):
+            with self.subTest(parser_class.__name__):
+                functions = Functions()
+                functions.visit(parse(text, parser_class))
+                self.assertEqual(functions.calls, {'f': 1, 'g': 0})
+
+    def test_arena_views(self):
+        arena = AstArena()
+        program = parse(self.text)
+        view = arena.view(arena.add(program))
+        identifiers, expected = Identifiers(), Identifiers()
+        identifiers.visit(view)
+        expected.visit(program)
+        self.assertEqual(identifiers.names, expected.names)
+        self.assertTrue(identifiers.names)
+
+        table = dispatch_table(NameVisitor)
+        self.assertEqual([table[type(node)](NameVisitor(), node) for node in walk(view)],
+                         [visit_name(type(node)) for node in walk(program)])
+
+    def test_checker_table(self):
+        table = dispatch_table(Checker)
+        self.assertIs(table[FuncDeclaration], Checker.visit_func_declaration)
+        self.assertTrue(all(table[cls] is not None for cls in node_classes()))
+
+
+if __name__ == '__main__':
+    unittest.main()
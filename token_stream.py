@@ -0,0 +1,443 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple, Union
+
+from line_index import LineIndex
+from regex_scanner import tokenize
+from exceptions import NonAsciiSourceException
+from scanner import SourceFile, non_ascii_error
+from tokens import Kind, Token, KINDS, KIND_CODES
+
+Buffer = Union[str, bytes]
+
+
+class TokenStream:
+    """
+    All tokens of a source program, kept in parallel arrays: a byte with the
+    kind code of every token (see tokens.KIND_CODES), and its start and end
+    offsets in the source buffer. Spellings are sliced from the buffer only
+    when they are asked for. The last token is always EOT.
+
+    A stream returned by edit() holds no arrays of its own but pieces: runs
+    of the tokens of other streams, shifted by a difference, and runs of
+    the text they were scanned from. An edit cuts the pieces at its place
+    and adds one for the tokens and the text scanned again, so it costs the
+    same in a source of any size. kind(), start(), end(), token()
+    and text() look the pieces up. `buffer`, `kinds`, `starts` and `ends`
+    copy them into arrays the first time they are read, for passes which
+    read every token, and so does an edit past MAX_PIECES of them.
+
+    Those arrays keep the offsets of the tokens copied as they were, with
+    the difference to add kept for each run of them; past MAX_RUNS runs, or
+    when `starts` or `ends` are read, the differences are applied.
+
+    Args:
+        buffer: the source text (or the bytes of a mapped file)
+        kinds: kind code of every token
+        starts: offset of the first character of every token
+        ends: offset after the last character of every token
+    """
+
+    MAX_PIECES = 512
+    MAX_RUNS = 256
+    # Characters after an edit scanned at first; more when tokens reach its end
+    WINDOW = 256
+
+    def __init__(self, buffer: Buffer, kinds: array, starts: array, ends: array):
+        self.__buffer = buffer
+        self.__kinds = kinds
+        self.__starts = starts
+        self.__ends = ends
+        # From index runs[i] up to the next run, the offsets stored are
+        # short of deltas[i]; the tokens before the first run are not
+        self.__runs: List[int] = []
+        self.__deltas: List[int] = []
+        # The pieces of an edited stream, or None: from index firsts[i] up
+        # to the next piece, token j is token j + moved of the stream in
+        # pieces[i] = (stream, moved, shift), with its offsets plus shift;
+        # from offset text_starts[i] up to the next piece, character k is
+        # character k + moved of the string in texts[i] = (string, moved)
+        self.__firsts: Optional[List[int]] = None
+        self.__pieces: List[Tuple[TokenStream, int, int]] = []
+        self.__text_starts: List[int] = []
+        self.__texts: List[Tuple[Buffer, int]] = []
+        self.__length = len(kinds)
+        self.__size = len(buffer)
+        self.__line_index: Optional[LineIndex] = LineIndex(buffer)
+
+    @classmethod
+    def from_buffer(cls, buffer: Buffer) -> 'TokenStream':
+        kinds = array('B')
+        starts = array('I')
+        ends = array('I')
+        codes = KIND_CODES
+        add_kind, add_start, add_end = kinds.append, starts.append, ends.append
+        for kind, start, end in tokenize(buffer):
+            add_kind(codes[kind])
+            add_start(start)
+            add_end(end)
+        return cls(buffer, kinds, starts, ends)
+
+    @classmethod
+    def from_file(cls, filename: str) -> 'TokenStream':
+        return cls.from_buffer(SourceFile(filename).buffer)
+
+    @classmethod
+    def from_string(cls, text: str) -> 'TokenStream':
+        return cls.from_buffer(SourceFile.from_string(text).buffer)
+
+    @classmethod
+    def from_bytes(cls, data) -> 'TokenStream':
+        return cls.from_buffer(SourceFile.from_bytes(data).buffer)
+
+    def __len__(self) -> int:
+        return self.__length
+
+    @property
+    def buffer(self) -> Buffer:
+        """
+        The source text.
+        """
+        self.__flatten()
+        return self.__buffer
+
+    @property
+    def kinds(self) -> array:
+        """
+        Kind code of every token.
+        """
+        self.__flatten()
+        return self.__kinds
+
+    @property
+    def starts(self) -> array:
+        """
+        Offset of the first character of every token.
+        """
+        self.settle()
+        return self.__starts
+
+    @property
+    def ends(self) -> array:
+        """
+        Offset after the last character of every token.
+        """
+        self.settle()
+        return self.__ends
+
+    @property
+    def line_index(self) -> LineIndex:
+        if self.__line_index is None:
+            self.__line_index = LineIndex(self.buffer)
+        return self.__line_index
+
+    def settle(self) -> None:
+        """
+        Copies the pieces left by edit() into arrays and applies the shifts
+        of their runs.
+        """
+        self.__flatten()
+        if not self.__runs:
+            return
+        starts, ends = self.__starts, self.__ends
+        bounds = self.__runs + [len(starts)]
+        for run, delta in enumerate(self.__deltas):
+            first, last = bounds[run], bounds[run + 1]
+            starts[first:last] = array('I', [start + delta for start in starts[first:last]])
+            ends[first:last] = array('I', [end + delta for end in ends[first:last]])
+        self.__runs, self.__deltas = [], []
+
+    def __flatten(self) -> None:
+        """
+        Copies the tokens and the text of the pieces of an edited stream
+        into arrays and a buffer of its own.
+        """
+        if self.__firsts is None:
+            return
+        kinds, starts, ends = array('B'), array('I'), array('I')
+        runs: List[int] = []
+        deltas: List[int] = []
+        bounds = self.__firsts + [self.__length]
+        for piece, (stream, moved, shift) in enumerate(self.__pieces):
+            first, last = bounds[piece] + moved, bounds[piece + 1] + moved
+            # The runs of the piece, shifted and moved to where it goes
+            position = len(kinds) - first
+            split = bisect_right(stream.__runs, first)
+            for run, delta in zip([first] + stream.__runs[split:], [stream.__delta(first)] + stream.__deltas[split:]):
+                if run >= last:
+                    break
+                delta += shift
+                if delta != (deltas[-1] if deltas else 0):
+                    runs.append(run + position)
+                    deltas.append(delta)
+            kinds += stream.__kinds[first:last]
+            starts += stream.__starts[first:last]
+            ends += stream.__ends[first:last]
+
+        self.__buffer = self.text(0, self.__size)
+        self.__kinds, self.__starts, self.__ends = kinds, starts, ends
+        self.__runs, self.__deltas = runs, deltas
+        self.__firsts = None
+        self.__pieces, self.__text_starts, self.__texts = [], [], []
+        if len(runs) > self.MAX_RUNS:
+            self.settle()
+
+    def __token_pieces(self) -> Tuple[List[int], List[Tuple['TokenStream', int, int]]]:
+        if self.__firsts is None:
+            return [0], [(self, 0, 0)]
+        return self.__firsts, self.__pieces
+
+    def __text_pieces(self) -> Tuple[List[int], List[Tuple[Buffer, int]]]:
+        if self.__firsts is None:
+            return [0], [(self.__buffer, 0)]
+        return self.__text_starts, self.__texts
+
+    def __find(self, index: int) -> Tuple['TokenStream', int, int]:
+        """
+        Returns the stream which holds a token, its index there and the
+        shift of its offsets to here.
+        """
+        if self.__firsts is None:
+            return self, index, 0
+        stream, moved, shift = self.__pieces[bisect_right(self.__firsts, index) - 1]
+        return stream, index + moved, shift
+
+    def __delta(self, index: int) -> int:
+        run = bisect_right(self.__runs, index) - 1
+        return self.__deltas[run] if run >= 0 else 0
+
+    def text(self, start: int, end: int) -> Buffer:
+        """
+        Returns the source from `start` up to `end`.
+        """
+        if self.__firsts is None:
+            return self.__buffer[start:end]
+        starts, texts = self.__text_starts, self.__texts
+        end = min(end, self.__size)
+        piece = bisect_right(starts, start) - 1
+        parts = []
+        while start < end:
+            text, moved = texts[piece]
+            piece += 1
+            stop = min(end, starts[piece]) if piece < len(starts) else end
+            parts.append(text[start + moved:stop + moved])
+            start = stop
+        return self.__buffer[:0].join(parts)
+
+    def start(self, index: int) -> int:
+        if self.__firsts is None and not self.__runs:
+            return self.__starts[index]
+        stream, index, shift = self.__find(index)
+        return stream.__starts[index] + stream.__delta(index) + shift
+
+    def end(self, index: int) -> int:
+        if self.__firsts is None and not self.__runs:
+            return self.__ends[index]
+        stream, index, shift = self.__find(index)
+        return stream.__ends[index] + stream.__delta(index) + shift
+
+    def index_of(self, offset: int) -> int:
+        """
+        Returns the index of the first token which starts at or after
+        `offset`.
+        """
+        return bisect_left(range(self.__length), offset, key=self.start)
+
+    def kind(self, index: int) -> Kind:
+        if self.__firsts is None:
+            return KINDS[self.__kinds[index]]
+        stream, index, _ = self.__find(index)
+        return KINDS[stream.__kinds[index]]
+
+    def spelling(self, index: int) -> str:
+        """
+        Slices the spelling of a token from the source. Identifier spellings
+        are interned, so every occurrence of a name shares one string.
+        """
+        return self.token(index).spelling
+
+    def token(self, index: int) -> Token:
+        if self.__firsts is None:
+            stream, shift = self, 0
+        else:
+            stream, index, shift = self.__find(index)
+        start, end = stream.__starts[index], stream.__ends[index]
+        if stream.__runs:
+            delta = stream.__delta(index)
+            start += delta
+            end += delta
+        spelling = stream.__buffer[start:end]
+        if not isinstance(spelling, str):
+            spelling = spelling.decode('ascii')
+        code = stream.__kinds[index]
+        if code == _IDENTIFIER_CODE:
+            spelling = sys.intern(spelling)
+        return Token(KINDS[code], spelling, start + shift, end + shift)
+
+    def cursor(self, index: int = 0) -> 'TokenCursor':
+        return TokenCursor(self, index)
+
+    def edit(self, offset: int, deleted: int, inserted: Buffer) -> 'TokenStream':
+        """
+        Returns the tokens of the source after replacing `deleted` characters
+        at `offset` with `inserted`, which has the type of the buffer.
+
+        Only the tokens near the edit are scanned again. Scanning restarts at
+        the end of the last token which ends before the edit, since neither
+        that token nor any before it can change. It stops at the first new
+        token which starts in the unchanged rest of the source at the place
+        of an old token: from there on the old tokens are the same, only
+        shifted by the change in length. The text after the edit is scanned
+        WINDOW characters at a time, more when a token reaches the end of
+        what was taken. The new stream is made of the pieces of this one
+        around the edit and of the tokens scanned again, and this one is
+        left as it was.
+        """
+        size = self.__size
+        deleted = min(deleted, size - offset)
+        shift = len(inserted) - deleted
+        length = self.__length
+        tokens = range(length)
+
+        # Tokens before `kept` are unchanged
+        kept = bisect_left(tokens, offset, key=self.end)
+        position = self.end(kept - 1) if kept else 0
+        after = offset + deleted
+        unchanged = offset + len(inserted)
+        codes = KIND_CODES
+
+        extent = self.WINDOW
+        while True:
+            last = min(after + extent, size)
+            window = self.text(position, offset) + inserted + self.text(after, last)
+            complete = last == size
+            kinds, starts, ends = array('B'), array('I'), array('I')
+            reused = None
+            try:
+                for kind, start, end in tokenize(window):
+                    if not complete and end >= len(window):
+                        # The token may go on after the window
+                        break
+                    if start + position >= unchanged:
+                        index = bisect_left(tokens, start + position - shift, key=self.start)
+                        if index < length and self.start(index) == start + position - shift:
+                            reused = index
+                            break
+                    kinds.append(codes[kind])
+                    starts.append(start)
+                    ends.append(end)
+                else:
+                    reused = length
+            except NonAsciiSourceException as error:
+                buffer = self.text(0, offset) + inserted + self.text(after, size)
+                raise non_ascii_error(buffer, position + error.offset) from None
+            if reused is not None:
+                break
+            extent *= 4
+        scanned = kept + len(kinds)
+
+        firsts, pieces = self.__token_pieces()
+        new_firsts: List[int] = []
+        new_pieces: List[Tuple[TokenStream, int, int]] = []
+        for piece in range(bisect_left(firsts, kept)):
+            new_firsts.append(firsts[piece])
+            new_pieces.append(pieces[piece])
+        if kinds:
+            new_firsts.append(kept)
+            new_pieces.append((TokenStream(window, kinds, starts, ends), -kept, position))
+        if reused < length:
+            piece = bisect_right(firsts, reused) - 1
+            new_firsts.append(scanned)
+            new_firsts.extend(first - reused + scanned for first in firsts[piece + 1:])
+            new_pieces.extend((stream, moved + reused - scanned, delta + shift)
+                              for stream, moved, delta in pieces[piece:])
+
+        # The text scanned replaces the pieces it covers
+        text_starts, texts = self.__text_pieces()
+        split = bisect_left(text_starts, position)
+        new_text_starts, new_texts = text_starts[:split], texts[:split]
+        if window:
+            new_text_starts.append(position)
+            new_texts.append((window, -position))
+        if last < size:
+            piece = bisect_right(text_starts, last) - 1
+            new_text_starts.append(last + shift)
+            new_text_starts.extend(start + shift for start in text_starts[piece + 1:])
+            new_texts.extend((text, moved - shift) for text, moved in texts[piece:])
+
+        stream = TokenStream(window[:0], array('B'), array('I'), array('I'))
+        stream.__firsts, stream.__pieces = new_firsts, new_pieces
+        stream.__text_starts, stream.__texts = new_text_starts, new_texts
+        stream.__length = scanned + length - reused
+        stream.__size = size + shift
+        stream.__line_index = None
+        if max(len(new_pieces), len(new_texts)) > self.MAX_PIECES:
+            stream.__flatten()
+        return stream
+
+
+_IDENTIFIER_CODE = KIND_CODES[Kind.IDENTIFIER]
+
+
+class TokenCursor:
+    """
+    Reads a TokenStream through the Scanner interface, so that a Parser can
+    consume it, with lookahead at any distance.
+
+    Args:
+        stream: the tokens to read
+        index: index of the first token scan() returns
+    """
+
+    # Tokenizes a whole source buffer for the constructors below; cursors
+    # over other scanners replace it
+    scan_buffer = staticmethod(TokenStream.from_buffer)
+
+    def __init__(self, stream: TokenStream, index: int = 0):
+        self.stream = stream
+        self.index = index
+        self.last = len(stream) - 1
+
+    @classmethod
+    def from_file(cls, filename: str) -> 'TokenCursor':
+        return cls(cls.scan_buffer(SourceFile(filename).buffer))
+
+    @classmethod
+    def from_string(cls, text: str) -> 'TokenCursor':
+        return cls(cls.scan_buffer(SourceFile.from_string(text).buffer))
+
+    @classmethod
+    def from_bytes(cls, data) -> 'TokenCursor':
+        return cls(cls.scan_buffer(SourceFile.from_bytes(data).buffer))
+
+    @property
+    def line_index(self) -> LineIndex:
+        return self.stream.line_index
+
+    @property
+    def current_line(self) -> int:
+        return self.stream.line_index.position(self.__end())[0]
+
+    @property
+    def current_column(self) -> int:
+        return self.stream.line_index.position(self.__end())[1]
+
+    def __end(self) -> int:
+        return self.stream.end(self.index - 1) if self.index else 0
+
+    def scan(self) -> Token:
+        """
+        Returns the next token. Once the stream is exhausted every call
+        returns its EOT token.
+        """
+        index = min(self.index, self.last)
+        self.index = index + 1
+        return self.stream.token(index)
+
+    def peek_kind(self, k: int = 0) -> Kind:
+        """
+        Returns the kind of the token k positions after the one the next
+        scan() returns, without moving the cursor.
+        """
+        return self.stream.kind(min(self.index + k, self.last))
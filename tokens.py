@@ -31,6 +31,13 @@ class Kind(Enum):
 ASSIGNOPS: list = ['~']
 ADDOPS: list = ['+', '-']
 MULOPS: list = ['/', '*']
+# Binding strength of the binary operators, for precedence climbing in
+# Parser. All binary operators are left-associative.
+BINARY_PRECEDENCE: dict[str, int] = {
+    **{op: 1 for op in ASSIGNOPS},
+    **{op: 2 for op in ADDOPS},
+    **{op: 3 for op in MULOPS},
+}
 KEYWORDS: list[Kind] = [
     Kind.FUNC, Kind.END, Kind.ELSE,
     Kind.WHILE, Kind.IF, Kind.RETURN,
@@ -38,6 +45,10 @@ KEYWORDS: list[Kind] = [
     Kind.FALSE, Kind.STRING_TYPE,
     Kind.INTEGER_TYPE, Kind.BOOLEAN_TYPE
 ]
+KEYWORD_KINDS: dict[str, Kind] = {k.value: k for k in KEYWORDS}
+# Small integer codes of token kinds, for storing kinds in byte arrays
+KINDS: list[Kind] = list(Kind)
+KIND_CODES: dict[Kind, int] = {k: code for code, k in enumerate(KINDS)}
 TYPE_DENOTERS: list[Kind] = [
     Kind.STRING_TYPE, Kind.INTEGER_TYPE,
     Kind.BOOLEAN_TYPE
@@ -45,14 +56,25 @@ TYPE_DENOTERS: list[Kind] = [
 
 
 class Token():
-    def __init__(self, kind: Kind, spelling: str):
+    """
+    A token of the source program.
+
+    Args:
+        kind: kind of the token
+        spelling: characters of the token
+        start: offset of the first character of the token in the source
+        end: offset after the last character of the token in the source
+    """
+
+    def __init__(self, kind: Kind, spelling: str, start: int = 0, end: int = 0):
         self.kind: Kind = kind
         self.spelling: str = spelling
+        self.start: int = start
+        self.end: int = end
 
         # Check if and identifier is a keyword
         if self.kind == Kind.IDENTIFIER:
-            if self.spelling in [k.value for k in KEYWORDS]:
-                self.kind = Kind(self.spelling)
+            self.kind = KEYWORD_KINDS.get(self.spelling, Kind.IDENTIFIER)
 
     def is_assign_operator(self):
         return self.is_type_of_operator(ASSIGNOPS)
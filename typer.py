@@ -0,0 +1,192 @@
+from typing import List, Optional
+
+from abstract_tree.traversal import Traversal
+from abstract_tree.visitor import Visitor
+from abstract_tree import *
+from exceptions import InvalidTypeException
+from symbols import BOOL, INT, NO_TYPE, TYPE_NAMES, TYPES, SymbolTable
+from tokens import ASSIGNOPS
+
+
+class Typer(Traversal, Visitor):
+    """
+    Infers the type of every expression of a checked program, once, and
+    stores its code in symbols.TYPES in the `type` of the expression, so
+    later passes look it up instead of visiting declarations again. It runs
+    after the Checker, whose symbols give the types of variables.
+
+    Literals have their own type and arithmetic takes and gives ints. An
+    assignment has the type of its variable and a call the type of the
+    values its function returns, which is the type of its return statements
+    and is kept in the `types` column of the function's symbol.
+
+    Values of different types raise an InvalidTypeException, as do types
+    without a representation in TAM, like str. A call of a function whose
+    return type is not known yet, like a recursive one, has NO_TYPE and
+    matches any type.
+    """
+
+    def __init__(self):
+        self.symbols = SymbolTable()
+        # Symbols of the functions whose bodies are visited, innermost last
+        self.functions: List[Optional[int]] = []
+
+    def infer(self, p: Program):
+        self.traverse(p)
+
+    def __expect(self, expected: int, actual: int, what: str) -> None:
+        if actual != NO_TYPE and actual != expected:
+            raise InvalidTypeException(f"{what} must be {TYPE_NAMES[expected]}, not {TYPE_NAMES[actual]}.")
+
+    def __declared_type(self, vd: VarDeclaration) -> int:
+        spelling = self.visit_type_indicator(vd.type_indicator)
+        if spelling not in TYPES:
+            raise InvalidTypeException(f"Type {spelling} of {vd.identifier.spelling} is not supported.")
+        return TYPES[spelling]
+
+    def visit_program(self, p: Program, *args) -> object:
+        if p.symbols is not None:
+            self.symbols = p.symbols
+        yield p.command_list
+        return None
+
+    def visit_command_list(self, c: CommandList, *args) -> object:
+        for command in c.commands:
+            yield command
+        return None
+
+    def visit_declaration_command(self, dc: DeclarationCommand, *args) -> object:
+        yield dc.declaration_list
+        return None
+
+    def visit_statement_command(self, sc: StatementCommand, *args) -> object:
+        yield sc.statement
+        return None
+
+    def visit_declaration_list(self, d: DeclarationList, *args) -> object:
+        for declaration in d.declarations:
+            yield declaration
+        return None
+
+    def visit_func_declaration(self, fd: FuncDeclaration, *args) -> object:
+        if not fd.is_parsed:
+            # Not checked either, and never called
+            return None
+        if fd.symbol is not None:
+            # Set again by the return statements of the body
+            self.symbols.types[fd.symbol] = NO_TYPE
+        self.functions.append(fd.symbol)
+        try:
+            yield fd.commands
+            if fd.args is not None:
+                yield fd.args
+        finally:
+            self.functions.pop()
+        return None
+
+    def visit_var_declaration(self, vd: VarDeclaration, *args) -> object:
+        self.__declared_type(vd)
+        return None
+
+    def visit_var_declaration_with_assignment(self, vd: VarDeclarationWithAssignment, *args) -> object:
+        declared = self.__declared_type(vd)
+        actual = yield vd.expression
+        self.__expect(declared, actual, f"Initial value of {vd.identifier.spelling}")
+        return None
+
+    def visit_expression_statement(self, es: ExpressionStatement, *args) -> object:
+        yield es.expressions
+        return None
+
+    def visit_if_statement(self, ifs: IfStatement, *args) -> object:
+        yield ifs.expr
+        yield ifs.if_com
+        if ifs.else_com is not None:
+            yield ifs.else_com
+        return None
+
+    def visit_while_statement(self, ws: WhileStatement, *args) -> object:
+        yield ws.expr
+        yield ws.command
+        return None
+
+    def visit_return_statement(self, rs: ReturnStatement, *args) -> object:
+        actual = yield rs.expression
+        symbol = self.functions[-1] if self.functions else None
+        if symbol is None or actual == NO_TYPE:
+            return None
+        types = self.symbols.types
+        if types[symbol] == NO_TYPE:
+            types[symbol] = actual
+        else:
+            name = self.symbols.declarations[symbol].identifier.spelling
+            self.__expect(types[symbol], actual, f"Return value of {name}")
+        return None
+
+    def visit_expression_list(self, el: ExpressionList, *args) -> object:
+        for expression in el.expressions:
+            yield expression
+        return None
+
+    def visit_binary_expression(self, be: BinaryExpression, *args) -> int:
+        t1 = yield be.expression1
+        t2 = yield be.expression2
+        operator = self.visit_operator(be.operator)
+
+        if operator in ASSIGNOPS:
+            if t1 != NO_TYPE:
+                self.__expect(t1, t2, f"Value assigned to {be.expression1.name.spelling}")
+            t = t1 or t2
+        else:
+            self.__expect(INT, t1, f"Left operand of {operator}")
+            self.__expect(INT, t2, f"Right operand of {operator}")
+            t = INT
+        be.type = t
+        return t
+
+    def visit_unary_expression(self, ue: UnaryExpression, *args) -> int:
+        t = yield ue.expression
+        self.__expect(INT, t, f"Operand of {self.visit_operator(ue.operator)}")
+        ue.type = INT
+        return INT
+
+    def visit_call_expression(self, ce: CallExpression, *args) -> int:
+        if ce.args is not None:
+            yield ce.args
+        t = NO_TYPE if ce.symbol is None else self.symbols.types[ce.symbol]
+        ce.type = t
+        return t
+
+    def visit_int_literal_expression(self, ie: IntLiteralExpression, *args) -> int:
+        ie.type = INT
+        return INT
+
+    def visit_boolean_literal_expression(self, be: BooleanLiteralExpression, *args) -> int:
+        be.type = BOOL
+        return BOOL
+
+    def visit_var_expression(self, ve: VarExpression, *args) -> int:
+        t = self.symbols.types[ve.symbol]
+        ve.type = t
+        return t
+
+    def visit_arguments_list(self, al: ArgumentsList, *args) -> List[int]:
+        types = []
+        for a in al.expressions:
+            types.append((yield a))
+        return types
+
+    def visit_identifier(self, i: Identifier, *args) -> object:
+        return i.spelling
+
+    def visit_integer_literal(self, il: IntegerLiteral, *args) -> object:
+        return il.spelling
+
+    def visit_boolean_literal(self, bl: BooleanLiteral, *args) -> object:
+        return bl.spelling
+
+    def visit_operator(self, o: Operator, *args) -> object:
+        return o.spelling
+
+    def visit_type_indicator(self, td: TypeIndicator, *args) -> object:
+        return td.spelling